@@ -0,0 +1,488 @@
+"""
+오프라인 벤치마크: 로컬 가짜 네이버 피드/텔레그램 서버를 띄우고 main.py 의 실제 수집/전송 경로를 측정한다.
+
+    cd github
+    python bench.py --runs 3 --items 20 --latency-ms 50 > bench.json
+
+결과는 JSON 한 덩어리로 stdout 에 출력되고, main.py 의 진행 로그는 stderr 로 보낸다.
+커밋 간 결과 JSON 을 비교하면 성능 회귀를 찾을 수 있다.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+
+BENCH_TOKEN = "123456:bench-token"
+BENCH_CHAT_ID = "1000"
+BENCH_COOKIE = "NID_AUT=bench; NID_SES=bench"
+BENCH_CAFE = "benchcafe"
+BENCH_CLUB_ID = 10000000
+
+HOME_PATH = "/"
+FEED_PATH = "/ca-fe/home/feed"
+# 같은 피드를 클래스 이름만 바꿔 내려주는 페이지 (마크업 변경 판정 시간 측정용)
+DRIFT_PATH = "/ca-fe/home/feed-drift"
+# 429 를 돌려주는 페이지 (문서 응답 분류 시간 측정용)
+THROTTLE_PATH = "/ca-fe/home/feed-throttled"
+# 헤더는 바로 그리고 피드 항목은 DRIFT_SETTLE_SECONDS 보다 늦게 끝나는 XHR 로 그리는 페이지 (느린 로딩을 drift 로 오판하지 않는지 확인)
+SLOW_PATH = "/ca-fe/home/feed-slow"
+SLOW_DATA_PATH = "/ca-fe/home/feed-slow/items"
+API_PATH = "/cafe-home/v1/feeds"
+LOGIN_PATH = "/nidlogin.login"
+PROBE_PATH = "/user2/help/myInfoV2"
+
+
+# ── 가짜 피드 데이터 ──
+
+def _feed_items(count):
+    now = time.time()
+    return [
+        {
+            "article_id": 1000 + index,
+            "title": f"벤치마크 게시글 {index + 1}",
+            "timestamp": now - index * 60,
+            "like": index % 7,
+            "comment": index % 5,
+        }
+        for index in range(count)
+    ]
+
+
+def _render_header_html():
+    """실제 카페 홈처럼 피드보다 먼저 그려지는 상단 메뉴(GNB). 요소 수만으로 drift 를 판정하지 않는지 보기 위한 것."""
+    menu = "".join(f"<li class='gnb_item'><a href='#menu{index}'><span>메뉴 {index}</span></a></li>" for index in range(30))
+    return f"<header id='gnb'><div class='gnb_inner'><h1><a href='#'>카페</a></h1><ul class='gnb_list'>{menu}</ul></div></header>"
+
+
+def _render_feed_blocks(items):
+    blocks = []
+    for item in items:
+        blocks.append(
+            '<div class="feed_item">'
+            f'<div class="feed_content"><a href="https://cafe.naver.com/{BENCH_CAFE}/{item["article_id"]}?art=bench">'
+            f'<strong class="title">{item["title"]}</strong></a></div>'
+            f'<span class="date">{int((time.time() - item["timestamp"]) // 60)}분 전</span>'
+            f'<span class="count like">{item["like"]}</span>'
+            f'<a class="comment">{item["comment"]}</a>'
+            "</div>"
+        )
+    return "".join(blocks)
+
+
+def _render_feed_html(items, render_delay_ms):
+    """피드 페이지. render_delay_ms 가 있으면 SPA 처럼 늦게 항목을 그려 대기 로직을 거치게 한다."""
+    body = _render_feed_blocks(items)
+    if render_delay_ms <= 0:
+        return f"<html><body><div id='app'>{body}</div></body></html>"
+    return (
+        "<html><body><div id='app'></div><script>"
+        f"setTimeout(function () {{ document.getElementById('app').innerHTML = {json.dumps(body)}; }}, {render_delay_ms});"
+        "</script></body></html>"
+    )
+
+
+def _render_slow_feed_html():
+    """상단 메뉴는 바로 그리고, 피드 항목은 늦게 끝나는 XHR(fetch) 응답으로 그린다."""
+    return (
+        f"<html><body>{_render_header_html()}<div id='app'></div><script>"
+        f"fetch({json.dumps(SLOW_DATA_PATH)}).then(function (r) {{ return r.text(); }})"
+        ".then(function (html) { document.getElementById('app').innerHTML = html; });"
+        "</script></body></html>"
+    )
+
+
+def _feed_api_payload(items):
+    return {
+        "message": {
+            "status": "200",
+            "result": {
+                "feeds": [
+                    {
+                        "article": {
+                            "articleId": item["article_id"],
+                            "subject": item["title"],
+                            "writeDateTimestamp": int(item["timestamp"] * 1000),
+                            "likeItCount": item["like"],
+                            "commentCount": item["comment"],
+                        },
+                        "cafe": {"cafeId": BENCH_CLUB_ID, "cafeUrl": BENCH_CAFE},
+                    }
+                    for item in items
+                ]
+            },
+        }
+    }
+
+
+# ── 가짜 네이버/텔레그램 서버 ──
+
+class FakeNaverHandler(BaseHTTPRequestHandler):
+    """네이버 홈/피드/피드 API/로그인 리다이렉트와 텔레그램 Bot API(getMe, sendMessage)를 흉내 낸다."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _logged_in(self):
+        cookie = SimpleCookie()
+        try:
+            cookie.load(self.headers.get("Cookie", ""))
+        except Exception:
+            return False
+        return all(name in cookie and cookie[name].value != "expired" for name in ("NID_AUT", "NID_SES"))
+
+    def _delay(self):
+        if self.server.latency > 0:
+            time.sleep(self.server.latency)
+
+    def do_GET(self):
+        self._delay()
+        path = urlsplit(self.path).path
+        if path.startswith("/bot"):
+            return self._telegram(path, b"")
+        if path == HOME_PATH:
+            return self._respond(200, "<html><body><div id='naver'>home</div></body></html>")
+        if path == LOGIN_PATH:
+            return self._respond(200, "<html><body><form id='frmNIDLogin'></form></body></html>")
+        if path == FEED_PATH:
+            if not self._logged_in():
+                return self._respond(302, "", headers={"Location": f"{LOGIN_PATH}?url=feed"})
+            return self._respond(200, self.server.feed_html)
+        if path in (DRIFT_PATH, SLOW_PATH, SLOW_DATA_PATH) and not self._logged_in():
+            return self._respond(302, "", headers={"Location": f"{LOGIN_PATH}?url=feed"})
+        if path == DRIFT_PATH:
+            return self._respond(200, self.server.drift_html)
+        if path == SLOW_PATH:
+            return self._respond(200, self.server.slow_html)
+        if path == SLOW_DATA_PATH:
+            time.sleep(self.server.slow_xhr_seconds)
+            return self._respond(200, self.server.slow_items_html)
+        if path == THROTTLE_PATH:
+            return self._respond(429, "<html><body>too many requests</body></html>", headers={"Retry-After": "60"})
+        if path == PROBE_PATH:
+            if not self._logged_in():
+                return self._respond(302, "", headers={"Location": f"{LOGIN_PATH}?url=myinfo"})
+            return self._respond(200, "<html><body>myinfo</body></html>")
+        if path == API_PATH:
+            if not self._logged_in():
+                return self._respond(401, '{"message":{"status":"401"}}', "application/json")
+            return self._respond(200, self.server.api_body, "application/json")
+        return self._respond(404, "not found", "text/plain")
+
+    def do_POST(self):
+        self._delay()
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        path = urlsplit(self.path).path
+        if path.startswith("/bot"):
+            return self._telegram(path, body)
+        return self._respond(404, "not found", "text/plain")
+
+    def _telegram(self, path, body):
+        method = path.rsplit("/", 1)[-1]
+        if method == "getMe":
+            result = {"id": 123456, "is_bot": True, "first_name": "bench", "username": "bench_bot"}
+        elif method == "sendMessage":
+            try:
+                params = json.loads(body or b"{}")
+            except ValueError:
+                params = {k: v[0] for k, v in parse_qs(body.decode("utf-8")).items()}
+            with self.server.lock:
+                self.server.messages += 1
+                message_id = self.server.messages
+            try:
+                chat_id = int(params.get("chat_id", BENCH_CHAT_ID))
+            except (TypeError, ValueError):
+                chat_id = int(BENCH_CHAT_ID)
+            result = {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": params.get("text", ""),
+            }
+        else:
+            result = True
+        return self._respond(200, json.dumps({"ok": True, "result": result}), "application/json")
+
+
+def _start_server(items, latency_ms, render_delay_ms, feed_html_path=None):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeNaverHandler)
+    server.daemon_threads = True
+    server.latency = latency_ms / 1000.0
+    if feed_html_path:
+        server.feed_html = Path(feed_html_path).read_text(encoding="utf-8")
+    else:
+        server.feed_html = _render_feed_html(items, render_delay_ms)
+    drift_body = _render_feed_blocks(items).replace("feed_item", "FeedItem_wrap").replace("title", "subject")
+    server.drift_html = f"<html><body>{_render_header_html()}<div id='app'>{drift_body}</div></body></html>"
+    server.slow_html = _render_slow_feed_html()
+    server.slow_items_html = _render_feed_blocks(items)
+    # main 을 import 한 뒤 DRIFT_SETTLE_SECONDS 보다 길게 맞춘다
+    server.slow_xhr_seconds = 2.5
+    server.api_body = json.dumps(_feed_api_payload(items), ensure_ascii=False)
+    server.lock = threading.Lock()
+    server.messages = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+# ── 측정 ──
+
+class PhaseTimer:
+    def __init__(self):
+        self.phases = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        # 실패한 단계는 기록하지 않는다 (중간값을 흐리지 않도록)
+        started = time.perf_counter()
+        yield
+        self.phases[name] = round(time.perf_counter() - started, 4)
+
+
+async def _send_all(bot, messages, chat_ids):
+    """send_telegram_message 로 메시지를 채팅별로 나눠 동시에 보내고 (성공 건수, 소요 초)를 반환한다."""
+    started = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(
+            bot.send_telegram_message(message, chat_ids[index % len(chat_ids)])
+            for index, message in enumerate(messages)
+        ))
+    finally:
+        await bot._close_telegram()
+    return sum(1 for ok in results if ok), time.perf_counter() - started
+
+
+# 감지 단계별 기대 결과: 하나라도 다르면 벤치마크가 종료 코드 1 로 끝난다
+EXPECTED_RESULTS = {
+    "slow_feed_detect": "ready",
+    "drift_detect": "drift",
+    "throttle_detect": "throttled",
+    "login_detect": "login",
+}
+
+
+def _bench_browser(bot, cookie_pairs, timer, run):
+    """
+    Selenium 경로: 드라이버 기동 → 쿠키 인증 진입 → 파싱 → 세션 재사용 진입
+    → 느린 피드 XHR(drift 아님)/마크업 변경/요청 제한/로그인 리다이렉트 감지.
+    """
+    with timer.phase("driver_start"):
+        driver = bot._build_driver()
+    # main._build_driver 가 붙인 메모리 감시 스레드의 표본을 그대로 쓴다
+    governor = driver.memory_governor
+    try:
+        with timer.phase("authenticate"):
+            run["results"]["authenticate"] = bot._authenticate_feed(driver, cookie_pairs)
+
+        calls_before = bot._webdriver_call_total(driver)
+        with timer.phase("parse"):
+            posts = bot._extract_feed_posts(driver)
+        run["parse_webdriver_calls"] = bot._webdriver_call_total(driver) - calls_before
+        run["posts"] = len(posts)
+
+        with timer.phase("warm_reload"):
+            _, run["results"]["warm_reload"] = bot._collect_feed(driver, cookie_pairs, warm=True)
+
+        with timer.phase("slow_feed_detect"):
+            run["results"]["slow_feed_detect"] = bot._open_feed(driver, 15, bot.FEED_URL.replace(FEED_PATH, SLOW_PATH))
+
+        with timer.phase("drift_detect"):
+            run["results"]["drift_detect"] = bot._open_feed(driver, 15, bot.FEED_URL.replace(FEED_PATH, DRIFT_PATH))
+
+        with timer.phase("throttle_detect"):
+            run["results"]["throttle_detect"] = bot._open_feed(driver, 15, bot.FEED_URL.replace(FEED_PATH, THROTTLE_PATH))
+
+        driver.delete_all_cookies()
+        with timer.phase("login_detect"):
+            run["results"]["login_detect"] = bot._open_feed(driver, timeout=15)
+
+        run["webdriver_calls"] = dict(driver.command_counts)
+        run["webdriver_calls_total"] = bot._webdriver_call_total(driver)
+        run["network"] = dict(bot._RUN_STATS.get("network") or {})
+    finally:
+        run["peak_rss_mb"] = round(governor.peak_kb / 1024, 1) if governor else None
+        bot._quit_driver(driver)
+        run["memory"] = dict(bot._RUN_STATS.get("memory") or {})
+    return posts
+
+
+def _bench_run(bot, cookie_pairs, args, server):
+    timer = PhaseTimer()
+    run = {"results": {}}
+    bot._reset_run_stats()
+
+    posts = []
+    if not args.skip_browser:
+        try:
+            posts = _bench_browser(bot, cookie_pairs, timer, run)
+        except Exception as e:
+            run["browser_error"] = str(e)
+
+    with timer.phase("cookie_probe"):
+        run["results"]["cookie_probe"] = bot._probe_cookie(cookie_pairs)
+
+    with timer.phase("http_fetch"):
+        http_posts, run["results"]["http_fetch"] = bot._fetch_feed_http(cookie_pairs)
+    run["http_posts"] = len(http_posts)
+
+    source = posts or http_posts
+    messages = [
+        f"{post['absolute_time']}\n{post['title']}\n{post['link']}\n좋아요 {post['like']} 댓글 {post['comment']}"
+        for post in source
+    ][:args.messages]
+    chat_ids = [str(int(BENCH_CHAT_ID) + index) for index in range(args.chats)]
+    sent_before = server.messages
+    with timer.phase("telegram_send"):
+        sent, seconds = asyncio.run(_send_all(bot, messages, chat_ids))
+    run["telegram"] = {
+        "messages": len(messages),
+        "sent": sent,
+        "received": server.messages - sent_before,
+        "seconds": round(seconds, 4),
+        "messages_per_sec": round(sent / seconds, 2) if seconds > 0 else None,
+    }
+    run["phases"] = timer.phases
+    run["unexpected"] = {
+        name: {"expected": expected, "actual": run["results"][name]}
+        for name, expected in EXPECTED_RESULTS.items()
+        if name in run["results"] and run["results"][name] != expected
+    }
+    return run
+
+
+def _summarize(runs):
+    def stats(values):
+        values = [v for v in values if v is not None]
+        if not values:
+            return None
+        return {"median": round(statistics.median(values), 4), "max": round(max(values), 4)}
+
+    phase_names = []
+    for run in runs:
+        phase_names.extend(name for name in run["phases"] if name not in phase_names)
+    return {
+        "phases": {name: stats([run["phases"].get(name) for run in runs]) for name in phase_names},
+        "peak_rss_mb": stats([run.get("peak_rss_mb") for run in runs]),
+        "webdriver_calls_total": stats([run.get("webdriver_calls_total") for run in runs]),
+        "parse_webdriver_calls": stats([run.get("parse_webdriver_calls") for run in runs]),
+        "messages_per_sec": stats([run["telegram"]["messages_per_sec"] for run in runs]),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 가짜 서버로 피드 수집/전송 경로를 측정합니다.")
+    parser.add_argument("--runs", type=int, default=3, help="반복 횟수 (매 회 Chrome 새로 기동)")
+    parser.add_argument("--items", type=int, default=20, help="피드 게시글 수")
+    parser.add_argument("--latency-ms", type=int, default=0, help="가짜 서버 응답 지연 (ms)")
+    parser.add_argument("--render-delay-ms", type=int, default=300, help="피드 항목이 그려지기까지의 지연 (ms)")
+    parser.add_argument("--feed-html", help="생성 HTML 대신 제공할 녹화된 피드 HTML 파일")
+    parser.add_argument("--messages", type=int, default=10, help="회당 텔레그램 전송 건수 (최대 게시글 수)")
+    parser.add_argument("--chats", type=int, default=1, help="전송을 나눌 채팅 수")
+    parser.add_argument("--skip-browser", action="store_true", help="Chrome 단계를 건너뛰고 HTTP/전송만 측정")
+    parser.add_argument("--output", help="결과 JSON 을 stdout 대신 파일로 저장")
+    args = parser.parse_args()
+
+    server = _start_server(_feed_items(args.items), args.latency_ms, args.render_delay_ms, args.feed_html)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # main.py 는 import 시점에 환경 변수를 읽으므로 먼저 가짜 서버 주소를 넣는다
+    os.environ.update({
+        "NAVER_HOME_URL": base_url + HOME_PATH,
+        "NAVER_FEED_URL": base_url + FEED_PATH,
+        "NAVER_FEED_API_URL": base_url + API_PATH,
+        "NAVER_COOKIE_PROBE_URL": base_url + PROBE_PATH,
+        # 매 회차 실제 요청을 재도록 사전 확인 캐시는 끈다
+        "NAVER_COOKIE_PROBE_TTL": "0",
+        # 벤치마크 쿠키가 운영 쿠키 저장소(session_cookies.json)에 섞이지 않도록
+        "NAVER_COOKIE_STORE": "0",
+        # 429 측정 단계가 운영 쿨다운(throttle_cooldown.json)을 남기지 않도록
+        "NAVER_THROTTLE_COOLDOWN": "0",
+        "NAVER_COOKIE_DOMAIN": "127.0.0.1",
+        "NAVER_COOKIE": BENCH_COOKIE,
+        "NAVER_BOT_PROFILE_DIR": "",
+        "NAVER_ACCOUNTS_FILE": "",
+        "TELEGRAM_API_URL": base_url + "/bot",
+        "TELEGRAM_BOT_TOKEN": BENCH_TOKEN,
+        "TELEGRAM_CHAT_ID": BENCH_CHAT_ID,
+    })
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import main as bot
+
+    server.slow_xhr_seconds = bot.DRIFT_SETTLE_SECONDS + 1.0
+    cookie_pairs = bot._parse_cookie_pairs(BENCH_COOKIE)
+    runs = []
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            for index in range(args.runs):
+                print(f"[bench] {index + 1}/{args.runs} 회차")
+                runs.append(_bench_run(bot, cookie_pairs, args, server))
+    finally:
+        server.shutdown()
+
+    report = {
+        "commit": _git_commit(),
+        "measured_at": datetime.now(timezone.utc).isoformat(),
+        "params": {
+            "runs": args.runs,
+            "items": args.items,
+            "latency_ms": args.latency_ms,
+            "render_delay_ms": args.render_delay_ms,
+            "feed_html": args.feed_html,
+            "messages": args.messages,
+            "chats": args.chats,
+            "wait_mode": bot.WAIT_MODE,
+            "feed_parser": bot.FEED_PARSER,
+            "block_profile": bot.BLOCK_PROFILE,
+        },
+        "summary": _summarize(runs),
+        "runs": runs,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+    unexpected = [f"{index + 1}회차 {name}: {detail['actual']} (기대 {detail['expected']})"
+                  for index, run in enumerate(runs) for name, detail in run["unexpected"].items()]
+    if unexpected:
+        print("감지 결과가 기대와 다릅니다: " + ", ".join(unexpected), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+class CookieStore:
+    """
+    실행 중 네이버가 갱신한 세션 쿠키(NID_SES 등)를 계정(slot)별로 보관한다.
+    각 slot 은 어떤 설정 쿠키(NAVER_COOKIE 등)에서 출발했는지(base 지문)를 함께 기록해,
+    설정 쿠키를 새로 붙여 넣으면 예전 갱신값은 버리고 새 쿠키부터 다시 시작한다.
+    세션 정보이므로 파일은 소유자만 읽을 수 있게(0600) 임시 파일 + rename 으로 쓴다.
+    멀티 계정은 작업 스레드에서 동시에 갱신하므로 잠금으로 직렬화한다.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.slots = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict) and isinstance(data.get("slots"), dict):
+                self.slots = data["slots"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"쿠키 저장소 로드 실패 ({self.path}): {e}")
+        return self
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        # 이미 있던 임시 파일은 mode 가 적용되지 않으므로 한 번 더 맞춘다
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"slots": self.slots}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def resolve(self, slot, base_pairs, base_key):
+        """
+        설정 쿠키(base_pairs)에 저장된 갱신값을 덮어쓴 쿠키 목록을 돌려준다.
+        반환값: (pairs, info)  info 는 저장된 값이 없으면 None, 있으면 {"rotated", "age_seconds", "harvested_seconds"}
+        """
+        entry = self.slots.get(slot)
+        if not entry or entry.get("base") != base_key or not entry.get("cookies"):
+            return list(base_pairs), None
+
+        stored = entry["cookies"]
+        pairs = [(name, stored.get(name, {}).get("value", value)) for name, value in base_pairs]
+        now = time.time()
+        rotated = [name for name, value in base_pairs if name in stored and stored[name]["value"] != value]
+        info = {
+            "rotated": rotated,
+            # 덮어쓴 값 중 가장 오래된 것 기준 (만료가 가까운 쪽)
+            "age_seconds": round(now - min(stored[name]["updated_at"] for name in rotated), 1) if rotated else None,
+            "harvested_seconds": round(now - entry.get("harvested_at", now), 1),
+        }
+        return pairs, info
+
+    def harvest(self, slot, base_pairs, base_key, cookies):
+        """
+        브라우저/HTTP 응답의 쿠키 (name, value) 목록을 반영한다. 설정 쿠키에 있는 이름만 보관한다.
+        값이 바뀐 쿠키가 없으면 파일을 다시 쓰지 않는다 (매 실행 fsync/rename 방지).
+        반환값: 값이 바뀐 쿠키 이름 목록
+        """
+        names = {name for name, _ in base_pairs}
+        with self._lock:
+            entry = self.slots.get(slot)
+            if not entry or entry.get("base") != base_key:
+                entry = {"base": base_key, "cookies": {}}
+            stored = entry["cookies"]
+            current = dict(base_pairs)
+            current.update({name: item["value"] for name, item in stored.items()})
+
+            now = time.time()
+            changed = []
+            for name, value in cookies:
+                if name in names and value and current.get(name) != value:
+                    stored[name] = {"value": value, "updated_at": round(now, 3)}
+                    current[name] = value
+                    changed.append(name)
+            if changed:
+                entry["harvested_at"] = round(now, 3)
+                self.slots[slot] = entry
+                self.save()
+        return changed
+
+    def discard(self, slot):
+        """slot 의 갱신값을 버린다 (다음 실행은 설정 쿠키로 시작)."""
+        with self._lock:
+            if self.slots.pop(slot, None) is not None:
+                self.save()
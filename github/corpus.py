@@ -0,0 +1,381 @@
+"""
+피드 스냅샷 코퍼스.
+
+NAVER_CORPUS_DIR 을 지정하면 main.py 가 성공한 조회마다 피드 DOM(또는 API JSON)과 그때 추출한 게시글을
+쿠키 값을 지운 채 저장한다. 이 도구는 브라우저/네트워크 없이 현재 코드의 추출 로직을 스냅샷에 다시 돌려
+기록 당시 결과와 같은지 확인하고, 추출 처리량을 잰다.
+
+    # 전체 재생 (불일치 또는 현재 선택자로 필수 필드를 못 찾는 스냅샷이 있으면 종료 코드 1)
+    python corpus.py --dir corpus
+    # 처리량 측정: 스냅샷마다 추출을 20회 반복
+    python corpus.py --dir corpus --repeat 20
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urljoin
+
+
+SNAPSHOT_VERSION = 1
+# 재생 때 비교하는 게시글 필드 (absolute_time 은 재생 시각에 따라 달라지므로 제외)
+COMPARED_FIELDS = ("title", "link", "date", "like", "comment")
+# 스냅샷에 남길 필요가 없고 세션 정보가 섞이기 쉬운 요소
+_STRIP_ELEMENTS = re.compile(r"<(script|style|noscript|svg|template)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+# 이보다 짧은 쿠키 값은 본문의 평범한 문자열과 겹칠 수 있어 지우지 않는다
+_MIN_SECRET_LENGTH = 6
+_REDACTED = "<redacted>"
+
+
+# ── 기록 ──
+
+def _scrub(value, secrets):
+    if isinstance(value, str):
+        for secret in secrets:
+            value = value.replace(secret, _REDACTED)
+        return value
+    if isinstance(value, list):
+        return [_scrub(item, secrets) for item in value]
+    if isinstance(value, dict):
+        return {key: _scrub(item, secrets) for key, item in value.items()}
+    return value
+
+
+def sanitize_html(html, secrets=()):
+    """스크립트/스타일 등을 걷어내고 쿠키 값이 나타나는 곳을 지운다."""
+    secrets = sorted({s for s in secrets if s and len(s) >= _MIN_SECRET_LENGTH}, key=len, reverse=True)
+    return _scrub(_STRIP_ELEMENTS.sub("", html), secrets)
+
+
+def record_snapshot(directory, kind, url, content, posts, secrets=(), stop_links=(), max_files=500):
+    """
+    스냅샷 1개를 저장한다. kind: dom(content=HTML) / api(content=JSON payload).
+    같은 내용은 한 번만 저장하고, max_files 를 넘으면 오래된 것부터 지운다. 반환값: 파일 경로
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    secrets = sorted({s for s in secrets if s and len(s) >= _MIN_SECRET_LENGTH}, key=len, reverse=True)
+    if kind == "dom":
+        content = sanitize_html(content, secrets)
+    else:
+        content = _scrub(content, secrets)
+
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "kind": kind,
+        "url": _scrub(url, secrets),
+        "captured_at": round(time.time(), 3),
+        "stop_links": list(stop_links),
+        "content": content,
+        "expected": [{field: _scrub(str(post.get(field, "")), secrets) for field in COMPARED_FIELDS} for post in posts],
+    }
+    digest = hashlib.sha256(json.dumps(content, ensure_ascii=False).encode("utf-8")).hexdigest()[:12]
+    existing = list(directory.glob(f"*-{kind}-{digest}.json"))
+    if existing:
+        return existing[0]
+
+    path = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{kind}-{digest}.json"
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+    snapshots = sorted(directory.glob("*.json"))
+    for old in snapshots[:max(0, len(snapshots) - max_files)]:
+        old.unlink()
+    return path
+
+
+# ── DOM 재현 (브라우저 없이) ──
+
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+_COMPOUND = re.compile(r"^([A-Za-z][\w-]*|\*)?((?:\.[\w-]+)*)$")
+
+
+class _Element:
+    __slots__ = ("tag", "attrs", "classes", "children", "parent")
+
+    def __init__(self, tag, attrs, parent):
+        self.tag = tag
+        self.attrs = {key: value or "" for key, value in attrs}
+        self.classes = set(self.attrs.get("class", "").split())
+        self.children = []
+        self.parent = parent
+
+    def descendants(self):
+        """자손 요소를 문서 순서로."""
+        stack = [child for child in reversed(self.children) if isinstance(child, _Element)]
+        while stack:
+            element = stack.pop()
+            yield element
+            stack.extend(child for child in reversed(element.children) if isinstance(child, _Element))
+
+    def text(self):
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            else:
+                stack.extend(reversed(node.children))
+        # innerText 처럼 공백을 하나로 접는다
+        return " ".join("".join(parts).split())
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _Element("#document", (), None)
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        element = _Element(tag, attrs, self.current)
+        self.current.children.append(element)
+        if tag not in _VOID_TAGS:
+            self.current = element
+
+    def handle_startendtag(self, tag, attrs):
+        self.current.children.append(_Element(tag, attrs, self.current))
+
+    def handle_endtag(self, tag):
+        # 닫는 태그가 빠진 요소는 짝이 맞는 조상까지 한 번에 닫는다
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+
+def parse_html(html):
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def compile_selector(selector):
+    """
+    태그/클래스 조합과 자손(공백)/자식(>) 결합자만 지원한다 (FEED_SELECTORS 후보에 쓰는 범위).
+    반환값: [(tag, classes, 왼쪽 단계와의 결합자)]
+    """
+    steps = []
+    combinator = None
+    for token in selector.replace(">", " > ").split():
+        if token == ">":
+            combinator = ">"
+            continue
+        match = _COMPOUND.match(token)
+        if not match or token == "":
+            raise ValueError(f"지원하지 않는 선택자: {selector}")
+        tag = match.group(1)
+        classes = {name for name in match.group(2).split(".") if name}
+        steps.append((None if tag in (None, "*") else tag.lower(), classes, combinator if steps else None))
+        combinator = " "
+    if not steps:
+        raise ValueError(f"빈 선택자: {selector!r}")
+    return steps
+
+
+def _matches(element, steps):
+    tag, classes, combinator = steps[-1]
+    if (tag is not None and element.tag != tag) or not classes <= element.classes:
+        return False
+    if len(steps) == 1:
+        return True
+    parent = element.parent
+    if combinator == ">":
+        return parent is not None and parent.tag != "#document" and _matches(parent, steps[:-1])
+    while parent is not None and parent.tag != "#document":
+        if _matches(parent, steps[:-1]):
+            return True
+        parent = parent.parent
+    return False
+
+
+def select(scope, steps):
+    """querySelectorAll 과 같다: scope 의 자손 중 steps 에 맞는 요소 (조상 조건은 scope 밖까지 본다)."""
+    return [element for element in scope.descendants() if _matches(element, steps)]
+
+
+def select_one(scope, steps):
+    return next((element for element in scope.descendants() if _matches(element, steps)), None)
+
+
+def extract_feed_html(html, page_url, selectors, stop_links=(), start=0, limit=None):
+    """
+    main._EXTRACT_FEED_JS 와 같은 규칙으로 HTML 에서 피드 항목을 추출한다. selectors: 필드별 후보 선택자 목록.
+    반환값: {"total", "items", "errors", "stopped", "matched", "missing"}  (items 는 main._posts_from_items 에 그대로 넘긴다)
+    """
+    chains = {name: [(selector, compile_selector(selector)) for selector in chain] for name, chain in selectors.items()}
+    result = {"total": 0, "items": [], "errors": [], "stopped": None, "matched": {}, "missing": {}}
+    matched, missing = result["matched"], result["missing"]
+
+    root = parse_html(html)
+    elements = []
+    for selector, steps in chains["item"]:
+        elements = select(root, steps)
+        if elements:
+            matched["item"] = selector
+            break
+    if not elements:
+        missing["item"] = 1
+    result["total"] = len(elements)
+
+    def pick(element, field):
+        for selector, steps in chains[field]:
+            found = select_one(element, steps)
+            if found is not None:
+                matched.setdefault(field, selector)
+                return found
+        missing[field] = missing.get(field, 0) + 1
+        return None
+
+    stop_links = set(stop_links)
+    end = len(elements) if limit is None else min(len(elements), start + limit)
+    for index in range(start, end):
+        element = elements[index]
+        found = {name: pick(element, name) for name in ("title", "link", "date", "like", "comment")}
+        absent = [name for name in ("title", "link", "date") if found[name] is None]
+        if absent:
+            result["errors"].append({"index": index, "error": "missing " + ", ".join(absent)})
+            continue
+        href = found["link"].attrs.get("href", "")
+        link = urljoin(page_url, href) if href else ""
+        if link in stop_links:
+            result["stopped"] = index
+            break
+        result["items"].append({
+            "index": index,
+            "title": found["title"].text(),
+            "link": link,
+            "date": found["date"].text(),
+            "like": found["like"].text() if found["like"] is not None else "",
+            "comment": found["comment"].text() if found["comment"] is not None else "",
+        })
+    return result
+
+
+# ── 재생 ──
+
+def load_snapshots(directory):
+    snapshots = []
+    for path in sorted(Path(directory).glob("*.json")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"스냅샷 읽기 실패 ({path}): {e}")
+            continue
+        if snapshot.get("version") == SNAPSHOT_VERSION and snapshot.get("kind") in ("dom", "api"):
+            snapshots.append((path, snapshot))
+    return snapshots
+
+
+def _normalize(post):
+    return {field: " ".join(str(post.get(field, "")).split()) for field in COMPARED_FIELDS}
+
+
+def replay_snapshot(snapshot, bot):
+    """
+    스냅샷 1개에 현재 추출 로직을 돌린다.
+    반환값: (게시글 목록 또는 None(추출 불가), 어느 후보로도 찾지 못한 필수 필드 목록(DOM 만))
+    """
+    if snapshot["kind"] == "api":
+        return bot._parse_feed_api_payload(snapshot["content"]), []
+    data = extract_feed_html(snapshot["content"], snapshot["url"], bot.FEED_SELECTORS, snapshot.get("stop_links", ()))
+    failed = [field for field in bot.REQUIRED_FEED_FIELDS if field not in data["matched"] and data["missing"].get(field)]
+    return bot._posts_from_items(data["items"]), failed
+
+
+def compare(expected, actual):
+    """
+    기록 당시 결과(expected)가 재생 결과의 앞부분과 같은지 본다.
+    (기록 때는 스캔 범위/하이워터마크에서 멈췄을 수 있어 재생 쪽이 더 길 수 있다) 반환값: 차이 설명 목록
+    """
+    if actual is None:
+        return ["게시글 목록을 찾지 못함"]
+    problems = []
+    if len(actual) < len(expected):
+        problems.append(f"게시글 수 {len(actual)} < 기록 {len(expected)}")
+    for index, (want, got) in enumerate(zip(expected, actual)):
+        want, got = _normalize(want), _normalize(got)
+        for field in COMPARED_FIELDS:
+            if want[field] != got[field]:
+                problems.append(f"{index + 1}번째 {field}: {got[field]!r} != 기록 {want[field]!r}")
+    return problems
+
+
+def replay(directory, repeat=1, bot=None):
+    """
+    코퍼스 전체를 재생해 불일치와 처리량을 정리한다.
+    drifted: 현재 FEED_SELECTORS 로 필수 필드를 찾지 못하는 DOM 스냅샷 (drift 때 기록된 스냅샷으로 새 선택자를 확인할 수 있다)
+    """
+    if bot is None:
+        import main as bot
+
+    snapshots = load_snapshots(directory)
+    mismatches = []
+    drifted = []
+    timings = {}
+    for path, snapshot in snapshots:
+        kind = snapshot["kind"]
+        started = time.perf_counter()
+        for _ in range(repeat):
+            posts, failed = replay_snapshot(snapshot, bot)
+        elapsed = time.perf_counter() - started
+        stats = timings.setdefault(kind, {"snapshots": 0, "posts": 0, "seconds": 0.0})
+        stats["snapshots"] += 1
+        stats["posts"] += len(posts or ()) * repeat
+        stats["seconds"] += elapsed
+
+        if failed:
+            drifted.append({"snapshot": path.name, "failed": failed})
+        problems = compare(snapshot.get("expected", []), posts)
+        if problems:
+            mismatches.append({"snapshot": path.name, "problems": problems[:5]})
+
+    throughput = {
+        kind: {
+            "snapshots": stats["snapshots"],
+            "parse_seconds": round(stats["seconds"], 4),
+            "snapshots_per_s": round(stats["snapshots"] * repeat / stats["seconds"], 1) if stats["seconds"] else None,
+            "posts_per_s": round(stats["posts"] / stats["seconds"], 1) if stats["seconds"] else None,
+        }
+        for kind, stats in timings.items()
+    }
+    return {
+        "directory": str(directory),
+        "snapshots": len(snapshots),
+        "repeat": repeat,
+        "mismatched": len(mismatches),
+        "throughput": throughput,
+        "mismatches": mismatches,
+        "drifted": drifted,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="피드 스냅샷 코퍼스 재생")
+    parser.add_argument("--dir", default=os.environ.get("NAVER_CORPUS_DIR", "").strip() or "corpus")
+    parser.add_argument("--repeat", type=int, default=1, help="스냅샷마다 추출을 반복할 횟수 (처리량 측정용)")
+    args = parser.parse_args()
+
+    result = replay(Path(args.dir).expanduser(), repeat=max(1, args.repeat))
+    if not result["snapshots"]:
+        print(f"스냅샷이 없습니다: {args.dir}")
+        return 0
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 1 if result["mismatched"] or result["drifted"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
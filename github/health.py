@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+HEARTBEAT_NAME = "last_run.txt"
+STATUS_NAME = "bot_status.json"
+# 실행 결과 이력 (JSON Lines, watchdog.py 가 연속 실패/성공률/소요 시간 추세를 본다)
+HISTORY_NAME = "bot_history.jsonl"
+HISTORY_LIMIT = 500
+
+
+def _atomic_write(path, content):
+    """임시 파일에 쓴 뒤 rename 으로 교체한다 (읽는 쪽이 반쯤 쓴 파일을 보지 않도록)."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class HealthStore:
+    """
+    봇 상태(heartbeat + status)의 단일 저장소.
+    정식 디렉토리 한 곳에만 원자적으로 쓰고, 예전 경로(legacy_dirs)에는 정식 파일을 가리키는
+    심볼릭 링크를 한 번 만들어 둔다 (링크를 만들 수 없는 곳만 복사본으로 갱신).
+    마지막 상태는 메모리에도 보관해 HTTP 엔드포인트가 파일을 읽지 않고 응답한다.
+    """
+
+    def __init__(self, directory, legacy_dirs=()):
+        self.directory = Path(directory)
+        self.heartbeat_file = self.directory / HEARTBEAT_NAME
+        self.status_file = self.directory / STATUS_NAME
+        self.history_file = self.directory / HISTORY_NAME
+        self.legacy_dirs = [Path(d) for d in legacy_dirs if Path(d) != self.directory]
+        self._copies = []
+        self._linked = False
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._history_lines = None
+
+    def _link_legacy(self):
+        for directory in self.legacy_dirs:
+            for name, target in ((HEARTBEAT_NAME, self.heartbeat_file), (STATUS_NAME, self.status_file)):
+                link = directory / name
+                try:
+                    if link.is_symlink() and os.readlink(link) == str(target):
+                        continue
+                    # 기존 파일은 rename 으로 한 번에 링크로 바꾼다 (잠깐이라도 파일이 없는 순간이 없도록)
+                    tmp_link = link.with_name(name + ".link.tmp")
+                    if tmp_link.is_symlink() or tmp_link.exists():
+                        tmp_link.unlink()
+                    os.symlink(target, tmp_link)
+                    os.replace(tmp_link, link)
+                except OSError as e:
+                    print(f"상태 파일 링크 생성 실패, 복사본으로 갱신 ({link}): {e}")
+                    self._copies.append((link, name))
+        self._linked = True
+
+    def write(self, payload):
+        """payload(last_run_ts/state 포함)를 기록한다. 실패하면 예외를 그대로 올린다."""
+        content = json.dumps(payload, ensure_ascii=False)
+        heartbeat = f"{payload['last_run_ts']}\n"
+        with self._lock:
+            self._snapshot = (payload["last_run_ts"], payload["state"], content.encode("utf-8"))
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # status 를 먼저 바꿔, heartbeat 가 새것이면 status 도 새것이다
+        _atomic_write(self.status_file, content)
+        _atomic_write(self.heartbeat_file, heartbeat)
+        if not self._linked:
+            self._link_legacy()
+        for path, name in self._copies:
+            try:
+                _atomic_write(path, heartbeat if name == HEARTBEAT_NAME else content)
+            except OSError as e:
+                print(f"상태 파일 복사본 갱신 실패 ({path}): {e}")
+
+    def append_history(self, entry):
+        """실행 결과 1건을 이력에 덧붙인다. HISTORY_LIMIT 의 두 배를 넘으면 최근 HISTORY_LIMIT 건만 남긴다."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self._history_lines is None:
+            self._history_lines = len(read_history(self.directory, limit=None))
+        with open(self.history_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._history_lines += 1
+        if self._history_lines > 2 * HISTORY_LIMIT:
+            recent = read_history(self.directory, limit=HISTORY_LIMIT)
+            _atomic_write(self.history_file, "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in recent))
+            self._history_lines = len(recent)
+
+    def snapshot(self):
+        """마지막으로 기록한 (last_run_ts, state, JSON bytes). 기록 전이면 None."""
+        with self._lock:
+            return self._snapshot
+
+
+def read_status(directory):
+    """
+    정식 디렉토리의 상태를 읽는다. bot_status.json 을 우선 읽고, 없거나 깨졌으면 last_run.txt 로 대체한다.
+    반환값: dict (최소 last_run_ts 포함) 또는 None
+    """
+    directory = Path(directory)
+    try:
+        with open(directory / STATUS_NAME, "r", encoding="utf-8") as f:
+            status = json.load(f)
+        if isinstance(status, dict) and "last_run_ts" in status:
+            return status
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(directory / HEARTBEAT_NAME, "r", encoding="utf-8") as f:
+            return {"last_run_ts": float(f.read().strip())}
+    except (OSError, ValueError):
+        return None
+
+
+def read_history(directory, limit=HISTORY_LIMIT):
+    """이력을 오래된 순으로 읽는다 (깨진 줄은 건너뜀). limit 이 있으면 최근 limit 건만."""
+    entries = []
+    try:
+        with open(Path(directory) / HISTORY_NAME, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict):
+                    entries.append(entry)
+    except OSError:
+        return []
+    return entries[-limit:] if limit else entries
+
+
+# ── HTTP 엔드포인트 ──
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    """/healthz: heartbeat 가 stale_seconds 이내면 200, 아니면 503 / /status: 마지막 상태 전체."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        snapshot = self.server.store.snapshot()
+        if path == "/status":
+            if snapshot is None:
+                return self._respond(503, b'{"state": null}')
+            return self._respond(200, snapshot[2])
+        if path == "/healthz":
+            if snapshot is None:
+                body = {"ok": False, "state": None, "age_seconds": None}
+            else:
+                age = time.time() - snapshot[0]
+                body = {"ok": age <= self.server.stale_seconds, "state": snapshot[1], "age_seconds": round(age, 1)}
+            return self._respond(200 if body["ok"] else 503, json.dumps(body, ensure_ascii=False).encode("utf-8"))
+        return self._respond(404, b'{"error": "not found"}')
+
+
+def start_health_server(store, host, port, stale_seconds):
+    """store 의 메모리 상태를 응답하는 HTTP 서버를 백그라운드 스레드로 띄운다. 반환값: 서버 (shutdown() 으로 종료)"""
+    server = ThreadingHTTPServer((host, port), _HealthHandler)
+    server.daemon_threads = True
+    server.store = store
+    server.stale_seconds = stale_seconds
+    threading.Thread(target=server.serve_forever, name="health-http", daemon=True).start()
+    return server
@@ -1,4 +1,7 @@
-﻿import asyncio
+﻿import argparse
+import asyncio
+import contextvars
+import copy
 import json
 import os
 import re
@@ -6,18 +9,27 @@ import shutil
 import sys
 import time
 import fcntl
+import hashlib
+import importlib.util
 import signal
+import threading
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-from telegram import Bot
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from dotenv import load_dotenv
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    # python-dotenv 가 없어도 import 는 끝내야 _check_startup 이 누락을 보고하고 DEPENDENCY_EXIT_CODE 로 끝낼 수 있다
+    def load_dotenv(*args, **kwargs):
+        return False
+
+from cookie_store import CookieStore
+from health import HealthStore, start_health_server
+from memory_governor import MemoryFloorError, MemoryGovernor, available_memory_mb
+from metrics import MetricsStore
+from post_store import Outbox, SentPostStore
+from scheduler import AdaptiveScheduler, append_arrivals
 
 
 load_dotenv()
@@ -28,11 +40,153 @@ NAVER_COOKIE = os.environ.get("NAVER_COOKIE", "").strip()
 
 BASE_DIR = Path(__file__).resolve().parent
 SENT_POSTS_FILE = BASE_DIR / "sent_posts.json"
+SENT_POSTS_LOG = BASE_DIR / "sent_posts.log"
 LAST_RUN_FILE = BASE_DIR / "last_run.txt"
 STATUS_FILE = BASE_DIR / "bot_status.json"
 COOKIE_ALERT_FILE = BASE_DIR / "cookie_alert_sent.txt"
+
+# 주소/쿠키 도메인/텔레그램 API 는 bench.py 처럼 로컬 가짜 서버로 돌릴 때만 바꾼다
+NAVER_HOME_URL = os.environ.get("NAVER_HOME_URL", "https://www.naver.com").strip()
+FEED_URL = os.environ.get("NAVER_FEED_URL", "https://section.cafe.naver.com/ca-fe/home/feed").strip()
+COOKIE_DOMAIN = os.environ.get("NAVER_COOKIE_DOMAIN", ".naver.com").strip()
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "").strip()
+
+# 피드 조회 방식: selenium / auto(HTTP 우선, 실패 시 Selenium) / http
+# HTTP 조회는 선택 사항이다: API 주소와 응답 형식(result.feeds[*].article)을 실제 응답 기록으로 확인하기 전까지 기본값은 selenium
+FEED_BACKEND = os.environ.get("NAVER_FEED_BACKEND", "selenium").strip().lower() or "selenium"
+FEED_API_URL = os.environ.get(
+    "NAVER_FEED_API_URL",
+    "https://apis.naver.com/cafe-home-web/cafe-home/v1/feeds?page=1&perPage=20",
+).strip()
+# 쿠키 사전 확인: Chrome 을 띄우기 전에 가벼운 인증 페이지로 세션 유효성을 본다 (0: 사용 안 함)
+COOKIE_PROBE = os.environ.get("NAVER_COOKIE_PROBE", "1").strip() != "0"
+COOKIE_PROBE_URL = os.environ.get("NAVER_COOKIE_PROBE_URL", "https://nid.naver.com/user2/help/myInfoV2?lang=ko_KR").strip()
+COOKIE_PROBE_TTL = int(os.environ.get("NAVER_COOKIE_PROBE_TTL", "300"))
+COOKIE_PROBE_FILE = BASE_DIR / "cookie_probe.json"
+# 실행 중 갱신된 세션 쿠키(NID_SES 등)를 보관해 다음 실행이 NAVER_COOKIE 대신 사용 (0: 끔)
+COOKIE_STORE_ENABLED = os.environ.get("NAVER_COOKIE_STORE", "1").strip() != "0"
+COOKIE_STORE_FILE = BASE_DIR / "session_cookies.json"
+# 하이워터마크(직전에 본 최신 글)가 첫 페이지에 없으면(장애 후 공백) 이 예산 안에서 다음 페이지를 더 읽는다
+FEED_PAGE_SIZE = 20
+BACKFILL_PAGES = int(os.environ.get("NAVER_BACKFILL_PAGES", "5"))
+BACKFILL_SECONDS = float(os.environ.get("NAVER_BACKFILL_SECONDS", "20"))
+# 피드 대기 방식: event(MutationObserver 1회 대기) / poll(0.5초 폴링)
+WAIT_MODE = os.environ.get("NAVER_WAIT_MODE", "event").strip().lower() or "event"
+# 게시글 추출 방식: js(execute_script 1회) / legacy(요소별 find_element)
+FEED_PARSER = os.environ.get("NAVER_FEED_PARSER", "js").strip().lower() or "js"
+# 피드 DOM 선택자: 필드별 후보를 앞에서부터 시도한다 (브라우저 추출 스크립트, 요소별 추출, corpus.py 재생이 함께 쓴다).
+# 후보를 바꾸면 FEED_SELECTORS_VERSION 을 올린다 (bot_status.json 의 stats.selectors 와 drift 알림에 남는다)
+FEED_SELECTORS_VERSION = 2
+FEED_SELECTORS = {
+    "item": ["div.feed_item", ".feed_item"],
+    "title": ["strong.title", ".title"],
+    "link": ["div.feed_content > a", ".feed_content a"],
+    "date": ["span.date", ".date"],
+    "like": ["span.count.like", ".like"],
+    "comment": ["a.comment", ".comment"],
+}
+# 이 필드를 어느 후보로도 찾지 못하면 마크업 변경(drift)으로 판정한다 (like/comment 는 0 으로 대체)
+REQUIRED_FEED_FIELDS = ("item", "title", "link", "date")
+# 문서 로드가 끝나고(complete) 진행 중인 XHR/fetch 가 없는 상태로 이 시간(초) 동안 DOM 변화가 없고
+# DRIFT_MIN_ELEMENTS 개 이상 그려졌는데 피드 항목이 없으면 타임아웃까지 기다리지 않고 drift 로 판정한다 (0: 끔)
+DRIFT_SETTLE_SECONDS = float(os.environ.get("NAVER_DRIFT_SETTLE_SECONDS", "1.5"))
+DRIFT_MIN_ELEMENTS = int(os.environ.get("NAVER_DRIFT_MIN_ELEMENTS", "50"))
+# drift 알림은 같은 실패 조합이 이 횟수만큼 연속으로 판정된 뒤에 보낸다 (일시적인 느린 로딩으로 알리지 않도록)
+DRIFT_CONFIRM_RUNS = max(1, int(os.environ.get("NAVER_DRIFT_CONFIRM_RUNS", "2")))
+DRIFT_ALERT_FILE = BASE_DIR / "drift_alert.json"
+# 피드 문서 응답이 요청 제한(403/429)이면 이 시간(초) 동안 Chrome/HTTP 조회를 건너뛴다.
+# 연속으로 제한되면 두 배씩 늘린다 (최대 THROTTLE_COOLDOWN_MAX, Retry-After 가 더 길면 그 값. 0: 끔)
+THROTTLE_COOLDOWN = int(os.environ.get("NAVER_THROTTLE_COOLDOWN", "900"))
+THROTTLE_COOLDOWN_MAX = 6 * 3600
+THROTTLE_STATE_FILE = BASE_DIR / "throttle_cooldown.json"
+# 지정하면 성공한 조회마다 피드 DOM/JSON 스냅샷을 쿠키를 지운 채 저장한다 (corpus.py 로 오프라인 재생)
+_CORPUS_DIR_ENV = os.environ.get("NAVER_CORPUS_DIR", "").strip()
+CORPUS_DIR = Path(_CORPUS_DIR_ENV).expanduser() if _CORPUS_DIR_ENV else None
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+# 영구 Chrome 프로필 (비어 있으면 사용 안 함): 쿠키를 한 번 시드한 뒤 재사용
+_PROFILE_DIR_ENV = os.environ.get("NAVER_BOT_PROFILE_DIR", "").strip()
+PROFILE_DIR = Path(_PROFILE_DIR_ENV).expanduser() if _PROFILE_DIR_ENV else None
+PROFILE_MAX_MB = int(os.environ.get("NAVER_BOT_PROFILE_MAX_MB", "200"))
+PROFILE_DISK_CACHE_BYTES = 32 * 1024 * 1024
+
+# 네트워크 요청 차단: 기본 프로필(feed)은 피드 렌더링에 필요 없는 리소스를 CDP 로 차단
+BLOCK_PROFILE = os.environ.get("NAVER_BLOCK_PROFILE", "feed").strip().lower() or "feed"
+BLOCK_EXTRA_URLS = [u.strip() for u in os.environ.get("NAVER_BLOCK_URLS", "").split(",") if u.strip()]
+# 비어 있지 않으면 이 호스트(와일드카드 가능) 외의 요청은 모두 차단
+ALLOW_HOSTS = [h.strip() for h in os.environ.get("NAVER_ALLOW_HOSTS", "").split(",") if h.strip()]
+NETWORK_STATS = os.environ.get("NAVER_NETWORK_STATS", "1").strip() != "0"
+
+# 새 글이 이 건수 이상이면 4096자 이내 다이제스트 메시지로 묶어 전송 (0: 사용 안 함)
+DIGEST_THRESHOLD = int(os.environ.get("NAVER_DIGEST_THRESHOLD", "3"))
+# 전송 이력 보존 기간(일). 이보다 오래된 링크는 다시 피드에 떠오르면 재전송된다.
+DEDUP_RETENTION_DAYS = int(os.environ.get("NAVER_DEDUP_RETENTION_DAYS", "30"))
+# 전송 대기열(outbox.log): 실패한 전송은 BACKOFF 초부터 두 배씩(최대 1시간) 늦춰 재시도, MAX_ATTEMPTS 회 실패하면 포기
+OUTBOX_BACKOFF = int(os.environ.get("NAVER_OUTBOX_BACKOFF", "60"))
+OUTBOX_BACKOFF_MAX = 3600
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("NAVER_OUTBOX_MAX_ATTEMPTS", "8"))
+
+# 데몬 모드 (--daemon): 조회 주기와 1회 사이클 제한 시간 (초)
+# 멀티 계정: JSON 배열 설정 파일. 계정마다 Chrome 하나 안에 별도 브라우저 컨텍스트를 쓴다.
+_ACCOUNTS_FILE_ENV = os.environ.get("NAVER_ACCOUNTS_FILE", "").strip()
+ACCOUNTS_FILE = Path(_ACCOUNTS_FILE_ENV).expanduser() if _ACCOUNTS_FILE_ENV else None
+ACCOUNT_CONCURRENCY = max(1, int(os.environ.get("NAVER_ACCOUNT_CONCURRENCY", "2")))
+ACCOUNT_TIMEOUT = int(os.environ.get("NAVER_ACCOUNT_TIMEOUT", "60"))
+
+# 메모리 관리 (MB, 0: 사용 안 함): 가용 메모리가 하한 미만이면 Chrome 을 띄우지 않고,
+# Chrome 프로세스 트리 RSS 가 예산을 넘으면 커널 OOM 보다 먼저 트리를 종료한다.
+MEM_FLOOR_MB = int(os.environ.get("NAVER_MEM_FLOOR_MB", "250"))
+MEM_BUDGET_MB = int(os.environ.get("NAVER_MEM_BUDGET_MB", "650"))
+
+# Prometheus textfile collector 출력 파일 (예: /var/lib/node_exporter/textfile/naver_bot.prom, 비어 있으면 사용 안 함)
+_PROM_FILE_ENV = os.environ.get("NAVER_BOT_PROM_FILE", "").strip()
+PROM_FILE = Path(_PROM_FILE_ENV).expanduser() if _PROM_FILE_ENV else None
+METRICS_STATE_FILE = BASE_DIR / "metrics_state.json"
+
+# 데몬 모드 상태 HTTP 엔드포인트 (/healthz, /status). 포트 0 이면 사용 안 함.
+HEALTH_PORT = int(os.environ.get("NAVER_BOT_HEALTH_PORT", "0"))
+HEALTH_BIND = os.environ.get("NAVER_BOT_HEALTH_BIND", "127.0.0.1").strip() or "127.0.0.1"
+# /healthz 가 정상으로 보는 heartbeat 최대 경과 시간 (초, watchdog.py 기준과 같게)
+HEALTH_STALE_SECONDS = int(os.environ.get("NAVER_BOT_HEALTH_STALE_SECONDS", "600"))
+
+DAEMON_POLL_INTERVAL = int(os.environ.get("NAVER_BOT_POLL_INTERVAL", "180"))
+DAEMON_CYCLE_TIMEOUT = int(os.environ.get("NAVER_BOT_CYCLE_TIMEOUT", "120"))
+
+# 조회 주기: fixed(cron/데몬 고정 주기) / adaptive(요일·시간별 새 글 도착률로 다음 조회 시각을 정함)
+# adaptive 에서 cron 은 1분마다 실행하고, 예정 시각 전이면 Chrome 없이 바로 종료한다.
+SCHEDULER_MODE = os.environ.get("NAVER_SCHEDULER", "fixed").strip().lower() or "fixed"
+SCHED_MIN_INTERVAL = int(os.environ.get("NAVER_SCHED_MIN_INTERVAL", "60"))
+SCHED_MAX_INTERVAL = int(os.environ.get("NAVER_SCHED_MAX_INTERVAL", "900"))
+SCHED_TARGET_POSTS = float(os.environ.get("NAVER_SCHED_TARGET_POSTS", "0.15"))
+SCHEDULE_STATE_FILE = BASE_DIR / "schedule_state.json"
+ARRIVALS_FILE = BASE_DIR / "arrivals.log"
+# 데몬이 긴 간격으로 쉬는 동안에도 watchdog 이 멈춤으로 보지 않도록 heartbeat 를 갱신하는 주기(초)
+HEARTBEAT_REFRESH_INTERVAL = 300
+
+# 무거운 모듈(selenium/telegram/httpx)은 실제로 쓰는 시점에 import 한다 (잠금 보유/예정 전/설정 누락으로
+# 바로 끝나는 실행이 import 비용을 내지 않도록). 대신 조회 전에 설치 여부만 한 번 확인한다.
+REQUIRED_MODULES = ("selenium", "telegram", "httpx", "dotenv")
+# 의존성 누락 종료 코드: run_bot_enhanced.sh 가 이 코드를 보면 패키지를 동기화하고 1회 재실행한다
+DEPENDENCY_EXIT_CODE = 3
+BINARY_CACHE_FILE = BASE_DIR / "binary_paths.json"
 _PAGE_SOURCE_LOGGED = False
 
+# 실행(데몬은 사이클) 단위 통계: bot_status.json 의 "stats" 로 기록된다.
+_RUN_STATS = {}
+# 멀티 계정 모드에서 계정 작업(태스크/작업 스레드)이 기록할 계정별 통계. 없으면 _RUN_STATS 에 기록한다.
+_ACCOUNT_STATS = contextvars.ContextVar("account_stats", default=None)
+_RUN_STARTED = time.monotonic()
+_METRICS = None
+_SCHEDULER = None
+_HEALTH = None
+_COOKIE_STORE = None
+_STARTUP = None
+# slot -> (설정 쿠키, 설정 쿠키 지문): 갱신값을 어떤 설정 쿠키 기준으로 보관할지
+_COOKIE_BASES = {}
+
 
 def _page_source_logged():
     return _PAGE_SOURCE_LOGGED
@@ -43,42 +197,318 @@ def _mark_page_source_logged():
     _PAGE_SOURCE_LOGGED = True
 
 
+def _reset_run_stats():
+    global _RUN_STARTED
+    _RUN_STATS.clear()
+    _RUN_STARTED = time.monotonic()
+
+
+def _run_stats():
+    """지금 기록할 통계: 계정 작업 안이면 그 계정의 통계, 아니면 실행 전체(_RUN_STATS)."""
+    stats = _ACCOUNT_STATS.get()
+    return _RUN_STATS if stats is None else stats
+
+
+# 계정 통계를 실행 전체 통계에 합칠 때: 목록은 이어 붙이고, 건수 dict 는 더한다 (지표/스케줄러 입력)
+_MERGED_LIST_STATS = ("spans", "waits", "backfill", "arrivals")
+_MERGED_COUNT_STATS = ("retries", "telegram", "network", "outbox")
+
+
+def _merge_account_stats(name, stats):
+    """
+    계정 1개의 통계를 _RUN_STATS["accounts"][name] 에 그대로 남기고, 누적 항목은 실행 전체 통계에 합친다.
+    판정에 쓰는 항목(response/selectors/cookie_store/memory 등)은 계정별로만 남긴다.
+    """
+    # 시간 초과로 남은 작업 스레드가 계속 쓰더라도 상태 파일에는 합친 시점의 값만 남긴다
+    stats = copy.deepcopy(stats)
+    _RUN_STATS.setdefault("accounts", {})[name] = stats
+    for key in _MERGED_LIST_STATS:
+        if key in stats:
+            _RUN_STATS.setdefault(key, []).extend(stats[key])
+    for key in _MERGED_COUNT_STATS:
+        if key not in stats:
+            continue
+        merged = _RUN_STATS.setdefault(key, {})
+        for field, value in stats[key].items():
+            if isinstance(value, list):
+                merged.setdefault(field, []).extend(value)
+            else:
+                merged[field] = merged.get(field, 0) + value
+    if "posts_sent" in stats:
+        _RUN_STATS["posts_sent"] = _RUN_STATS.get("posts_sent", 0) + stats["posts_sent"]
+
+
+def _record_span(phase, started, result=None):
+    """단계 1개의 소요 시간을 통계의 "spans" 에 남긴다. started 는 time.monotonic() 값."""
+    span = {
+        "phase": phase,
+        "start": round(started - _RUN_STARTED, 3),
+        "seconds": round(time.monotonic() - started, 3),
+    }
+    if result is not None:
+        span["result"] = result
+    _run_stats().setdefault("spans", []).append(span)
+
+
+def _count_retry(kind, count=1):
+    retries = _run_stats().setdefault("retries", {})
+    retries[kind] = retries.get(kind, 0) + count
+
+
+def _record_backfill(mark, source, pages, first_page, collected, found):
+    """하이워터마크 기준 수집 결과를 남긴다. recovered: 첫 페이지 밖에서 되찾은 글 수."""
+    recovered = collected - first_page
+    scan = {"source": source, "pages": pages, "posts": collected, "recovered": recovered, "gap_closed": found}
+    if mark.label:
+        scan["account"] = mark.label
+    _run_stats().setdefault("backfill", []).append(scan)
+    if pages > 1 or not found:
+        print(
+            f"백필({source}): {pages}페이지, 첫 페이지 밖에서 {recovered}건 복구, "
+            f"{'마지막으로 본 글까지 도달' if found else '마지막으로 본 글을 찾지 못함 (예산 초과/피드 끝)'}"
+        )
+
+
+def _cut_at_mark(posts, mark):
+    """마크에 닿기 전까지의 글만 남긴다. 반환값: (posts, 마크 도달 여부)"""
+    for index, post in enumerate(posts):
+        if mark.reached(post["link"]):
+            return posts[:index], True
+    return posts, False
+
+
+def _check_selectors(matched, missing, stage):
+    """
+    선택자 후보 체인의 결과를 stats.selectors 에 남긴다.
+    matched: 필드별로 처음 맞은 후보, missing: 필드별로 어느 후보로도 찾지 못한 항목 수, stage: wait/extract
+    필수 필드(REQUIRED_FEED_FIELDS)를 한 번도 찾지 못했으면 drift. 반환값: drift 여부
+    """
+    failed = {field: FEED_SELECTORS[field] for field in FEED_SELECTORS if field not in matched and missing.get(field)}
+    drift = any(field in failed for field in REQUIRED_FEED_FIELDS)
+    _run_stats()["selectors"] = {
+        "version": FEED_SELECTORS_VERSION,
+        "stage": stage,
+        "matched": dict(matched),
+        "failed": failed,
+        "drift": drift,
+    }
+    fallbacks = [f"{field}={selector}" for field, selector in matched.items() if selector != FEED_SELECTORS[field][0]]
+    if fallbacks:
+        print(f"대체 선택자 사용: {', '.join(fallbacks)}")
+    if failed:
+        print(
+            f"선택자 실패 ({stage}, v{FEED_SELECTORS_VERSION}): "
+            + ", ".join(f"{field}={' | '.join(chain)}" for field, chain in failed.items())
+        )
+    return drift
+
+
+def _drift_detail():
+    """이번 실행에서 피드 마크업 변경(drift)이 판정됐으면 상태 문구, 아니면 None."""
+    selectors = _run_stats().get("selectors")
+    if not selectors or not selectors["drift"]:
+        return None
+    return f"피드 마크업 변경 감지 (선택자 v{selectors['version']}, 실패: {', '.join(selectors['failed'])})"
+
+
+def _record_telegram_result(ok, seconds, retries):
+    """TelegramSender.on_result 콜백: 전송 1건의 span/결과/429 재시도 수를 남긴다."""
+    outcome = "sent" if ok else "failed"
+    _record_span("telegram_send", time.monotonic() - seconds, outcome)
+    telegram = _run_stats().setdefault("telegram", {})
+    telegram[outcome] = telegram.get(outcome, 0) + 1
+    if retries:
+        _count_retry("telegram_429", retries)
+
+
+def _export_metrics(run_state):
+    """실행 결과를 누적 지표에 더하고 Prometheus textfile 을 갱신한다 (PROM_FILE 미설정 시 생략)."""
+    global _METRICS
+    if PROM_FILE is None or run_state in ("idle", "cooldown"):
+        return
+    try:
+        if _METRICS is None:
+            _METRICS = MetricsStore(PROM_FILE, METRICS_STATE_FILE)
+        _RUN_STATS["finished_at"] = round(time.time(), 3)
+        _METRICS.record_run(run_state, time.monotonic() - _RUN_STARTED, _RUN_STATS)
+        _METRICS.save()
+    except Exception as e:
+        print(f"지표 파일 저장 실패 ({PROM_FILE}): {e}")
+
+
+# ── 조회 스케줄 ──
+
+def _get_scheduler():
+    """NAVER_SCHEDULER=adaptive 일 때만 스케줄러를 연다 (fixed 면 None)."""
+    global _SCHEDULER
+    if SCHEDULER_MODE != "adaptive":
+        return None
+    if _SCHEDULER is None:
+        _SCHEDULER = AdaptiveScheduler(
+            SCHEDULE_STATE_FILE,
+            ARRIVALS_FILE,
+            min_interval=SCHED_MIN_INTERVAL,
+            max_interval=SCHED_MAX_INTERVAL,
+            default_interval=DAEMON_POLL_INTERVAL,
+            target_posts=SCHED_TARGET_POSTS,
+        ).load()
+    return _SCHEDULER
+
+
+def _record_schedule(run_state):
+    """
+    실행 결과를 스케줄러에 반영하고 다음 조회까지의 간격(초)을 반환한다 (fixed 모드면 None).
+    성공한 조회만 도착률 학습에 쓰고, 쿠키 만료/마크업 변경/캡차(사람이 고쳐야 하는 실패)와 요청 제한은 최대 간격,
+    그 밖의 실패는 최소 간격 뒤에 다시 시도한다. 도착 기록(arrivals.log)은 모드와 관계없이 성공한 조회마다 남긴다.
+    """
+    scheduler = _get_scheduler()
+    now = time.time()
+    if scheduler is None:
+        if run_state == "ok":
+            append_arrivals(ARRIVALS_FILE, now, _RUN_STATS.get("arrivals", []))
+        return None
+    try:
+        if run_state == "ok":
+            interval = scheduler.record_poll(now, _RUN_STATS.get("arrivals", []))
+        elif run_state in ("cookie_expired", "drift", "captcha", "throttled"):
+            interval = scheduler.record_failure(now, SCHED_MAX_INTERVAL)
+        else:
+            interval = scheduler.record_failure(now)
+    except Exception as e:
+        print(f"스케줄 상태 저장 실패 ({SCHEDULE_STATE_FILE}): {e}")
+        return SCHED_MIN_INTERVAL
+    _RUN_STATS["next_run_in"] = interval
+    print(f"다음 조회: {interval:.0f}초 뒤 (적응형 스케줄)")
+    return interval
+
+
+_ALARM_SECONDS = 0
+
+
+def _arm_alarm(seconds):
+    """실행 제한 시간(SIGALRM)을 지금부터 seconds 초로 다시 건다."""
+    global _ALARM_SECONDS
+    _ALARM_SECONDS = seconds
+    signal.alarm(seconds)
+
+
 def _timeout_alarm_handler(signum, frame):
-    raise TimeoutError("main runtime timeout reached (120 seconds)")
+    raise TimeoutError(f"main runtime timeout reached ({_ALARM_SECONDS} seconds)")
+
+
+def _terminate_handler(signum, frame):
+    raise KeyboardInterrupt("SIGTERM received")
 
 
-# ?? ?좏떥由ы떚 ?⑥닔 ??
+# ── 유틸리티 함수 ──
 
-def _resolve_binary(candidates):
-    """?ㅽ뻾 媛?ν븳 諛붿씠?덈━ 寃쎈줈瑜?李얠븘 諛섑솚?쒕떎."""
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def _resolve_binary(candidates, kind=None):
+    """
+    실행 가능한 바이너리 경로를 찾아 반환한다.
+    kind 가 있으면 찾은 경로를 BINARY_CACHE_FILE 에 저장해 두고, 다음 실행은 그 경로가 여전히 실행 가능하고
+    같은 파일을 가리키는지(심볼릭 링크 대상 포함)만 확인한다. 어긋나면 후보를 다시 훑는다.
+    """
+    cache = {}
+    if kind is not None:
+        try:
+            with open(BINARY_CACHE_FILE, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            cached = cache.get(kind) or {}
+            path = cached.get("path")
+            if _is_executable(path) and os.path.realpath(path) == cached.get("real"):
+                return path
+        except (OSError, ValueError, AttributeError):
+            cache = {}
+
+    found = None
     for candidate in candidates:
         if not candidate:
             continue
         path = shutil.which(candidate)
         if path and os.path.exists(path) and os.access(path, os.X_OK):
-            return path
+            found = path
+            break
         if os.path.isabs(candidate) and os.path.exists(candidate) and os.access(candidate, os.X_OK):
-            return candidate
-    return None
+            found = candidate
+            break
+
+    if kind is not None and found:
+        cache[kind] = {"path": found, "real": os.path.realpath(found)}
+        try:
+            tmp_path = BINARY_CACHE_FILE.with_name(BINARY_CACHE_FILE.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, BINARY_CACHE_FILE)
+        except Exception as e:
+            print(f"실행 파일 경로 캐시 저장 실패: {e}")
+    return found
+
+
+def _missing_dependencies():
+    """REQUIRED_MODULES 중 설치되지 않은 모듈 (import 하지 않고 모듈 위치만 찾는다)."""
+    return [name for name in REQUIRED_MODULES if importlib.util.find_spec(name) is None]
+
+
+def _process_age_seconds():
+    """프로세스가 시작(exec)된 뒤 지난 시간 (인터프리터 기동 + import 포함). 알 수 없으면 None."""
+    try:
+        with open("/proc/self/stat", "r") as f:
+            started_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return round(uptime - started_ticks / os.sysconf("SC_CLK_TCK"), 3)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _check_startup():
+    """
+    시작 비용(프로세스 시작 ~ 조회 직전)과 의존성 확인 시간을 상태 파일의 startup 에 남긴다.
+    반환값: 누락된 모듈 목록
+    """
+    global _STARTUP
+    started = time.monotonic()
+    missing = _missing_dependencies()
+    startup = {
+        "seconds": _process_age_seconds(),
+        "deps_check_seconds": round(time.monotonic() - started, 4),
+    }
+    if missing:
+        startup["missing"] = missing
+    _STARTUP = startup
+    if startup["seconds"] is not None:
+        print(f"시작 준비: {startup['seconds']:.2f}초")
+    return missing
 
 
 def _resolve_health_targets():
-    """heartbeat/status ?뚯씪??湲곕줉???꾨낫 ?붾젆?좊━瑜??먯깋?쒕떎."""
+    """
+    상태 파일의 정식 디렉토리(NAVER_BOT_HEALTH_DIR, 없으면 BASE_DIR)와
+    예전부터 heartbeat/status 를 읽던 경로(링크를 둘 디렉토리)를 찾는다.
+    반환값: (canonical_dir, legacy_dirs)
+    """
+    env_health_dir = os.environ.get("NAVER_BOT_HEALTH_DIR", "").strip()
+    canonical_dir = Path(env_health_dir).expanduser() if env_health_dir else BASE_DIR
+    try:
+        canonical_dir = canonical_dir.resolve()
+    except Exception:
+        pass
+
     candidate_dirs = [
         BASE_DIR,
         BASE_DIR.parent,
         Path.cwd(),
     ]
 
-    env_health_dir = os.environ.get("NAVER_BOT_HEALTH_DIR", "").strip()
-    if env_health_dir:
-        candidate_dirs.append(Path(env_health_dir).expanduser())
-
     env_heartbeat_file = os.environ.get("NAVER_BOT_HEARTBEAT_FILE", "").strip()
     if env_heartbeat_file:
         candidate_dirs.append(Path(env_heartbeat_file).expanduser().resolve().parent)
 
-    # github ?섏쐞 ?붾젆?좊━???꾨낫??異붽?
+    # github 하위 디렉토리도 후보에 추가
     candidate_dirs.extend([
         BASE_DIR / "github",
         BASE_DIR.parent / "github",
@@ -86,7 +516,7 @@ def _resolve_health_targets():
     ])
 
     resolved = []
-    seen = set()
+    seen = {str(canonical_dir)}
     for candidate in candidate_dirs:
         try:
             candidate = candidate.resolve()
@@ -100,16 +530,36 @@ def _resolve_health_targets():
         if candidate.exists() and candidate.is_dir():
             resolved.append(candidate)
 
-    if not resolved:
-        resolved = [BASE_DIR]
+    return canonical_dir, resolved
+
 
-    heartbeat_files = [path / "last_run.txt" for path in resolved]
-    status_files = [path / "bot_status.json" for path in resolved]
-    return heartbeat_files, status_files
+def _get_health_store():
+    global _HEALTH
+    if _HEALTH is None:
+        canonical_dir, legacy_dirs = _resolve_health_targets()
+        _HEALTH = HealthStore(canonical_dir, legacy_dirs)
+    return _HEALTH
 
 
-def update_health_files(run_state, run_detail):
-    """遊??곹깭瑜?heartbeat(last_run.txt)? status(bot_status.json)??湲곕줉?쒕떎."""
+def _append_run_history(run_state, run_detail):
+    """실행(데몬은 사이클) 1회의 결과를 이력에 남긴다. 조회 없이 끝난 idle/cooldown 실행은 제외한다."""
+    if run_state in ("idle", "running", "cooldown"):
+        return
+    entry = {
+        "ts": round(time.time(), 3),
+        "state": run_state,
+        "detail": run_detail,
+        "seconds": round(time.monotonic() - _RUN_STARTED, 3),
+        "posts": _RUN_STATS.get("posts_sent", 0),
+    }
+    try:
+        _get_health_store().append_history(entry)
+    except Exception as e:
+        print(f"실행 이력 저장 실패: {e}")
+
+
+def update_health_files(run_state, run_detail, accounts=None):
+    """봇 상태를 heartbeat(last_run.txt)와 status(bot_status.json)에 기록한다. 멀티 계정이면 계정별 상태도 남긴다."""
     now_ts = time.time()
     now_utc = datetime.now(timezone.utc).isoformat()
 
@@ -121,63 +571,45 @@ def update_health_files(run_state, run_detail):
         "script_path": str(Path(__file__).resolve()),
         "cwd": str(Path.cwd()),
         "pid": os.getpid(),
+        "stats": _RUN_STATS,
     }
-
-    heartbeat_files, status_files = _resolve_health_targets()
-    wrote = []
-
-    for heartbeat_file in heartbeat_files:
-        try:
-            heartbeat_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(heartbeat_file, "w", encoding="utf-8") as f:
-                f.write(f"{now_ts}\n")
-            wrote.append(str(heartbeat_file))
-        except Exception as e:
-            print(f"heartbeat ?뚯씪 ????ㅽ뙣 ({heartbeat_file}): {e}")
-
-    for status_file in status_files:
-        try:
-            status_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(status_file, "w", encoding="utf-8") as f:
-                json.dump(payload, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"?곹깭 ?뚯씪 ????ㅽ뙣 ({status_file}): {e}")
-
-    if wrote:
-        print(f"heartbeat 媛깆떊: {', '.join(wrote)}")
-    else:
-        print("heartbeat 媛깆떊 ?ㅽ뙣: ??λ맂 寃쎈줈媛 ?놁뒿?덈떎.")
-
-
-# ?? 寃뚯떆湲 ???濡쒕뱶 ??
-
-def load_sent_posts():
-    """?댁쟾???꾩넚??寃뚯떆湲 紐⑸줉??濡쒕뱶?쒕떎."""
-    if not SENT_POSTS_FILE.exists():
-        return []
+    if _STARTUP is not None:
+        payload["startup"] = _STARTUP
+    if accounts:
+        payload["accounts"] = {
+            account["name"]: {
+                "state": account["state"],
+                "detail": account["detail"],
+                "updated_at": account["updated_at"],
+            }
+            for account in accounts
+        }
+
+    # 정식 디렉토리 한 곳에만 원자적으로 쓴다 (예전 경로는 정식 파일을 가리키는 링크)
+    store = _get_health_store()
     try:
-        with open(SENT_POSTS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        store.write(payload)
+        print(f"heartbeat 갱신: {store.heartbeat_file}")
     except Exception as e:
-        print(f"sent_posts 濡쒕뱶 ?ㅽ뙣: {e}")
-        return []
+        print(f"heartbeat/상태 파일 저장 실패 ({store.directory}): {e}")
+
 
+# ── 게시글 저장/로드 ──
 
-def save_sent_posts(posts):
-    """?꾩넚??寃뚯떆湲 紐⑸줉????ν븳?? 理쒕? 500媛쒓퉴吏 ?좎?."""
+def load_sent_posts():
+    """전송 이력 저장소를 연다. 예전 sent_posts.json 이 있으면 자동으로 변환한다."""
+    store = SentPostStore(SENT_POSTS_LOG, retention_days=DEDUP_RETENTION_DAYS, legacy_path=SENT_POSTS_FILE)
     try:
-        if len(posts) > 500:
-            posts = posts[-500:]
-        with open(SENT_POSTS_FILE, "w", encoding="utf-8") as f:
-            json.dump(posts, f, ensure_ascii=False, indent=2)
+        store.load()
     except Exception as e:
-        print(f"sent_posts ????ㅽ뙣: {e}")
+        print(f"sent_posts 로드 실패: {e}")
+    return store
 
 
-# ?? 荑좏궎 ?뚯떛 ??
+# ── 쿠키 파싱 ──
 
 def _parse_cookie_pairs(raw_cookie):
-    """?몃?肄쒕줎?쇰줈 援щ텇??荑좏궎 臾몄옄?댁쓣 (key, value) ?쒗뵆 由ъ뒪?몃줈 蹂?섑븳??"""
+    """세미콜론으로 구분된 쿠키 문자열을 (key, value) 튜플 리스트로 변환한다."""
     pairs = []
     for pair in raw_cookie.split(";"):
         if "=" not in pair:
@@ -193,65 +625,92 @@ def _is_chromedriver_connection_issue(message):
     return "connection refused" in lowered or "no such session" in lowered
 
 
-# ?? ?쒓컙 ?뚯떛 ??
+# ── 시간 파싱 ──
+
+def _parse_relative_time(time_str, now):
+    """'5분 전' 같은 상대 시간 문자열을 datetime 으로 바꾼다. 형식을 모르면 now."""
+    if "방금" in time_str:
+        return now
+    if "분 전" in time_str:
+        return now - timedelta(minutes=int(re.search(r"(\d+)분", time_str).group(1)))
+    if "시간 전" in time_str:
+        return now - timedelta(hours=int(re.search(r"(\d+)시간", time_str).group(1)))
+    if "일 전" in time_str:
+        return now - timedelta(days=int(re.search(r"(\d+)일", time_str).group(1)))
+    return now
+
 
 def parse_time_string(time_str):
-    """?ㅼ씠踰?移댄럹???곷? ?쒓컙 臾몄옄?댁쓣 ?덈? ?쒓컙 ?뺤떇?쇰줈 蹂?섑븳??"""
+    """네이버 카페의 상대 시간 문자열을 절대 시간 형식으로 변환한다."""
     KST = timezone(timedelta(hours=9))
     now = datetime.now(KST)
     time_str = (time_str or "").strip()
 
     try:
-        if "諛⑷툑" in time_str:
-            dt = now
-        elif "遺??? in time_str:
-            minutes = int(re.search(r"(\d+)遺?, time_str).group(1))
-            dt = now - timedelta(minutes=minutes)
-        elif "?쒓컙 ?? in time_str:
-            hours = int(re.search(r"(\d+)?쒓컙", time_str).group(1))
-            dt = now - timedelta(hours=hours)
-        elif "???? in time_str:
-            days = int(re.search(r"(\d+)??, time_str).group(1))
-            dt = now - timedelta(days=days)
-        else:
-            dt = now
-
-        ampm = "?ㅼ쟾" if dt.hour < 12 else "?ㅽ썑"
-        hour = dt.hour if dt.hour <= 12 else dt.hour - 12
-        hour = 12 if hour == 0 else hour
-        return f"{ampm} {hour}:{dt.minute:02d}"
+        return _format_clock(_parse_relative_time(time_str, now))
     except Exception as e:
-        print(f"?쒓컙 ?뚯떛 ?ㅽ뙣 ({time_str}): {e}")
-        ampm = "?ㅼ쟾" if now.hour < 12 else "?ㅽ썑"
-        hour = now.hour if now.hour <= 12 else now.hour - 12
-        hour = 12 if hour == 0 else hour
-        return f"{ampm} {hour}:{now.minute:02d}"
-
+        print(f"시간 파싱 실패 ({time_str}): {e}")
+        return _format_clock(now)
 
-# ?? ?붾젅洹몃옩 ?꾩넚 ??
 
-async def send_telegram_message(message):
-    """?붾젅洹몃옩?쇰줈 硫붿떆吏瑜??꾩넚?쒕떎. 20珥???꾩븘???곸슜."""
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-        print("?붾젅洹몃옩 ?ㅼ젙???꾨씫?섏뼱 ?덉뒿?덈떎.")
-        return
+def _post_written_at(post):
+    """게시글 작성 시각(unix time) 추정치. HTTP 응답은 절대 시각, 화면 추출은 상대 시간이며 모르면 지금."""
+    KST = timezone(timedelta(hours=9))
+    now = datetime.now(KST)
+    date_text = (post.get("date") or "").strip()
     try:
-        bot = Bot(token=TELEGRAM_BOT_TOKEN)
-        await asyncio.wait_for(
-            bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message),
-            timeout=20,
-        )
-        print(f"?붾젅洹몃옩 ?꾩넚: {message[:20]}...")
-    except asyncio.TimeoutError:
-        print("?붾젅洹몃옩 ?꾩넚 ??꾩븘??20珥?")
-    except Exception as e:
-        print(f"?붾젅洹몃옩 ?꾩넚 ?ㅽ뙣: {e}")
+        return datetime.strptime(date_text, "%Y.%m.%d %H:%M").replace(tzinfo=KST).timestamp()
+    except ValueError:
+        pass
+    try:
+        return _parse_relative_time(date_text, now).timestamp()
+    except Exception:
+        return now.timestamp()
+
+
+def _format_clock(dt):
+    """datetime 을 '오후 3:05' 형식으로 변환한다."""
+    ampm = "오전" if dt.hour < 12 else "오후"
+    hour = dt.hour if dt.hour <= 12 else dt.hour - 12
+    hour = 12 if hour == 0 else hour
+    return f"{ampm} {hour}:{dt.minute:02d}"
+
+
+# ── 텔레그램 전송 ──
+
+_TELEGRAM = None
+# 전송 이력 파일별 대기열: {sent_posts 경로: Outbox}
+_OUTBOXES = {}
+
+
+def _get_telegram():
+    """실행(데몬은 프로세스) 동안 공유하는 TelegramSender 를 반환한다."""
+    global _TELEGRAM
+    if _TELEGRAM is None:
+        from telegram_client import TelegramSender
+
+        _TELEGRAM = TelegramSender(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, base_url=TELEGRAM_API_URL or None)
+        _TELEGRAM.on_result = _record_telegram_result
+    return _TELEGRAM
+
+
+async def _close_telegram():
+    global _TELEGRAM
+    if _TELEGRAM is not None:
+        await _TELEGRAM.close()
+        _TELEGRAM = None
+
+
+async def send_telegram_message(message, chat_id=None):
+    """텔레그램으로 메시지를 전송한다. 20초 타임아웃, 429 시 retry_after 준수. 성공 여부를 반환."""
+    return await _get_telegram().send(message, chat_id)
 
 
-# ?? Chrome ?쒕씪?대쾭 ?앹꽦 ??
+# ── Chrome 드라이버 생성 ──
 
-def _build_driver():
-    """?ㅻ뱶由ъ뒪 Chrome ?쒕씪?대쾭瑜??앹꽦?섍퀬 諛섑솚?쒕떎."""
+def _build_driver(profile_dir=None):
+    """헤드리스 Chrome 드라이버를 생성하고 반환한다. profile_dir 가 있으면 영구 프로필을 사용한다."""
+    started = time.monotonic()
     chrome_binary = _resolve_binary([
         "google-chrome",
         "google-chrome-stable",
@@ -263,18 +722,29 @@ def _build_driver():
         "/usr/bin/chromium-browser",
         "/usr/bin/chromium",
         "/usr/bin/chrome",
-    ])
+    ], kind="chrome")
     if not chrome_binary:
-        raise FileNotFoundError("Chrome 釉뚮씪?곗? ?ㅽ뻾 ?뚯씪??李얠? 紐삵뻽?듬땲??")
+        raise FileNotFoundError("Chrome 브라우저 실행 파일을 찾지 못했습니다.")
 
     chromedriver_path = _resolve_binary([
         "chromedriver",
         "/usr/bin/chromedriver",
         "/usr/bin/chromium-chromedriver",
         "/usr/local/bin/chromedriver",
-    ])
+    ], kind="chromedriver")
     if not chromedriver_path:
-        raise FileNotFoundError("chromedriver ?ㅽ뻾 ?뚯씪??李얠? 紐삵뻽?듬땲??")
+        raise FileNotFoundError("chromedriver 실행 파일을 찾지 못했습니다.")
+
+    available_mb = available_memory_mb()
+    memory = _run_stats().setdefault("memory", {})
+    memory["available_mb_at_launch"] = available_mb
+    if MEM_FLOOR_MB and available_mb is not None and available_mb < MEM_FLOOR_MB:
+        memory["refused"] = True
+        raise MemoryFloorError(f"가용 메모리 {available_mb}MB < 하한 {MEM_FLOOR_MB}MB: Chrome 실행을 보류합니다.")
+
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
 
     options = Options()
     options.add_argument("--headless=new")
@@ -282,10 +752,7 @@ def _build_driver():
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--disable-gpu")
     options.add_argument("--window-size=1920,1080")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    )
+    options.add_argument(f"user-agent={USER_AGENT}")
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
@@ -294,302 +761,2319 @@ def _build_driver():
     options.add_argument("--disable-infobars")
     options.add_argument("--disable-extensions")
     options.add_argument("--disable-software-rasterizer")
-    # 硫붾え由??덉빟 ?듭뀡 (1GB ?쒕쾭 ?섍꼍 理쒖쟻??
+    # 메모리 절약 옵션 (1GB 서버 환경 최적화)
     options.add_argument("--disable-background-networking")
     options.add_argument("--blink-settings=imagesEnabled=false")
     options.add_argument("--log-level=3")
+    if ALLOW_HOSTS:
+        # 허용 호스트 외에는 DNS 단계에서 차단 (요청 자체가 나가지 않음)
+        excludes = ", ".join(f"EXCLUDE {host}" for host in ALLOW_HOSTS)
+        options.add_argument(f"--host-resolver-rules=MAP * ~NOTFOUND, {excludes}")
+    # 성능 로그(CDP Network 이벤트): 피드 문서 응답 분류에 항상 쓰고, NETWORK_STATS 면 요청 통계도 낸다
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
     options.binary_location = chrome_binary
     options.page_load_strategy = "eager"
 
+    if profile_dir is not None:
+        options.add_argument(f"--user-data-dir={profile_dir}")
+        options.add_argument(f"--disk-cache-size={PROFILE_DISK_CACHE_BYTES}")
+
     service = Service(chromedriver_path)
     driver = webdriver.Chrome(service=service, options=options)
-    # ?섏씠吏 濡쒕뵫/?ㅽ겕由쏀듃 ?ㅽ뻾 ??꾩븘??(臾댄븳 ?湲?諛⑹?)
+    _install_webdriver_counter(driver)
+    driver.memory_governor = _start_memory_governor(driver)
+    # 페이지 로딩/스크립트 실행 타임아웃 (무한 대기 방지)
     driver.set_page_load_timeout(45)
     driver.set_script_timeout(45)
 
-    # navigator.webdriver ?띿꽦???④꺼 ?먮룞???먯? ?고쉶
+    # navigator.webdriver 속성을 숨겨 자동화 탐지 우회
     driver.execute_cdp_cmd(
         "Page.addScriptToEvaluateOnNewDocument",
         {"source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"},
     )
+    driver.block_phase = None
+    driver.block_enabled = bool(_blocked_patterns("warmup") or _blocked_patterns("feed"))
+    if driver.block_enabled:
+        driver.execute_cdp_cmd("Network.enable", {})
+    _record_span("driver_build", started)
     return driver
 
 
-# ?? ?λ룞???湲? URL 蹂寃??먮뒗 ?쇰뱶 ?붿냼 媛먯? ??
-
-def _wait_url_or_feed(driver, timeout=25):
-    """
-    timeout ?숈븞 ?대쭅?섎ŉ URL 蹂寃?濡쒓렇??由щ떎?대젆?? ?먮뒗 ?쇰뱶 ?붿냼 異쒗쁽??媛먯??쒕떎.
-    """
-    poll_interval = 0.5
-    end_time = time.time() + timeout
-    while time.time() < end_time:
-        try:
-            current = driver.current_url
-            if "nid.naver.com" in current or "nidlogin" in current:
-                return "login"
-            if driver.find_elements(By.CSS_SELECTOR, "div.feed_item"):
-                return "ready"
-        except Exception:
-            pass
-        time.sleep(poll_interval)
-    return "timeout"
+# ── 메모리 관리 ──
 
+def _start_memory_governor(driver):
+    """chromedriver 이하 프로세스 트리의 RSS 감시를 시작한다."""
+    try:
+        root_pid = driver.service.process.pid
+    except AttributeError:
+        return None
+    # 감시 스레드는 계정 ContextVar 를 물려받지 않으므로 이 실행(계정)의 통계를 여기서 묶어 둔다
+    stats = _run_stats()
+    governor = MemoryGovernor(root_pid, budget_mb=MEM_BUDGET_MB, on_exceeded=lambda info: _on_memory_exceeded(stats, info))
+    governor.start()
+    return governor
+
+
+def _on_memory_exceeded(stats, info):
+    # 감시 스레드에서 호출된다: 트리는 이미 종료됐고, 메인 스레드의 다음 WebDriver 호출이 연결 오류로 끝난다.
+    print(f"메모리 한도 초과: Chrome 프로세스 트리 {info['rss_mb']}MB > {MEM_BUDGET_MB}MB, 강제 종료했습니다.")
+    stats.setdefault("memory", {})["aborted"] = info
+
+
+def _collect_memory_stats(driver):
+    """감시 표본을 이번 실행 전체/단계(span)별 최대 RSS 로 정리해 통계의 "memory" 에 넣는다."""
+    governor = getattr(driver, "memory_governor", None)
+    if governor is None:
+        return
+    memory = _run_stats().setdefault("memory", {})
+    memory["budget_mb"] = MEM_BUDGET_MB
+    memory["peak_mb"] = governor.peak_between(_RUN_STARTED, time.monotonic())
+    phases = {}
+    for span in _run_stats().get("spans", ()):
+        started = _RUN_STARTED + span["start"]
+        peak = governor.peak_between(started, started + span["seconds"] + governor.interval)
+        if peak is not None and peak > phases.get(span["phase"], 0):
+            phases[span["phase"]] = peak
+    memory["phases"] = phases
+
+
+def _memory_failure_detail():
+    """메모리 하한/예산 때문에 실패했으면 상태 파일용 설명을, 아니면 None 을 반환한다."""
+    memory = _run_stats().get("memory") or {}
+    if memory.get("aborted"):
+        return f"메모리 한도 초과로 중단 ({memory['aborted']['rss_mb']}MB)"
+    if memory.get("refused"):
+        return f"가용 메모리 부족으로 실행 보류 ({memory.get('available_mb_at_launch')}MB)"
+    return None
 
-# ?? 荑좏궎 ?곸슜 ??
 
-def _apply_cookies(driver, cookie_pairs):
-    """?쒕씪?대쾭??荑좏궎瑜??쇨큵 ?곸슜?쒕떎."""
-    for key, value in cookie_pairs:
+# ── 네트워크 요청 차단/계측 ──
+
+# 광고/트래킹/폰트/이미지: 어떤 단계에서도 피드 렌더링에 필요 없음
+_BLOCK_COMMON = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.mp4",
+    "*ssl.pstatic.net/tveta/*",
+    "*ssl.pstatic.net/melona/*",
+    "*ssl.pstatic.net/static.gn/*",
+    "*ntm.pstatic.net/*",
+    "*phinf.pstatic.net/*",
+    "*veta.naver.com/*",
+    "*nlog.naver.com/*",
+    "*lcs.naver.com/*",
+    "*googletagmanager.com/*",
+    "*google-analytics.com/*",
+    "*doubleclick.net/*",
+]
+
+# phase: warmup = 쿠키 적용용 naver.com 방문 (문서만 필요), feed = 카페 피드
+_BLOCK_PROFILES = {
+    "feed": {
+        "warmup": _BLOCK_COMMON + ["*.js*", "*.css*", "*naver.com/api/*", "*.nhn*"],
+        "feed": _BLOCK_COMMON,
+    },
+    "off": {"warmup": [], "feed": []},
+}
+
+
+def _blocked_patterns(phase):
+    profile = _BLOCK_PROFILES.get(BLOCK_PROFILE, _BLOCK_PROFILES["feed"])
+    return profile.get(phase, []) + BLOCK_EXTRA_URLS
+
+
+def _navigate(driver, url, phase):
+    """phase 에 맞는 차단 목록을 적용한 뒤 url 로 이동한다."""
+    if getattr(driver, "block_enabled", False) and driver.block_phase != phase:
+        patterns = _blocked_patterns(phase)
         try:
-            driver.add_cookie({"name": key, "value": value, "domain": ".naver.com"})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
         except Exception as e:
-            print(f"荑좏궎 ?깅줉 ?ㅽ뙣 ({key}): {e}")
-
+            if _is_chromedriver_connection_issue(str(e)):
+                raise
+            print(f"요청 차단 목록 적용 실패: {e}")
+        driver.block_phase = phase
+    started = time.monotonic()
+    driver.get(url)
+    _record_span("naver_home" if phase == "warmup" else "feed_navigate", started)
 
-# ?? ?쇰뱶 寃뚯떆湲 ?섏쭛 ??
 
-def get_feed_posts():
+def _read_performance_log(driver):
     """
-    ?ㅼ씠踰?移댄럹 ?쇰뱶?먯꽌 寃뚯떆湲???섏쭛?쒕떎.
-    諛섑솚媛? (posts, cookie_expired, fetch_ok)
+    성능 로그(CDP Network 이벤트)를 비우고 메시지 목록을 돌려준다.
+    비운 이벤트는 다시 읽을 수 없으므로 NETWORK_STATS 면 여기서 요청 수/전송 바이트/차단 수를 누적한다.
     """
-    if not NAVER_COOKIE:
-        print("NAVER_COOKIE媛 ?ㅼ젙?섏? ?딆븯?듬땲??")
-        return [], False, False
-
-    cookie_pairs = _parse_cookie_pairs(NAVER_COOKIE)
-    if not cookie_pairs:
-        print("NAVER_COOKIE ?뺤떇???좏슚?섏? ?딆뒿?덈떎.")
-        return [], False, False
-
-    driver = None
-    posts = []
-    cookie_expired = False
-    fetch_ok = False
-
     try:
-        driver = _build_driver()
+        entries = driver.get_log("performance")
     except Exception as e:
-        print(f"?쒕씪?대쾭 珥덇린???ㅽ뙣: {e}")
-        return posts, cookie_expired, False
-
-    try:
-        print(f"荑좏궎 媛쒖닔: {len(cookie_pairs)}")
+        if _is_chromedriver_connection_issue(str(e)):
+            raise
+        return []
 
-        # ?? 1?④퀎: ?ㅼ씠踰??꾨찓???뺣낫 + 荑좏궎 ?곸슜 ??
-        driver.get("https://www.naver.com")
+    messages = []
+    for entry in entries:
         try:
-            WebDriverWait(driver, 10).until(
-                lambda d: d.execute_script("return document.readyState") in ("interactive", "complete")
-            )
+            messages.append(json.loads(entry["message"])["message"])
         except Exception:
-            pass
-
-        _apply_cookies(driver, cookie_pairs)
-
-        # ?? 2?④퀎: 荑좏궎 ?쒖꽦??(naver.com ?щ갑臾? ??
-        driver.get("https://www.naver.com")
-        time.sleep(1)
-
-        # ?? 3?④퀎: 移댄럹 ?쇰뱶濡??대룞 + ?λ룞???湲???
-        driver.get("https://section.cafe.naver.com/ca-fe/home/feed")
-        result = _wait_url_or_feed(driver, timeout=15)
-        print(f"珥덇린 吏꾩엯 寃곌낵: {result}, URL={driver.current_url}")
-
-        # ?? 濡쒓렇??由щ떎?대젆????1???ъ떆????
-        if result == "login":
-            print("濡쒓렇???섏씠吏濡?由щ떎?대젆?몃맖: 荑좏궎 ?ъ쟻????1???ъ떆??)
-            _apply_cookies(driver, cookie_pairs)
-            driver.get("https://www.naver.com")
-            time.sleep(1)
-            _apply_cookies(driver, cookie_pairs)
-            driver.get("https://section.cafe.naver.com/ca-fe/home/feed")
-            result = _wait_url_or_feed(driver, timeout=20)
-            print(f"?ъ떆??吏꾩엯 寃곌낵: {result}, URL={driver.current_url}")
-
-        # ?? 理쒖쥌 寃곌낵 ?먯젙 ??
-        if result == "login":
-            cookie_expired = True
-            return [], cookie_expired, True
-        if result == "timeout":
-            print("?쇰뱶 而⑦뀒?대꼫 ?먯깋 ?ㅽ뙣: ?붿냼/由щ떎?대젆???먯젙 紐⑤몢 ?놁쓬")
-            return [], cookie_expired, False
-
-        fetch_ok = True
-        elements = driver.find_elements(By.CSS_SELECTOR, "div.feed_item")
-        print(f"寃뚯떆湲 議고쉶 ?? {len(elements)}")
-
-        if len(elements) == 0:
-            if not _page_source_logged():
-                print("No feed items found. Page source snippet:")
-                print(driver.page_source[:1000])
-                _mark_page_source_logged()
+            continue
+    _track_pending_requests(driver, messages)
+    if not NETWORK_STATS:
+        return messages
+
+    stats = _run_stats().setdefault("network", {"requests": 0, "bytes": 0, "blocked": 0, "failed": 0})
+    for message in messages:
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            stats["requests"] += 1
+        elif method == "Network.loadingFinished":
+            stats["bytes"] += int(params.get("encodedDataLength") or 0)
+        elif method == "Network.loadingFailed":
+            if params.get("blockedReason"):
+                stats["blocked"] += 1
             else:
-                print(f"[skip] page source log skipped (URL={driver.current_url})")
+                stats["failed"] += 1
+    return messages
 
-        # ?? 寃뚯떆湲 ?뚯떛 ??
-        for el in elements[:20]:
-            try:
-                title_el = el.find_element(By.CSS_SELECTOR, "strong.title")
-                link_el = el.find_element(By.CSS_SELECTOR, "div.feed_content > a")
-                date_el = el.find_element(By.CSS_SELECTOR, "span.date")
-
-                like_count = "0"
-                comment_count = "0"
-
-                try:
-                    like_el = el.find_element(By.CSS_SELECTOR, "span.count.like")
-                    like_match = re.search(r"(\d+)", (like_el.text or "").strip())
-                    if like_match:
-                        like_count = like_match.group(1)
-                except Exception:
-                    pass
-
-                try:
-                    comment_el = el.find_element(By.CSS_SELECTOR, "a.comment")
-                    comment_match = re.search(r"(\d+)", (comment_el.text or "").strip())
-                    if comment_match:
-                        comment_count = comment_match.group(1)
-                except Exception:
-                    pass
-
-                title = (title_el.text or "").strip()
-                link = (link_el.get_attribute("href") or "").strip()
-                date_text = (date_el.text or "").strip()
-
-                if title and link:
-                    posts.append({
-                        "title": title,
-                        "link": link,
-                        "date": date_text,
-                        "absolute_time": parse_time_string(date_text),
-                        "like": like_count,
-                        "comment": comment_count,
-                    })
-            except Exception as e:
-                print(f"寃뚯떆湲 異붿텧 ?ㅽ뙣: {e}")
 
-    except Exception as e:
-        if _is_chromedriver_connection_issue(str(e)):
-            print(f"ChromeDriver connection issue (possible OOM): {e}")
-        else:
-            print(f"피드 조회 실패: {e}")
-        fetch_ok = False
-    finally:
-        if driver is not None:
+def _track_pending_requests(driver, messages):
+    """
+    끝나지 않은 XHR/fetch 요청을 driver.pending_requests({requestId: 시작 시각})에 유지한다.
+    피드 데이터 요청이 느린 것을 마크업 변경(drift)으로 오판하지 않도록 drift 판정 전에 확인한다.
+    """
+    pending = getattr(driver, "pending_requests", None)
+    if pending is None:
+        pending = {}
+        try:
+            driver.pending_requests = pending
+        except Exception:
+            return
+    for message in messages:
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.requestWillBeSent" and params.get("type") in ("XHR", "Fetch"):
+            pending[params.get("requestId")] = time.monotonic()
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            pending.pop(params.get("requestId"), None)
+
+
+def _network_busy(driver):
+    """성능 로그를 읽어 진행 중인 XHR/fetch 요청이 남아 있으면 True."""
+    _read_performance_log(driver)
+    return bool(getattr(driver, "pending_requests", None))
+
+
+def _collect_network_stats(driver):
+    """남은 성능 로그를 비우며 요청 통계를 마무리한다."""
+    _read_performance_log(driver)
+
+
+# ── 영구 Chrome 프로필 ──
+
+# 프로필에서 지워도 로그인 세션에 영향이 없는 캐시 디렉토리
+_PROFILE_CACHE_DIRS = (
+    "Default/Cache",
+    "Default/Code Cache",
+    "Default/GPUCache",
+    "Default/DawnCache",
+    "Default/Service Worker/CacheStorage",
+    "Default/Service Worker/ScriptCache",
+    "GrShaderCache",
+    "GraphiteDawnCache",
+    "ShaderCache",
+    "component_crx_cache",
+)
+_PROFILE_SINGLETON_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie")
+_PROFILE_SEED_FILE = "naver_bot_seed.json"
+
+
+def _cookie_fingerprint(cookie_pairs):
+    joined = ";".join(f"{key}={value}" for key, value in cookie_pairs)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
+def _dir_size_bytes(path):
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
             try:
-                driver.quit()
-            except Exception:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
                 pass
+    return total
 
-    return posts, cookie_expired, fetch_ok
+
+def _profile_is_corrupt(profile_dir):
+    """Chrome 이 남긴 JSON 설정 파일이 깨졌는지 확인한다."""
+    for relative in ("Local State", "Default/Preferences"):
+        path = profile_dir / relative
+        if not path.exists():
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                json.load(f)
+        except Exception:
+            return True
+    return False
 
 
-# ?? 硫붿씤 ?ㅽ뻾 ??
+def _reset_profile(profile_dir, reason):
+    print(f"영구 프로필 초기화 ({reason}): {profile_dir}")
+    shutil.rmtree(profile_dir, ignore_errors=True)
+    profile_dir.mkdir(parents=True, exist_ok=True)
 
-async def main():
-    if sys.platform == "win32":
-        print("Windows ?섍꼍?먯꽌??蹂??ㅽ겕由쏀듃 ?ㅽ뻾???쒗븳?⑸땲??")
-        update_health_files("skipped", "windows_not_supported")
+
+def _prune_profile(profile_dir):
+    """프로필이 PROFILE_MAX_MB 를 넘으면 캐시를 지우고, 그래도 넘으면 초기화한다."""
+    limit = PROFILE_MAX_MB * 1024 * 1024
+    size = _dir_size_bytes(profile_dir)
+    if size <= limit:
         return
 
-    run_state = "running"
-    run_detail = "?쒖옉"
-    timeout_scheduled = False
+    for relative in _PROFILE_CACHE_DIRS:
+        shutil.rmtree(profile_dir / relative, ignore_errors=True)
+    pruned = _dir_size_bytes(profile_dir)
+    print(f"영구 프로필 캐시 정리: {size // 1048576}MB -> {pruned // 1048576}MB")
+    if pruned > limit:
+        _reset_profile(profile_dir, f"정리 후에도 {pruned // 1048576}MB")
+
+
+def _open_profile(cookie_pairs):
+    """
+    PROFILE_DIR 을 잠그고 사용할 준비를 한다. 설정이 없거나 다른 프로세스가 사용 중이면 None.
+    반환값: {"dir", "lock", "seeded"}
+    """
+    if PROFILE_DIR is None:
+        return None
 
     lock_file = None
     try:
-        lock_path = BASE_DIR / "bot.lock"
-        lock_file = open(str(lock_path), "w")
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        lock_file = open(str(PROFILE_DIR) + ".lock", "w")
         fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
-    except IOError:
-        print("?대? ?ㅽ뻾 以묒엯?덈떎. 以묐났 ?ㅽ뻾??李⑤떒?⑸땲??")
+    except Exception as e:
+        print(f"영구 프로필 잠금 실패, 임시 프로필로 실행합니다: {e}")
         if lock_file is not None:
             lock_file.close()
-        return
-    except Exception as e:
-        print(f"???뚯씪 ?ㅼ젙 ?ㅽ뙣: {e}")
+        return None
+
+    # 락을 잡았으므로 이 프로필을 쓰는 Chrome 은 없다: 강제 종료가 남긴 잠금 파일 제거
+    for name in _PROFILE_SINGLETON_FILES:
+        try:
+            os.unlink(PROFILE_DIR / name)
+        except OSError:
+            pass
 
+    if _profile_is_corrupt(PROFILE_DIR):
+        _reset_profile(PROFILE_DIR, "설정 파일 손상")
+    _prune_profile(PROFILE_DIR)
+
+    seeded = False
     try:
-        signal.signal(signal.SIGALRM, _timeout_alarm_handler)
-        signal.alarm(120)
-        timeout_scheduled = True
+        with open(PROFILE_DIR / _PROFILE_SEED_FILE, "r", encoding="utf-8") as f:
+            seeded = json.load(f).get("cookie_sha256") == _cookie_fingerprint(cookie_pairs)
+    except Exception:
+        pass
+    return {"dir": PROFILE_DIR, "lock": lock_file, "seeded": seeded}
 
-        KST = timezone(timedelta(hours=9))
-        now = datetime.now(KST)
-        print("\n" + "=" * 50)
-        print(f"?ㅽ뻾 ?쒖옉: {now.strftime('%Y-%m-%d %H:%M:%S')} (KST)")
-        print("=" * 50)
-        print("?ㅼ씠踰?移댄럹 ?쇰뱶 議고쉶 ?쒖옉 (Selenium Headless)")
 
-        update_health_files("running", "?쇰뱶 ?섏쭛 ?쒖옉")
+def _update_profile_seed(profile, cookie_pairs, result):
+    """피드 진입 결과에 따라 프로필의 쿠키 시드 표시를 갱신한다."""
+    if profile is None:
+        return
+    seed_path = profile["dir"] / _PROFILE_SEED_FILE
+    try:
+        if result == "ready" and not profile["seeded"]:
+            with open(seed_path, "w", encoding="utf-8") as f:
+                json.dump({"cookie_sha256": _cookie_fingerprint(cookie_pairs), "seeded_at": time.time()}, f)
+            profile["seeded"] = True
+            print("영구 프로필 시드 완료: 다음 실행부터 쿠키 적용 단계를 건너뜁니다.")
+        elif result == "login" and profile["seeded"]:
+            seed_path.unlink()
+            profile["seeded"] = False
+    except Exception as e:
+        print(f"영구 프로필 시드 기록 실패: {e}")
 
-        sent_posts = load_sent_posts()
-        print(f"湲곗〈 sent_posts: {len(sent_posts)}")
 
-        posts, cookie_expired, fetch_ok = get_feed_posts()
+def _close_profile(profile):
+    if profile is None:
+        return
+    try:
+        _prune_profile(profile["dir"])
+    except Exception as e:
+        print(f"영구 프로필 정리 실패: {e}")
+    try:
+        profile["lock"].close()
+    except Exception:
+        pass
 
-        if not fetch_ok:
-            run_state = "error"
-            run_detail = "?쇰뱶 議고쉶 ?ㅽ뙣"
-            print("?쇰뱶 議고쉶 ?ㅽ뙣濡?醫낅즺?⑸땲??")
-            return
 
-        if cookie_expired:
-            run_state = "cookie_expired"
-            run_detail = "荑좏궎 留뚮즺"
-            send_alert = True
-            today = datetime.now(KST).strftime("%Y-%m-%d")
-            if COOKIE_ALERT_FILE.exists():
-                try:
-                    with open(COOKIE_ALERT_FILE, "r", encoding="utf-8") as f:
-                        if f.read().strip() == today:
-                            send_alert = False
-                except Exception:
-                    pass
-
-            if send_alert:
-                alert_msg = (
-                    "?좑툘 [湲닿툒] ?ㅼ씠踰?荑좏궎媛 留뚮즺?섏뿀?듬땲??\n\n"
-                    "遊뉗씠 ???댁긽 ?뺤긽 ?섏쭛?????놁뒿?덈떎.\n"
-                    "PC?먯꽌 ?ㅼ씠踰?移댄럹 濡쒓렇??????荑좏궎瑜?蹂듭궗?섏뿬 .env??媛깆떊?댁＜?몄슂."
-                )
-                await send_telegram_message(alert_msg)
-                try:
-                    with open(COOKIE_ALERT_FILE, "w", encoding="utf-8") as f:
-                        f.write(today)
-                except Exception as e:
-                    print(f"荑좏궎 ?뚮┝ 湲곕줉 ?ㅽ뙣: {e}")
-            return
+# ── 브라우저 세션 ──
 
-        if not posts:
-            run_state = "ok"
-            run_detail = "?좉퇋 寃뚯떆湲 0嫄?
-            print("?덈줈??寃뚯떆湲???녾굅???섏쭛?섏? ?딆븯?듬땲??")
-            return
+def _open_browser(cookie_pairs):
+    """
+    Chrome 을 띄우고 세션 정보를 반환한다. 영구 프로필로 실행이 실패하면 프로필을 초기화해 1회 재시도한다.
+    반환값: {"driver", "profile", "warm"}  warm=True 면 쿠키 적용 없이 피드로 바로 진입한다.
+    """
+    profile = _open_profile(cookie_pairs)
+    if profile is None:
+        return {"driver": _build_driver(), "profile": None, "warm": False}
 
-        new_posts_count = 0
-        for post in reversed(posts):
-            link = post["link"]
-            if link in sent_posts:
-                continue
+    try:
+        driver = _build_driver(profile["dir"])
+    except FileNotFoundError:
+        _close_profile(profile)
+        raise
+    except Exception as e:
+        print(f"영구 프로필로 Chrome 실행 실패 (프로필 손상 의심): {e}")
+        _reset_profile(profile["dir"], "Chrome 실행 실패")
+        profile["seeded"] = False
+        _count_retry("profile_reset")
+        try:
+            driver = _build_driver(profile["dir"])
+        except Exception:
+            _close_profile(profile)
+            raise
+    return {"driver": driver, "profile": profile, "warm": profile["seeded"]}
 
-            msg = f"{post['absolute_time']}\n{post['title']}\n{post['link']}\n醫뗭븘??{post['like']} ?볤? {post['comment']}"
-            await send_telegram_message(msg)
-            sent_posts.append(link)
-            new_posts_count += 1
-            time.sleep(1)
 
-        if new_posts_count > 0:
-            save_sent_posts(sent_posts)
-            run_state = "ok"
-            run_detail = f"??湲 {new_posts_count}嫄?
-            print(f"--> {new_posts_count}嫄??꾩넚 ?꾨즺.")
+def _close_browser(session):
+    """드라이버를 종료하고 프로필 잠금을 푼다."""
+    if session is None:
+        return
+    session["driver"] = _quit_driver(session.get("driver"))
+    _close_profile(session.get("profile"))
+    session["profile"] = None
+
+
+# ── 능동적 대기: URL 변경 또는 피드 요소 감지 ──
+
+# document 변경을 MutationObserver 로 구독하다가 피드 요소(후보 중 하나)가 생기거나, 로그인 페이지이거나,
+# 문서가 내려가면(pagehide: 리다이렉트 진행 중) 즉시 결과를 돌려준다.
+# 문서 로드가 끝난(complete) 뒤 settleMs 동안 변화 없이 minElements 개 이상 그려졌는데 피드 요소가 없으면 settled:
+# 호출 측이 성능 로그로 진행 중인 XHR/fetch 가 없는지 확인한 뒤에야 drift 로 판정한다
+# (헤더만 그려 두고 피드 데이터를 기다리는 SPA 는 요청이 끝날 때까지 다시 기다린다)
+_WAIT_FEED_JS = """
+const chain = arguments[0];
+const timeoutMs = arguments[1];
+const settleMs = arguments[2];
+const minElements = arguments[3];
+const done = arguments[arguments.length - 1];
+let finished = false;
+let observer = null;
+let timer = null;
+let settleTimer = null;
+const check = function () {
+  if (location.host.indexOf('nid.naver.com') >= 0 || location.href.indexOf('nidlogin') >= 0) return 'login';
+  for (let i = 0; i < chain.length; i++) {
+    if (document.querySelector(chain[i])) return 'ready';
+  }
+  return null;
+};
+const finish = function (result) {
+  if (finished) return;
+  finished = true;
+  if (observer) observer.disconnect();
+  if (timer) clearTimeout(timer);
+  if (settleTimer) clearTimeout(settleTimer);
+  window.removeEventListener('pagehide', onHide);
+  done(result);
+};
+const onHide = function () { finish('navigating'); };
+const armSettle = function () {
+  if (!settleMs) return;
+  if (settleTimer) clearTimeout(settleTimer);
+  settleTimer = setTimeout(function () {
+    if (document.readyState === 'complete' && document.getElementsByTagName('*').length >= minElements) finish('settled');
+    else armSettle();
+  }, settleMs);
+};
+const initial = check();
+if (initial) {
+  finish(initial);
+  return;
+}
+window.addEventListener('pagehide', onHide);
+observer = new MutationObserver(function () {
+  const result = check();
+  if (result) finish(result);
+  else armSettle();
+});
+observer.observe(document, {childList: true, subtree: true});
+timer = setTimeout(function () { finish('timeout'); }, timeoutMs);
+armSettle();
+"""
+
+
+def _is_login_url(url):
+    return "nid.naver.com" in url or "nidlogin" in url
+
+
+def _wait_url_or_feed(driver, timeout=25):
+    """
+    로그인 리다이렉트 또는 피드 요소 출현을 감지한다.
+    브라우저 안의 MutationObserver 가 결과를 줄 때까지 한 번의 execute_async_script 로 기다린다.
+    반환값: login/ready/drift/timeout
+    """
+    if WAIT_MODE == "poll":
+        return _poll_url_or_feed(driver, timeout)
+
+    started = time.monotonic()
+    deadline = started + timeout
+    result = "timeout"
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                if _is_login_url(driver.current_url):
+                    result = "login"
+                    break
+                driver.set_script_timeout(remaining + 5)
+                outcome = driver.execute_async_script(
+                    _WAIT_FEED_JS, FEED_SELECTORS["item"], int(remaining * 1000),
+                    int(DRIFT_SETTLE_SECONDS * 1000), DRIFT_MIN_ELEMENTS,
+                )
+            except Exception as e:
+                if _is_chromedriver_connection_issue(str(e)):
+                    raise
+                # 문서 교체 중에는 스크립트 결과가 유실될 수 있다: URL 부터 다시 확인
+                outcome = "navigating"
+                time.sleep(0.2)
+            if outcome == "settled":
+                # 화면은 멈췄지만 피드 데이터 요청이 아직 끝나지 않았으면 다시 기다린다
+                if _network_busy(driver):
+                    continue
+                outcome = "drift"
+            if outcome in ("login", "ready", "drift", "timeout"):
+                result = outcome
+                break
+    finally:
+        try:
+            driver.set_script_timeout(45)
+        except Exception:
+            pass
+
+    _record_wait(result, time.monotonic() - started, "event")
+    return result
+
+
+def _poll_url_or_feed(driver, timeout=25):
+    """
+    timeout 동안 폴링하며 URL 변경(로그인 리다이렉트) 또는 피드 요소 출현을 감지한다 (비교용).
+    문서 로드가 끝나고 DOM 요소 수가 DRIFT_SETTLE_SECONDS 동안 그대로인데, 진행 중인 XHR/fetch 도 없고 피드 요소가 없으면 drift.
+    """
+    from selenium.webdriver.common.by import By
+
+    started = time.monotonic()
+    poll_interval = 0.5
+    end_time = time.time() + timeout
+    result = "timeout"
+    stable_count = None
+    stable_since = None
+    while time.time() < end_time:
+        try:
+            current = driver.current_url
+            if _is_login_url(current):
+                result = "login"
+                break
+            if any(driver.find_elements(By.CSS_SELECTOR, selector) for selector in FEED_SELECTORS["item"]):
+                result = "ready"
+                break
+            if DRIFT_SETTLE_SECONDS > 0:
+                ready_state, count = driver.execute_script(
+                    "return [document.readyState, document.getElementsByTagName('*').length]"
+                )
+                if ready_state != "complete" or count < DRIFT_MIN_ELEMENTS or count != stable_count:
+                    stable_count, stable_since = count, time.monotonic()
+                elif time.monotonic() - stable_since >= DRIFT_SETTLE_SECONDS:
+                    if _network_busy(driver):
+                        stable_since = time.monotonic()
+                    else:
+                        result = "drift"
+                        break
+        except Exception:
+            pass
+        time.sleep(poll_interval)
+
+    _record_wait(result, time.monotonic() - started, "poll")
+    return result
+
+
+def _record_wait(result, elapsed, mode):
+    print(f"대기 결과 {result}: {elapsed:.2f}초 (wait={mode})")
+    if result == "drift":
+        _check_selectors({}, {"item": 1}, "wait")
+    _record_span("feed_wait", time.monotonic() - elapsed, result)
+    _run_stats().setdefault("waits", []).append({
+        "outcome": result,
+        "seconds": round(elapsed, 3),
+        "mode": mode,
+    })
+
+
+# ── 피드 문서 응답 분류 (CDP Network 이벤트) ──
+
+# 로그인 리다이렉트 외에 기다리지 않고 바로 끝낼 결과 -> 상태 설명 (결과 이름이 그대로 run_state 가 된다)
+_RESPONSE_FAILURES = {
+    "captcha": "캡차 페이지",
+    "throttled": "요청 제한",
+    "server_error": "서버 오류/점검",
+    "network_error": "네트워크 오류",
+}
+_CAPTCHA_URL_MARKERS = ("captcha",)
+_MAINTENANCE_URL_MARKERS = ("inspection", "maintenance")
+
+
+def _document_response(messages):
+    """
+    성능 로그에서 처음 시작된 최상위 문서 요청(type=Document, requestId == loaderId)의 리다이렉트 체인과 최종 응답을 찾는다.
+    반환값: {"url", "status", "redirects": [{"url", "status"}], "headers", "error"}  (문서 요청이 없으면 None)
+    """
+    document = None
+    request_id = None
+    for message in messages:
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            if request_id is None:
+                if params.get("type") != "Document" or params.get("requestId") != params.get("loaderId"):
+                    continue
+                request_id = params["requestId"]
+                document = {"url": None, "status": None, "redirects": [], "headers": {}, "error": None}
+            elif params.get("requestId") != request_id:
+                continue
+            # 리다이렉트마다 같은 requestId 로 다시 오며, 직전 응답이 redirectResponse 에 담긴다
+            redirect = params.get("redirectResponse")
+            if redirect:
+                document["redirects"].append({"url": redirect.get("url"), "status": redirect.get("status")})
+            document["url"] = params.get("request", {}).get("url")
+        elif request_id is not None and params.get("requestId") == request_id:
+            if method == "Network.responseReceived":
+                response = params.get("response", {})
+                document["url"] = response.get("url") or document["url"]
+                document["status"] = response.get("status")
+                document["headers"] = response.get("headers") or {}
+            elif method == "Network.loadingFailed" and not params.get("blockedReason"):
+                # ERR_ABORTED: 다음 이동(스크립트 리다이렉트 등)이 문서 로드를 대체한 것으로 실패가 아니다
+                if params.get("errorText") != "net::ERR_ABORTED":
+                    document["error"] = params.get("errorText") or "loading failed"
+    return document
+
+
+def _classify_document(document):
+    """문서 응답을 ok/login/captcha/throttled/server_error/network_error 로 분류한다."""
+    if document["error"]:
+        return "network_error"
+    urls = [(hop["url"] or "") for hop in document["redirects"]] + [document["url"] or ""]
+    status = document["status"] or 0
+    if any(marker in url.lower() for url in urls for marker in _CAPTCHA_URL_MARKERS):
+        return "captcha"
+    if status == 401 or any(_is_login_url(url) for url in urls):
+        return "login"
+    if status in (403, 429):
+        return "throttled"
+    if status >= 400 or any(marker in url.lower() for url in urls for marker in _MAINTENANCE_URL_MARKERS):
+        return "server_error"
+    return "ok"
+
+
+def _retry_after(headers):
+    """Retry-After 헤더(초 단위)를 읽는다. 없거나 날짜 형식이면 None."""
+    value = next((value for name, value in (headers or {}).items() if name.lower() == "retry-after"), None)
+    try:
+        return max(0, int(str(value).strip()))
+    except (TypeError, ValueError):
+        return None
+
+
+def _record_response(source, result, url, status, redirects=(), error=None):
+    """피드 응답 분류 결과를 stats.response 에 남긴다 (source: browser/http/probe)."""
+    response = {"source": source, "result": result, "url": url, "status": status}
+    if redirects:
+        response["redirects"] = list(redirects)
+    if error:
+        response["error"] = error
+    _run_stats()["response"] = response
+    if result != "ok":
+        print(f"피드 응답 분류: {result} (source={source}, status={status}, url={url}{', ' + error if error else ''})")
+
+
+def _response_failure():
+    """이번 실행이 응답 분류(_RESPONSE_FAILURES)로 끝났으면 (run_state, detail), 아니면 None."""
+    response = _run_stats().get("response")
+    if not response or response["result"] not in _RESPONSE_FAILURES:
+        return None
+    cause = response.get("error") or f"HTTP {response['status']}"
+    return response["result"], f"{_RESPONSE_FAILURES[response['result']]} ({cause})"
+
+
+def _open_feed(driver, timeout, url=None):
+    """
+    피드로 이동해 최상위 문서 응답(상태 코드/리다이렉트 체인)부터 분류한다.
+    정상 응답일 때만 피드 요소/로그인 리다이렉트를 기다리고, 그 밖에는 기다리지 않고 분류 결과를 돌려준다.
+    반환값: ready/login/drift/timeout 또는 _RESPONSE_FAILURES 의 키
+    """
+    url = url or FEED_URL
+    # 이전 단계(naver.com 방문)의 이벤트는 비워 두고, 이번 이동의 이벤트만 본다
+    _read_performance_log(driver)
+    driver.pending_requests = {}
+    try:
+        _navigate(driver, url, "feed")
+    except Exception as e:
+        message = str(e)
+        if _is_chromedriver_connection_issue(message):
+            raise
+        if "net::ERR_" not in message and type(e).__name__ != "TimeoutException":
+            raise
+        _record_response("browser", "network_error", url, None, error=message.strip().splitlines()[0][:200])
+        return "network_error"
+
+    document = _document_response(_read_performance_log(driver))
+    if document is None:
+        # 성능 로그를 못 읽었으면 예전처럼 피드 요소/리다이렉트를 기다려 판정한다
+        return _wait_url_or_feed(driver, timeout)
+    result = _classify_document(document)
+    _record_response("browser", result, document["url"], document["status"], document["redirects"], document["error"])
+    if result == "throttled":
+        _start_cooldown(f"HTTP {document['status']}", _retry_after(document["headers"]))
+    if result != "ok":
+        return result
+    return _wait_url_or_feed(driver, timeout)
+
+
+# ── 요청 제한 쿨다운 (THROTTLE_STATE_FILE) ──
+
+def _load_cooldown():
+    try:
+        with open(THROTTLE_STATE_FILE, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else None
+    except (OSError, ValueError):
+        return None
+
+
+def _cooldown_remaining():
+    """요청 제한 쿨다운 중이면 (남은 초, 사유), 아니면 None."""
+    state = _load_cooldown()
+    if not state:
+        return None
+    remaining = float(state.get("until", 0)) - time.time()
+    return (remaining, state.get("reason", "")) if remaining > 0 else None
+
+
+def _start_cooldown(reason, retry_after=None):
+    """
+    요청 제한을 기록하고 쿨다운을 시작한다. 성공 없이 다시 제한되면 THROTTLE_COOLDOWN 의 두 배씩 늘린다.
+    Retry-After 가 더 길면 그 값을 따른다 (둘 다 THROTTLE_COOLDOWN_MAX 까지).
+    """
+    if THROTTLE_COOLDOWN <= 0:
+        return
+    state = _load_cooldown() or {}
+    strikes = int(state.get("strikes", 0)) + 1
+    seconds = min(THROTTLE_COOLDOWN * 2 ** (strikes - 1), THROTTLE_COOLDOWN_MAX)
+    if retry_after:
+        seconds = max(seconds, min(retry_after, THROTTLE_COOLDOWN_MAX))
+    now = time.time()
+    # 이미 더 긴 쿨다운(Retry-After 등)이 걸려 있으면 줄이지 않는다
+    until = max(now + seconds, float(state.get("until", 0)))
+    state = {"until": round(until, 3), "reason": reason, "strikes": strikes, "started_at": round(now, 3)}
+    try:
+        tmp_path = THROTTLE_STATE_FILE.with_name(THROTTLE_STATE_FILE.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, THROTTLE_STATE_FILE)
+    except OSError as e:
+        print(f"쿨다운 기록 실패 ({THROTTLE_STATE_FILE}): {e}")
+    _run_stats()["cooldown"] = {"seconds": seconds, "strikes": strikes, "reason": reason}
+    print(f"요청 제한({reason}): {seconds}초 동안 조회를 쉽니다 ({strikes}회 연속)")
+
+
+def _clear_cooldown():
+    """조회에 성공하면 연속 제한 횟수를 초기화한다."""
+    if not THROTTLE_STATE_FILE.exists():
+        return
+    try:
+        THROTTLE_STATE_FILE.unlink()
+        print("요청 제한 해제")
+    except OSError as e:
+        print(f"쿨다운 기록 삭제 실패 ({THROTTLE_STATE_FILE}): {e}")
+
+
+# ── 쿠키 적용 ──
+
+def _apply_cookies(driver, cookie_pairs):
+    """드라이버에 쿠키를 일괄 적용한다."""
+    started = time.monotonic()
+    for key, value in cookie_pairs:
+        try:
+            driver.add_cookie({"name": key, "value": value, "domain": COOKIE_DOMAIN})
+        except Exception as e:
+            print(f"쿠키 등록 실패 ({key}): {e}")
+    _record_span("cookie_apply", started)
+
+
+# ── HTTP 피드 조회 (Selenium 없이) ──
+
+# 계정(slot)별 httpx.Client: {slot: (쿠키 키, client)}
+_HTTP_CLIENTS = {}
+
+# 피드 항목 필드: result.feeds[*].article 의 키 (카페 정보는 형제 객체 cafe 에 있고, 없으면 article 에서 찾는다)
+_API_TITLE_KEYS = ("subject", "title")
+_API_ARTICLE_ID_KEYS = ("articleId",)
+_API_CAFE_URL_KEYS = ("cafeUrl",)
+_API_CAFE_ID_KEYS = ("cafeId", "clubId")
+_API_TIMESTAMP_KEYS = ("writeDateTimestamp",)
+_API_LIKE_KEYS = ("likeItCount",)
+_API_COMMENT_KEYS = ("commentCount",)
+
+
+def _get_http_client(cookie_pairs, slot="default"):
+    """쿠키가 적용된 httpx.Client 를 slot(계정)별로 재사용한다 (쿠키가 바뀌면 새로 만든다)."""
+    import httpx
+
+    key = tuple(cookie_pairs)
+    cached = _HTTP_CLIENTS.get(slot)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    if cached is not None:
+        cached[1].close()
+    client = httpx.Client(
+        headers={
+            "User-Agent": USER_AGENT,
+            "Accept": "application/json, text/plain, */*",
+            "Referer": FEED_URL,
+            "Origin": "https://section.cafe.naver.com",
+        },
+        timeout=httpx.Timeout(10.0, connect=5.0),
+        follow_redirects=False,
+    )
+    for name, value in cookie_pairs:
+        client.cookies.set(name, value, domain=COOKIE_DOMAIN)
+    _HTTP_CLIENTS[slot] = (key, client)
+    return client
+
+
+def _first_value(keys, *sources):
+    for source in sources:
+        for key in keys:
+            value = source.get(key)
+            if value not in (None, ""):
+                return value
+    return None
+
+
+def _api_feed_entries(payload):
+    """
+    응답의 피드 목록 result.feeds (message 로 한 번 감싼 형태 포함). 형식이 다르면 None.
+    다른 위치의 글 목록(관련 글/추천 글 등)은 피드 항목이 아니므로 찾아 들어가지 않는다.
+    """
+    if not isinstance(payload, dict):
+        return None
+    envelope = payload.get("message", payload)
+    result = envelope.get("result") if isinstance(envelope, dict) else None
+    feeds = result.get("feeds") if isinstance(result, dict) else None
+    return feeds if isinstance(feeds, list) else None
+
+
+def _parse_feed_api_payload(payload):
+    """피드 JSON 의 result.feeds[*].article 을 get_feed_posts() 와 같은 형식의 게시글 목록으로 변환한다. 인식 실패 시 None."""
+    feeds = _api_feed_entries(payload)
+    if feeds is None:
+        return None
+
+    KST = timezone(timedelta(hours=9))
+    posts = []
+    for feed in feeds[:20]:
+        article = feed.get("article") if isinstance(feed, dict) else None
+        if not isinstance(article, dict):
+            continue
+        cafe = feed.get("cafe") if isinstance(feed.get("cafe"), dict) else {}
+        article_id = _first_value(_API_ARTICLE_ID_KEYS, article)
+        title = str(_first_value(_API_TITLE_KEYS, article) or "").strip()
+        cafe_url = _first_value(_API_CAFE_URL_KEYS, cafe, article)
+        cafe_id = _first_value(_API_CAFE_ID_KEYS, cafe, article)
+        if not article_id or not title:
+            continue
+        if cafe_url:
+            link = f"https://cafe.naver.com/{cafe_url}/{article_id}"
+        elif cafe_id:
+            link = f"https://cafe.naver.com/ca-fe/cafes/{cafe_id}/articles/{article_id}"
+        else:
+            continue
+
+        timestamp = _first_value(_API_TIMESTAMP_KEYS, article)
+        try:
+            timestamp = float(timestamp)
+            if timestamp > 1e12:
+                timestamp /= 1000.0
+            written = datetime.fromtimestamp(timestamp, KST)
+        except (TypeError, ValueError, OverflowError, OSError):
+            written = datetime.now(KST)
+
+        posts.append({
+            "title": title,
+            "link": link,
+            "date": written.strftime("%Y.%m.%d %H:%M"),
+            "absolute_time": _format_clock(written),
+            "like": str(_first_value(_API_LIKE_KEYS, article) or 0),
+            "comment": str(_first_value(_API_COMMENT_KEYS, article) or 0),
+            # 이름형 링크와 카페ID형 링크를 같은 글로 묶기 위한 별칭 정보
+            "cafe_name": str(cafe_url or ""),
+            "club_id": str(cafe_id or ""),
+        })
+    return posts
+
+
+def _feed_api_page_url(page):
+    """FEED_API_URL 의 page 파라미터만 바꾼 주소."""
+    parts = urlsplit(FEED_API_URL)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != "page"]
+    query.insert(0, ("page", str(page)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _fetch_feed_http(cookie_pairs, slot="default", mark=None):
+    """
+    피드 페이지가 호출하는 JSON API 를 직접 조회한다.
+    mark 가 있으면 그 글에서 멈추고, 첫 페이지에 없으면 BACKFILL_PAGES/BACKFILL_SECONDS 안에서 다음 페이지를 읽는다.
+    반환값: (posts, result)  result: ready/login/throttled/error
+    """
+    posts, result = _fetch_feed_api_page(cookie_pairs, slot, 1)
+    if result != "ready" or not mark:
+        return posts, result
+
+    deadline = time.monotonic() + BACKFILL_SECONDS
+    posts, found = _cut_at_mark(posts, mark)
+    first_page = len(posts)
+    pages = 1
+    while not found and pages <= BACKFILL_PAGES and time.monotonic() < deadline:
+        page_posts, page_result = _fetch_feed_api_page(cookie_pairs, slot, pages + 1)
+        if page_result != "ready" or not page_posts:
+            break
+        pages += 1
+        page_posts, found = _cut_at_mark(page_posts, mark)
+        posts.extend(page_posts)
+    _record_backfill(mark, "http", pages, first_page, len(posts), found)
+    return posts, "ready"
+
+
+def _fetch_feed_api_page(cookie_pairs, slot, page):
+    """
+    피드 JSON API 1페이지를 조회한다. 응답은 브라우저 문서 응답과 같은 규칙(_classify_document)으로 분류해
+    stats.response 에 남긴다: 401/로그인 리다이렉트는 login, 403/429 는 throttled(쿨다운 시작).
+    반환값: (posts, result)  result: ready/login/error 또는 _RESPONSE_FAILURES 의 키
+    """
+    url = FEED_API_URL if page == 1 else _feed_api_page_url(page)
+    started = time.monotonic()
+    try:
+        response = _get_http_client(cookie_pairs, slot).get(url)
+    except Exception as e:
+        print(f"HTTP 피드 조회 실패: {e}")
+        _record_span("http_fetch", started, "error")
+        _record_response("http", "network_error", url, None, error=str(e).strip().splitlines()[0][:200] if str(e) else type(e).__name__)
+        return [], "network_error"
+    _record_span("http_fetch", started, str(response.status_code))
+
+    status = response.status_code
+    location = response.headers.get("location", "")
+    document = {
+        "url": location or str(response.url),
+        "status": status,
+        "redirects": [{"url": str(response.url), "status": status}] if location else [],
+        "error": None,
+    }
+    result = _classify_document(document)
+    if result == "ok" and status != 200:
+        result = "error"
+    _record_response("http", result, document["url"], status, document["redirects"])
+    if result == "throttled":
+        _start_cooldown(f"HTTP {status}", _retry_after(response.headers))
+        return [], result
+    if result == "login":
+        print(f"HTTP 피드 조회: 인증 실패 (status={status})")
+        return [], result
+    if result != "ok":
+        return [], result
+
+    try:
+        payload = response.json()
+        posts = _parse_feed_api_payload(payload)
+    except ValueError as e:
+        print(f"HTTP 피드 응답 파싱 실패: {e}")
+        _record_response("http", "error", str(response.url), status, error=f"JSON 파싱 실패: {e}"[:200])
+        return [], "error"
+    if posts is None:
+        print("HTTP 피드 응답에서 게시글 목록을 찾지 못했습니다.")
+        _record_response("http", "error", str(response.url), status, error="result.feeds 없음")
+        return [], "error"
+    if CORPUS_DIR is not None:
+        _record_corpus("api", str(response.url), payload, posts, cookie_pairs)
+
+    print(f"HTTP 게시글 조회 수: {len(posts)} ({len(response.content)} bytes, page={page})")
+    return posts, "ready"
+
+
+def _try_http_backend(cookie_pairs, slot="default", mark=None):
+    """
+    FEED_BACKEND 설정에 따라 HTTP 조회를 시도한다.
+    반환값: (posts, result)  result 가 None 이면 Selenium 으로 넘어가야 한다.
+    """
+    if FEED_BACKEND not in ("auto", "http"):
+        return [], None
+
+    posts, result = _fetch_feed_http(cookie_pairs, slot, mark)
+    if result == "ready":
+        _clear_cooldown()
+        _remember_cookie_state(cookie_pairs, "valid")
+        # follow_redirects=False 라도 응답의 Set-Cookie 는 클라이언트 쿠키에 반영된다
+        client = _HTTP_CLIENTS[slot][1]
+        _harvest_cookies(slot, [(c.name, c.value) for c in client.cookies.jar if _is_session_cookie_domain(c.domain)], "HTTP")
+    # 요청 제한이면 Chrome 으로 다시 두드리지 않는다
+    if result in ("ready", "throttled") or FEED_BACKEND == "http":
+        return posts, result
+    print(f"HTTP 조회 결과 {result}: Selenium 으로 대체합니다.")
+    return [], None
+
+
+# ── 갱신된 세션 쿠키 보관 ──
+
+def _get_cookie_store():
+    global _COOKIE_STORE
+    if _COOKIE_STORE is None:
+        _COOKIE_STORE = CookieStore(COOKIE_STORE_FILE).load()
+    return _COOKIE_STORE
+
+
+def _is_session_cookie_domain(domain):
+    base = COOKIE_DOMAIN.lstrip(".")
+    domain = (domain or "").lstrip(".")
+    return domain == base or domain.endswith("." + base)
+
+
+def _session_cookie_pairs(base_pairs, slot="default"):
+    """
+    설정 쿠키에 쿠키 저장소의 갱신값을 덮어써 이번 실행에 쓸 쿠키를 만든다.
+    영구 프로필(기본 slot)은 프로필이 쿠키를 직접 보관하므로 설정 쿠키를 그대로 쓴다.
+    """
+    if not COOKIE_STORE_ENABLED or not base_pairs or (PROFILE_DIR is not None and slot == "default"):
+        return base_pairs
+    base_key = _cookie_fingerprint(base_pairs)
+    _COOKIE_BASES[slot] = (base_pairs, base_key)
+    try:
+        pairs, info = _get_cookie_store().resolve(slot, base_pairs, base_key)
+    except Exception as e:
+        print(f"쿠키 저장소 읽기 실패, 설정 쿠키로 진행합니다: {e}")
+        return base_pairs
+    if info is None:
+        return pairs
+
+    _run_stats().setdefault("cookie_store", {})[slot] = info
+    if info["rotated"]:
+        print(
+            f"쿠키 저장소 사용: {', '.join(info['rotated'])} 갱신값 "
+            f"(가장 오래된 값 {int(info['age_seconds'] // 60)}분 전, 마지막 저장 {int(info['harvested_seconds'] // 60)}분 전)"
+        )
+    return pairs
+
+
+def _harvest_cookies(slot, cookies, source):
+    """피드 조회에 성공한 세션의 쿠키 (name, value) 중 갱신된 값을 저장소에 반영한다."""
+    base = _COOKIE_BASES.get(slot)
+    if base is None:
+        return
+    try:
+        changed = _get_cookie_store().harvest(slot, base[0], base[1], cookies)
+    except Exception as e:
+        print(f"갱신된 쿠키 저장 실패: {e}")
+        return
+    if changed:
+        print(f"갱신된 쿠키 저장 ({source}): {', '.join(changed)}")
+        _run_stats().setdefault("cookie_store", {}).setdefault(slot, {})["harvested"] = changed
+
+
+def _harvest_browser_cookies(driver, slot):
+    try:
+        cookies = driver.get_cookies()
+    except Exception as e:
+        print(f"브라우저 쿠키 읽기 실패: {e}")
+        return
+    _harvest_cookies(
+        slot, [(c["name"], c["value"]) for c in cookies if _is_session_cookie_domain(c.get("domain"))], "browser"
+    )
+
+
+def _discard_session_cookies(slot):
+    """만료로 판정된 세션의 갱신값을 버린다. 다음 실행은 설정 쿠키로 시작한다."""
+    if slot not in _COOKIE_BASES:
+        return
+    try:
+        _get_cookie_store().discard(slot)
+    except Exception as e:
+        print(f"쿠키 저장소 정리 실패: {e}")
+
+
+# ── 쿠키 사전 확인 ──
+
+# 네이버 로그인 세션 쿠키: 둘 중 하나라도 없으면 요청 없이 만료로 본다
+_AUTH_COOKIE_NAMES = ("NID_AUT", "NID_SES")
+
+
+def _load_probe_cache():
+    try:
+        with open(COOKIE_PROBE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _remember_cookie_state(cookie_pairs, state):
+    """쿠키(지문 기준)의 valid/expired 판정을 COOKIE_PROBE_TTL 동안 캐시한다. 피드 조회 결과로도 갱신한다."""
+    if not COOKIE_PROBE or COOKIE_PROBE_TTL <= 0 or state not in ("valid", "expired"):
+        return
+    now = time.time()
+    fingerprint = _cookie_fingerprint(cookie_pairs)
+    cache = _load_probe_cache()
+    cached = cache.get(fingerprint)
+    if cached and cached.get("state") == state and now - cached.get("ts", 0) < COOKIE_PROBE_TTL / 2:
+        return
+    cache = {key: value for key, value in cache.items() if now - value.get("ts", 0) < COOKIE_PROBE_TTL}
+    cache[fingerprint] = {"state": state, "ts": now}
+    try:
+        tmp_path = COOKIE_PROBE_FILE.with_name(COOKIE_PROBE_FILE.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, COOKIE_PROBE_FILE)
+    except Exception as e:
+        print(f"쿠키 확인 캐시 저장 실패: {e}")
+
+
+def _probe_cookie(cookie_pairs, slot="default"):
+    """
+    로그인해야 열리는 가벼운 페이지를 리다이렉트 없이 1회 요청해 세션을 판정한다 (1초 제한).
+    401/로그인 리다이렉트만 만료로 본다. 403/429 는 피드 응답 분류와 같이 요청 제한으로 보고 쿨다운을 시작한다.
+    반환값: valid/expired/throttled/unknown  (unknown: 판단 불가, 기존 경로로 진행. throttled 는 캐시하지 않는다)
+    """
+    names = {name for name, _ in cookie_pairs}
+    missing = [name for name in _AUTH_COOKIE_NAMES if name not in names]
+    if missing:
+        print(f"쿠키 사전 확인: expired (쿠키 없음: {', '.join(missing)})")
+        return "expired"
+
+    cached = _load_probe_cache().get(_cookie_fingerprint(cookie_pairs))
+    if cached and time.time() - cached.get("ts", 0) < COOKIE_PROBE_TTL:
+        print(f"쿠키 사전 확인: {cached['state']} (캐시)")
+        return cached["state"]
+
+    import httpx
+
+    started = time.monotonic()
+    try:
+        response = _get_http_client(cookie_pairs, slot).get(COOKIE_PROBE_URL, timeout=httpx.Timeout(1.0, connect=0.5))
+    except Exception as e:
+        print(f"쿠키 사전 확인 요청 실패: {e}")
+        state = "unknown"
+    else:
+        location = response.headers.get("location", "")
+        if response.status_code == 401 or _is_login_url(location):
+            state = "expired"
+        elif response.status_code in (403, 429):
+            state = "throttled"
+            _record_response("probe", state, COOKIE_PROBE_URL, response.status_code)
+            _start_cooldown(f"HTTP {response.status_code}", _retry_after(response.headers))
+        elif response.status_code == 200:
+            state = "valid"
+        else:
+            state = "unknown"
+    _record_span("cookie_probe", started, state)
+    print(f"쿠키 사전 확인: {state} ({time.monotonic() - started:.2f}초)")
+    _remember_cookie_state(cookie_pairs, state)
+    return state
+
+
+def _cookie_precheck(cookie_pairs, slot="default"):
+    """
+    사전 확인 결과로 조회를 건너뛸지 정한다. 반환값: expired(쿠키 만료로 처리) / throttled(요청 제한) / None(계속 진행)
+    쿠키 저장소는 건드리지 않는다: 갱신값은 브라우저/HTTP 조회가 만료를 확인했을 때만 버린다.
+    """
+    if not COOKIE_PROBE:
+        return None
+    state = _probe_cookie(cookie_pairs, slot)
+    if state == "throttled":
+        print("요청 제한 (사전 확인): 브라우저를 띄우지 않습니다.")
+        return state
+    if state != "expired":
+        return None
+    if PROFILE_DIR is not None and slot == "default":
+        # 영구 프로필은 .env 쿠키와 별개로 갱신된 세션을 갖고 있을 수 있어 브라우저로 확인한다
+        print("영구 프로필 사용 중: 사전 확인 결과와 관계없이 브라우저로 확인합니다.")
+        return None
+    print("쿠키 만료 (사전 확인): 브라우저를 띄우지 않습니다.")
+    return state
+
+
+# ── 스냅샷 기록 (NAVER_CORPUS_DIR) ──
+
+def _record_corpus(kind, url, content, posts, cookie_pairs, stop_links=()):
+    """조회 1회의 원본(DOM/JSON)과 추출 결과를 코퍼스에 저장한다. 실패해도 조회에는 영향을 주지 않는다."""
+    import corpus
+
+    try:
+        path = corpus.record_snapshot(
+            CORPUS_DIR, kind, url, content, posts, secrets=[value for _, value in cookie_pairs], stop_links=stop_links
+        )
+        print(f"스냅샷 기록: {path}")
+    except Exception as e:
+        print(f"스냅샷 기록 실패: {e}")
+
+
+def _record_corpus_dom(driver, posts, cookie_pairs, mark=None):
+    try:
+        html = driver.execute_script("return document.documentElement.outerHTML")
+        url = driver.current_url
+    except Exception as e:
+        print(f"스냅샷 DOM 읽기 실패: {e}")
+        return
+    _record_corpus("dom", url, html, posts, cookie_pairs, mark.links if mark else ())
+
+
+# ── 피드 진입/파싱 ──
+
+# 피드 항목 [start, start + limit) 를 브라우저 안에서 한 번에 추출한다 (항목별 오류는 errors 로 분리).
+# stopLinks 의 링크(하이워터마크)를 만나면 그 자리(stopped)에서 멈춘다. sel: FEED_SELECTORS (필드별 후보 목록)
+# matched: 필드별로 처음 맞은 후보, missing: 필드별로 어느 후보로도 찾지 못한 항목 수
+# (corpus.extract_feed_html 이 같은 규칙을 파이썬으로 재현하므로 바꿀 때 함께 맞춘다)
+_EXTRACT_FEED_JS = """
+const start = arguments[0];
+const limit = arguments[1];
+const stopLinks = arguments[2] || [];
+const sel = arguments[3];
+const fields = ['title', 'link', 'date', 'like', 'comment'];
+const required = ['title', 'link', 'date'];
+let all = [];
+const result = {total: 0, items: [], errors: [], stopped: null, matched: {}, missing: {}};
+for (let i = 0; i < sel.item.length; i++) {
+  all = document.querySelectorAll(sel.item[i]);
+  if (all.length) {
+    result.matched.item = sel.item[i];
+    break;
+  }
+}
+if (!all.length) result.missing.item = 1;
+result.total = all.length;
+const textOf = (el) => el ? (el.innerText || el.textContent || '').trim() : '';
+const pick = function (el, field) {
+  const chain = sel[field];
+  for (let i = 0; i < chain.length; i++) {
+    const found = el.querySelector(chain[i]);
+    if (found) {
+      if (!(field in result.matched)) result.matched[field] = chain[i];
+      return found;
+    }
+  }
+  result.missing[field] = (result.missing[field] || 0) + 1;
+  return null;
+};
+const end = Math.min(all.length, start + limit);
+for (let index = start; index < end; index++) {
+  const el = all[index];
+  try {
+    const found = {};
+    fields.forEach(function (field) { found[field] = pick(el, field); });
+    const missing = required.filter(function (field) { return !found[field]; });
+    if (missing.length) {
+      result.errors.push({index: index, error: 'missing ' + missing.join(', ')});
+      continue;
+    }
+    const link = found.link.href || found.link.getAttribute('href') || '';
+    if (stopLinks.indexOf(link) >= 0) {
+      result.stopped = index;
+      break;
+    }
+    result.items.push({
+      index: index,
+      title: textOf(found.title),
+      link: link,
+      date: textOf(found.date),
+      like: textOf(found.like),
+      comment: textOf(found.comment),
+    });
+  } catch (e) {
+    result.errors.push({index: index, error: String(e)});
+  }
+}
+return result;
+"""
+
+# 마지막 피드 항목까지 스크롤해 다음 글을 불러오게 하고, 항목 수가 count 보다 늘거나 시간이 다 되면 항목 수를 돌려준다.
+_LOAD_MORE_FEED_JS = """
+const selector = arguments[0];
+const count = arguments[1];
+const timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+let finished = false;
+let observer = null;
+const total = () => document.querySelectorAll(selector).length;
+const finish = function () {
+  if (finished) return;
+  finished = true;
+  if (observer) observer.disconnect();
+  done(total());
+};
+const items = document.querySelectorAll(selector);
+if (items.length) items[items.length - 1].scrollIntoView();
+window.scrollTo(0, document.body.scrollHeight);
+if (total() > count) {
+  finish();
+  return;
+}
+observer = new MutationObserver(function () {
+  if (total() > count) finish();
+});
+observer.observe(document.body, {childList: true, subtree: true});
+setTimeout(finish, timeoutMs);
+"""
+
+
+def _install_webdriver_counter(driver):
+    """driver.execute 를 감싸 WebDriver 명령(HTTP 왕복) 수를 명령별로 센다."""
+    counts = {}
+    original_execute = driver.execute
+
+    def counted_execute(driver_command, params=None):
+        counts[driver_command] = counts.get(driver_command, 0) + 1
+        return original_execute(driver_command, params)
+
+    driver.execute = counted_execute
+    driver.command_counts = counts
+    return counts
+
+
+def _webdriver_call_total(driver):
+    return sum(getattr(driver, "command_counts", {}).values())
+
+
+def _authenticate_feed(driver, cookie_pairs):
+    """
+    naver.com 에 쿠키를 적용한 뒤 카페 피드로 진입한다.
+    반환값: _open_feed 결과 (ready/login/drift/timeout 또는 _RESPONSE_FAILURES 의 키)
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    # ── 1단계: 네이버 도메인 확보 + 쿠키 적용 ──
+    _navigate(driver, NAVER_HOME_URL, "warmup")
+    try:
+        WebDriverWait(driver, 10).until(
+            lambda d: d.execute_script("return document.readyState") in ("interactive", "complete")
+        )
+    except Exception:
+        pass
+
+    _apply_cookies(driver, cookie_pairs)
+
+    # ── 2단계: 쿠키 활성화 (naver.com 재방문) ──
+    _navigate(driver, NAVER_HOME_URL, "warmup")
+    time.sleep(1)
+
+    # ── 3단계: 카페 피드로 이동 + 문서 응답 분류 + 능동적 대기 ──
+    result = _open_feed(driver, timeout=15)
+    print(f"초기 진입 결과: {result}, URL={driver.current_url}")
+
+    # ── 로그인 리다이렉트 시 1회 재시도 ──
+    if result == "login":
+        print("로그인 페이지로 리다이렉트됨: 쿠키 재적용 후 1회 재시도")
+        _count_retry("login_retry")
+        _apply_cookies(driver, cookie_pairs)
+        _navigate(driver, NAVER_HOME_URL, "warmup")
+        time.sleep(1)
+        _apply_cookies(driver, cookie_pairs)
+        result = _open_feed(driver, timeout=20)
+        print(f"재시도 진입 결과: {result}, URL={driver.current_url}")
+
+    return result
+
+
+def _log_empty_feed(driver):
+    if not _page_source_logged():
+        print("No feed items found. Page source snippet:")
+        print(driver.page_source[:1000])
+        _mark_page_source_logged()
+    else:
+        print(f"[skip] page source log skipped (URL={driver.current_url})")
+
+
+def _count_digits(text):
+    match = re.search(r"(\d+)", (text or "").strip())
+    return match.group(1) if match else "0"
+
+
+def _extract_feed_posts(driver):
+    """
+    현재 페이지의 피드 항목(FEED_SELECTORS["item"] 후보 중 처음 맞는 것)을 execute_script 1회로 추출한다.
+    스크립트 자체가 실패하면 요소별 추출(_extract_feed_posts_legacy)로 대체한다.
+    """
+    if FEED_PARSER == "legacy":
+        return _extract_feed_posts_legacy(driver)
+
+    chunk = _extract_feed_chunk(driver, 0)
+    if chunk is None:
+        return _extract_feed_posts_legacy(driver)
+    return chunk[0]
+
+
+def _extract_feed_chunk(driver, start, stop_links=()):
+    """
+    피드 항목 [start, start + FEED_PAGE_SIZE) 를 추출한다. stop_links 중 하나를 만나면 거기서 멈춘다.
+    반환값: (posts, total, stopped)  스크립트 실패 시 None
+    """
+    try:
+        data = driver.execute_script(_EXTRACT_FEED_JS, start, FEED_PAGE_SIZE, list(stop_links), FEED_SELECTORS)
+    except Exception as e:
+        if _is_chromedriver_connection_issue(str(e)):
+            raise
+        print(f"스크립트 추출 실패, 요소별 추출로 대체: {e}")
+        return None
+    if not isinstance(data, dict):
+        print("스크립트 추출 결과가 올바르지 않아 요소별 추출로 대체합니다.")
+        return None
+
+    if start == 0:
+        print(f"게시글 조회 수: {data.get('total', 0)}")
+        if not data.get("total"):
+            _log_empty_feed(driver)
+        _check_selectors(data.get("matched") or {}, data.get("missing") or {}, "extract")
+
+    for error in data.get("errors") or []:
+        print(f"게시글 {error.get('index', -1) + 1} 추출 실패: {error.get('error')}")
+    return _posts_from_items(data.get("items")), data.get("total", 0), data.get("stopped")
+
+
+def _posts_from_items(items):
+    """추출 스크립트(또는 corpus 재생)의 항목 목록을 게시글 dict 로 바꾼다. 제목/링크가 없는 항목은 버린다."""
+    posts = []
+    for item in items or []:
+        title = (item.get("title") or "").strip()
+        link = (item.get("link") or "").strip()
+        date_text = (item.get("date") or "").strip()
+        if title and link:
+            posts.append({
+                "title": title,
+                "link": link,
+                "date": date_text,
+                "absolute_time": parse_time_string(date_text),
+                "like": _count_digits(item.get("like")),
+                "comment": _count_digits(item.get("comment")),
+            })
+    return posts
+
+
+def _load_more_feed(driver, count, deadline):
+    """피드를 끝까지 스크롤해 다음 글을 불러온다. 항목 수가 늘었으면 True."""
+    timeout = min(5.0, deadline - time.monotonic())
+    if timeout <= 0:
+        return False
+    # 첫 페이지 추출에서 맞은 항목 후보로 센다 (후보마다 개수가 다를 수 있다)
+    selector = (_run_stats().get("selectors") or {}).get("matched", {}).get("item") or FEED_SELECTORS["item"][0]
+    try:
+        driver.set_script_timeout(timeout + 5)
+        total = driver.execute_async_script(_LOAD_MORE_FEED_JS, selector, count, int(timeout * 1000))
+    except Exception as e:
+        if _is_chromedriver_connection_issue(str(e)):
+            raise
+        print(f"피드 추가 로드 실패: {e}")
+        return False
+    finally:
+        try:
+            driver.set_script_timeout(45)
+        except Exception:
+            pass
+    return isinstance(total, int) and total > count
+
+
+def _scan_feed(driver, mark=None):
+    """
+    피드를 위에서부터 읽다가 mark(직전에 본 최신 글)에 닿으면 멈춘다.
+    첫 페이지에 mark 가 없으면 BACKFILL_PAGES/BACKFILL_SECONDS 안에서 스크롤로 다음 글을 불러와 이어 읽는다.
+    mark 가 없으면(첫 실행) 첫 페이지만 읽는다.
+    """
+    if not mark:
+        return _extract_feed_posts(driver)
+    if FEED_PARSER == "legacy":
+        posts, found = _cut_at_mark(_extract_feed_posts_legacy(driver), mark)
+        _record_backfill(mark, "browser", 1, len(posts), len(posts), found)
+        return posts
+
+    deadline = time.monotonic() + BACKFILL_SECONDS
+    posts = []
+    first_page = 0
+    pages = 0
+    found = False
+    start = 0
+    while True:
+        chunk = _extract_feed_chunk(driver, start, mark.links)
+        if chunk is None:
+            if pages == 0:
+                posts, found = _cut_at_mark(_extract_feed_posts_legacy(driver), mark)
+                first_page = len(posts)
+                pages = 1
+            break
+        chunk_posts, total, stopped = chunk
+        pages += 1
+        # 브라우저는 링크 원문으로만 멈추므로 주소 형태가 바뀐 경우는 키로 한 번 더 확인한다
+        chunk_posts, found = _cut_at_mark(chunk_posts, mark)
+        posts.extend(chunk_posts)
+        if pages == 1:
+            first_page = len(posts)
+        if found or stopped is not None:
+            found = True
+            break
+        start += FEED_PAGE_SIZE
+        if pages > BACKFILL_PAGES or time.monotonic() >= deadline:
+            break
+        if start >= total and not _load_more_feed(driver, total, deadline):
+            break
+
+    _record_backfill(mark, "browser", pages, first_page, len(posts), found)
+    return posts
+
+
+def _extract_feed_posts_legacy(driver):
+    """요소마다 find_element 를 호출하는 기존 방식 (비교/대체용)."""
+    from selenium.webdriver.common.by import By
+
+    posts = []
+    matched = {}
+    missing = {}
+
+    def pick(root, field):
+        """field 의 후보 선택자를 차례로 시도해 처음 찾은 요소 목록을 돌려준다."""
+        for selector in FEED_SELECTORS[field]:
+            found = root.find_elements(By.CSS_SELECTOR, selector)
+            if found:
+                matched.setdefault(field, selector)
+                return found
+        missing[field] = missing.get(field, 0) + 1
+        return []
+
+    elements = pick(driver, "item")
+    print(f"게시글 조회 수: {len(elements)}")
+
+    if len(elements) == 0:
+        _log_empty_feed(driver)
+
+    for el in elements[:20]:
+        try:
+            found = {field: pick(el, field) for field in ("title", "link", "date", "like", "comment")}
+            absent = [field for field in ("title", "link", "date") if not found[field]]
+            if absent:
+                print(f"게시글 추출 실패: missing {', '.join(absent)}")
+                continue
+
+            like_count = _count_digits(found["like"][0].text) if found["like"] else "0"
+            comment_count = _count_digits(found["comment"][0].text) if found["comment"] else "0"
+
+            title = (found["title"][0].text or "").strip()
+            link = (found["link"][0].get_attribute("href") or "").strip()
+            date_text = (found["date"][0].text or "").strip()
+
+            if title and link:
+                posts.append({
+                    "title": title,
+                    "link": link,
+                    "date": date_text,
+                    "absolute_time": parse_time_string(date_text),
+                    "like": like_count,
+                    "comment": comment_count,
+                })
+        except Exception as e:
+            print(f"게시글 추출 실패: {e}")
+
+    _check_selectors(matched, missing, "extract")
+    return posts
+
+
+def _collect_feed(driver, cookie_pairs, warm=False, mark=None):
+    """
+    드라이버로 피드에 진입해 게시글을 수집한다.
+    warm=True 이면 이미 인증된 세션으로 보고 쿠키 적용 단계를 건너뛴다.
+    mark 가 있으면 그 글에서 멈추고 필요하면 다음 글을 더 불러온다 (_scan_feed).
+    반환값: (posts, result)  result: ready/login/drift/timeout 또는 _RESPONSE_FAILURES 의 키
+    """
+    if warm:
+        result = _open_feed(driver, timeout=15)
+        print(f"세션 재사용 진입 결과: {result}, URL={driver.current_url}")
+    else:
+        result = _authenticate_feed(driver, cookie_pairs)
+
+    if result == "timeout":
+        print("피드 컨테이너 탐색 실패: 요소/리다이렉트 판정 모두 없음")
+    elif result == "drift":
+        print("피드 마크업 변경 감지: 페이지는 그려졌지만 피드 항목 선택자가 모두 실패")
+        _log_empty_feed(driver)
+        if CORPUS_DIR is not None:
+            _record_corpus_dom(driver, [], cookie_pairs)
+    _collect_network_stats(driver)
+    _collect_memory_stats(driver)
+    network = _run_stats().get("network")
+    if network:
+        print(
+            f"네트워크: 요청 {network['requests']}건, {network['bytes'] // 1024}KB, "
+            f"차단 {network['blocked']}건 (block={BLOCK_PROFILE})"
+        )
+    if result != "ready":
+        return [], result
+
+    calls_before = _webdriver_call_total(driver)
+    started = time.monotonic()
+    posts = _scan_feed(driver, mark)
+    _record_span("parse", started, str(len(posts)))
+    if CORPUS_DIR is not None:
+        _record_corpus_dom(driver, posts, cookie_pairs, mark)
+    if _drift_detail():
+        # 항목은 있지만 제목/링크/날짜를 찾지 못했다: 빈 결과를 "신규 글 없음"으로 넘기지 않는다
+        result = "drift"
+    print(
+        f"WebDriver 호출 수: 파싱 {_webdriver_call_total(driver) - calls_before}회 "
+        f"/ 누적 {_webdriver_call_total(driver)}회 (parser={FEED_PARSER})"
+    )
+    return posts, result
+
+
+def _collect_with_session(session, cookie_pairs, mark=None, slot="default"):
+    """
+    세션으로 피드를 수집한다. 인증된 세션(warm)이 로그인으로 튕기면 같은 드라이버에서 쿠키 적용 단계로 대체한다.
+    성공하면 브라우저가 갱신한 세션 쿠키를 slot 의 쿠키 저장소에 반영한다.
+    반환값: (posts, result)
+    """
+    driver = session["driver"]
+    if session["warm"]:
+        posts, result = _collect_feed(driver, cookie_pairs, warm=True, mark=mark)
+        if result == "login":
+            print("인증된 세션이 거부됨: 쿠키 적용 단계로 대체합니다.")
+            _count_retry("warm_fallback")
+            posts, result = _collect_feed(driver, cookie_pairs, mark=mark)
+    else:
+        posts, result = _collect_feed(driver, cookie_pairs, mark=mark)
+
+    # drift 도 로그인된 피드 페이지까지는 들어간 것이므로 세션/쿠키는 정상으로 본다
+    authenticated = result in ("ready", "drift")
+    _update_profile_seed(session.get("profile"), cookie_pairs, "ready" if authenticated else result)
+    if session.get("profile") is None:
+        _remember_cookie_state(cookie_pairs, "valid" if authenticated else {"login": "expired"}.get(result))
+    if result == "ready":
+        _clear_cooldown()
+    if authenticated:
+        _harvest_browser_cookies(driver, slot)
+    elif result == "login":
+        _discard_session_cookies(slot)
+    session["warm"] = authenticated
+    return posts, result
+
+
+def _quit_driver(driver):
+    """드라이버를 종료한다. 항상 None 을 반환한다."""
+    if driver is not None:
+        governor = getattr(driver, "memory_governor", None)
+        if governor is not None:
+            _collect_memory_stats(driver)
+            governor.stop()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    return None
+
+
+# ── 피드 게시글 수집 ──
+
+def get_feed_posts(mark=None):
+    """
+    네이버 카페 피드에서 게시글을 수집한다. mark(하이워터마크)가 있으면 그 글 이전까지만 읽는다.
+    반환값: (posts, cookie_expired, fetch_ok)
+    """
+    if not NAVER_COOKIE:
+        print("NAVER_COOKIE가 설정되지 않았습니다.")
+        return [], False, False
+
+    cookie_pairs = _parse_cookie_pairs(NAVER_COOKIE)
+    if not cookie_pairs:
+        print("NAVER_COOKIE 형식이 유효하지 않습니다.")
+        return [], False, False
+    cookie_pairs = _session_cookie_pairs(cookie_pairs)
+
+    precheck = _cookie_precheck(cookie_pairs)
+    if precheck is not None:
+        # throttled 는 fetch_ok=False 로 돌려주고, 호출 측이 stats.response 로 요청 제한을 판정한다
+        return [], precheck == "expired", precheck == "expired"
+
+    posts, http_result = _try_http_backend(cookie_pairs, mark=mark)
+    if http_result == "ready":
+        return posts, False, True
+    if http_result is not None:
+        # NAVER_FEED_BACKEND=http: Selenium 대체 없이 HTTP 결과로 판정
+        return [], http_result == "login", http_result == "login"
+
+    session = None
+    posts = []
+    cookie_expired = False
+    fetch_ok = False
+
+    try:
+        session = _open_browser(cookie_pairs)
+    except Exception as e:
+        print(f"드라이버 초기화 실패: {e}")
+        return posts, cookie_expired, False
+
+    try:
+        print(f"쿠키 개수: {len(cookie_pairs)}")
+        posts, result = _collect_with_session(session, cookie_pairs, mark)
+
+        # ── 최종 결과 판정 ──
+        if result == "login":
+            cookie_expired = True
+            return [], cookie_expired, True
+        if result != "ready":
+            return [], cookie_expired, False
+        fetch_ok = True
+
+    except Exception as e:
+        if _is_chromedriver_connection_issue(str(e)):
+            print(f"ChromeDriver connection issue (possible OOM): {e}")
+        else:
+            print(f"피드 조회 실패: {e}")
+        fetch_ok = False
+    finally:
+        _close_browser(session)
+
+    return posts, cookie_expired, fetch_ok
+
+
+# ── 알림 전송 ──
+
+async def _send_cookie_alert(account_name=None, chat_id=None):
+    """쿠키 만료 알림을 하루 1회만 전송한다. 멀티 계정이면 계정별로 따로 센다."""
+    KST = timezone(timedelta(hours=9))
+    send_alert = True
+    today = datetime.now(KST).strftime("%Y-%m-%d")
+    alert_file = COOKIE_ALERT_FILE
+    if account_name:
+        alert_file = BASE_DIR / f"cookie_alert_sent.{account_name}.txt"
+    if alert_file.exists():
+        try:
+            with open(alert_file, "r", encoding="utf-8") as f:
+                if f.read().strip() == today:
+                    send_alert = False
+        except Exception:
+            pass
+
+    if send_alert:
+        alert_msg = (
+            "⚠️ [긴급] 네이버 쿠키가 만료되었습니다.\n\n"
+            "봇이 더 이상 정상 수집할 수 없습니다.\n"
+            "PC에서 네이버 카페 로그인 후 쿠키를 복사하여 .env에 갱신해주세요."
+        )
+        if account_name:
+            alert_msg = f"[계정: {account_name}]\n" + alert_msg
+        await send_telegram_message(alert_msg, chat_id)
+        try:
+            with open(alert_file, "w", encoding="utf-8") as f:
+                f.write(today)
+        except Exception as e:
+            print(f"쿠키 알림 기록 실패: {e}")
+
+
+async def _sync_drift_alert():
+    """
+    피드 마크업 변경(drift) 알림을 같은 실패 조합(선택자 버전 + 실패 필드)마다 한 번만 보낸다 (DRIFT_ALERT_FILE).
+    같은 조합이 DRIFT_CONFIRM_RUNS 회 연속으로 판정된 뒤에 보낸다.
+    브라우저 추출이 다시 성공하면 기록을 지우고 (알림을 보냈으면) 복구 메시지를 보낸다.
+    이번 실행에 DOM 판정이 없었으면(HTTP 조회 등) 그대로 둔다.
+    """
+    selectors = _RUN_STATS.get("selectors")
+    if not selectors:
+        return
+    try:
+        with open(DRIFT_ALERT_FILE, "r", encoding="utf-8") as f:
+            alerted = json.load(f)
+    except (OSError, ValueError):
+        alerted = None
+
+    if not selectors["drift"]:
+        if alerted is None:
+            return
+        try:
+            DRIFT_ALERT_FILE.unlink()
+        except OSError:
+            pass
+        if not alerted.get("alerted_at"):
+            print("피드 마크업 변경 의심 해소 (알림 전)")
+            return
+        minutes = int((time.time() - alerted.get("since", time.time())) // 60)
+        print(f"피드 마크업 변경 해소 (지속 {minutes}분)")
+        await send_telegram_message(
+            f"✅ [복구] 네이버 카페 피드 게시글 추출이 다시 정상입니다 (선택자 v{selectors['version']}, 지속 {minutes}분)"
+        )
+        return
+
+    signature = f"v{selectors['version']}:{','.join(sorted(selectors['failed']))}"
+    same = alerted is not None and alerted.get("signature") == signature
+    if same and alerted.get("alerted_at"):
+        print("피드 마크업 변경 알림은 이미 전송됨")
+        return
+    state = {
+        "signature": signature,
+        "since": alerted.get("since", time.time()) if alerted else time.time(),
+        "runs": (alerted.get("runs", 1) if same else 0) + 1,
+        "failed": selectors["failed"],
+    }
+    if state["runs"] < DRIFT_CONFIRM_RUNS:
+        print(f"피드 마크업 변경 의심 ({state['runs']}/{DRIFT_CONFIRM_RUNS}회): 연속으로 판정되면 알립니다.")
+        _write_drift_alert(state)
+        return
+    matched = ", ".join(f"{field}={selector}" for field, selector in selectors["matched"].items()) or "없음"
+    message = (
+        "⚠️ [점검 필요] 네이버 카페 피드 마크업이 바뀐 것 같습니다.\n\n"
+        f"선택자 v{selectors['version']} 에서 찾지 못한 항목: {', '.join(selectors['failed'])}\n"
+        f"찾은 항목: {matched}\n"
+        "main.py 의 FEED_SELECTORS 에 새 선택자를 추가해주세요. (해소될 때까지 다시 알리지 않습니다)"
+    )
+    if await send_telegram_message(message):
+        state["alerted_at"] = time.time()
+    _write_drift_alert(state)
+
+
+def _write_drift_alert(state):
+    try:
+        with open(DRIFT_ALERT_FILE, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+    except Exception as e:
+        print(f"마크업 변경 알림 기록 실패: {e}")
+
+
+def _get_outbox(sent_posts):
+    """전송 이력(sent_posts.log / sent_posts.<계정>.log)과 짝을 이루는 대기열(outbox.log / outbox.<계정>.log)."""
+    outbox = _OUTBOXES.get(sent_posts.path)
+    if outbox is None:
+        path = sent_posts.path.with_name(sent_posts.path.name.replace("sent_posts", "outbox", 1))
+        outbox = Outbox(
+            path, backoff_base=OUTBOX_BACKOFF, backoff_max=OUTBOX_BACKOFF_MAX, max_attempts=OUTBOX_MAX_ATTEMPTS
+        )
+        try:
+            outbox.load()
+        except Exception as e:
+            print(f"전송 대기열 로드 실패 ({path}): {e}")
+        _OUTBOXES[sent_posts.path] = outbox
+    return outbox
+
+
+async def _flush_outbox(outbox, sent_posts, chat_id=None):
+    """
+    대기열에서 보낼 차례인 글을 오래된 순으로 전송한다.
+    텔레그램이 확인한 글만 전송 이력에 넣은 뒤 대기열에서 빼고, 실패한 글은 대기열에 남겨 백오프 후 재시도한다.
+    반환값: (전송 건수, 실패 건수)
+    """
+    from telegram_client import build_digest_groups
+
+    sender = _get_telegram()
+    due = []
+    keys = set()
+    for item in outbox.due():
+        # 전송 이력 기록 직후 죽었거나, 별칭을 배우기 전 이름 키로 한 번 더 들어간 글: 대기열만 정리한다
+        key = sent_posts.key_for(item["link"]) or item["key"]
+        if key in sent_posts or key in keys:
+            outbox.done([item["key"]])
+        else:
+            due.append(item)
+            keys.add(key)
+    if not due:
+        return 0, 0
+    if not sender.configured:
+        # 설정 문제는 재시도 횟수로 세지 않는다 (설정을 고치면 그대로 전송)
+        print(f"텔레그램 설정이 누락되어 대기열 {len(due)}건을 보내지 못했습니다.")
+        return 0, len(due)
+
+    # 몰려온 새 글은 다이제스트로 묶는다 (DIGEST_THRESHOLD 건 미만이면 1건씩)
+    groups = build_digest_groups([item["text"] for item in due], DIGEST_THRESHOLD)
+    if len(groups) != len(due):
+        print(f"다이제스트 전송: 새 글 {len(due)}건 -> 메시지 {len(groups)}개")
+
+    async def deliver(text, indexes):
+        items = [due[index] for index in indexes]
+        if await sender.send(text, chat_id):
+            # 확인 즉시 기록한다 (배치 끝까지 미루면 도중에 죽었을 때 보낸 글을 다시 보낸다)
+            sent_posts.add_many((sent_posts.key_for(item["link"]) or item["key"], item["link"]) for item in items)
+            outbox.done(item["key"] for item in items)
+            return len(items), 0
+        dropped = outbox.failed(item["key"] for item in items)
+        if dropped:
+            # 포기한 글은 보내지 못한 채 끝나므로 한 건씩 남긴다 (bot_status.json 의 stats.outbox.dropped_links 에도 기록)
+            for item in dropped:
+                title = item["text"].split("\n", 1)[0][:80]
+                print(f"전송 {OUTBOX_MAX_ATTEMPTS}회 실패로 포기 (미전송): {title} {item['link']}")
+            # 피드에 남아 있는 글이 다시 대기열에 들어오지 않도록 이력에는 남긴다
+            sent_posts.add_many((sent_posts.key_for(item["link"]) or item["key"], item["link"]) for item in dropped)
+            outbox_stats = _run_stats().setdefault("outbox", {})
+            outbox_stats["dropped"] = outbox_stats.get("dropped", 0) + len(dropped)
+            outbox_stats.setdefault("dropped_links", []).extend(item["link"] for item in dropped)
+        return 0, len(items)
+
+    # 같은 채팅은 TelegramSender 가 예약 순서대로 보내고, 간격은 속도 제한기가 맞춘다 (blocking sleep 없음)
+    results = await asyncio.gather(*(deliver(text, indexes) for text, indexes in groups))
+    return sum(sent for sent, _ in results), sum(failed for _, failed in results)
+
+
+async def _deliver_new_posts(posts, sent_posts, chat_id=None):
+    """
+    전송 이력/대기열에 없는 게시글을 오래된 순으로 대기열에 넣고, 이전 실행에서 남은 글과 함께 전송한다.
+    chat_id 생략 시 TELEGRAM_CHAT_ID. 반환값: 이번에 전송한 건수
+    """
+    for post in posts:
+        if post.get("cafe_name") and post.get("club_id"):
+            sent_posts.learn_alias(post["cafe_name"], post["club_id"])
+
+    outbox = _get_outbox(sent_posts)
+    new_entries = []
+    arrivals = []
+    seen = set()
+    unparsed = []
+    for post in reversed(posts):
+        link = post["link"]
+        # 쿼리/이름형·ID형 주소 차이와 무관하게 (카페ID, 글ID) 로 중복을 판정한다
+        key = sent_posts.key_for(link)
+        if key is None:
+            key = link
+            unparsed.append(link)
+        if key in sent_posts or key in outbox or key in seen:
+            continue
+
+        message = f"{post['absolute_time']}\n{post['title']}\n{post['link']}\n좋아요 {post['like']} 댓글 {post['comment']}"
+        new_entries.append((key, link, message))
+        arrivals.append(_post_written_at(post))
+        seen.add(key)
+
+    if unparsed:
+        _run_stats()["dedup"] = {"unparsed": len(unparsed), "unparsed_links": unparsed[:5]}
+        print(f"글 키를 해석하지 못한 링크 {len(unparsed)}건 (링크 원문으로 중복 판정): {unparsed[0]}")
+
+    # 전송 전에 먼저 대기열에 기록한다: 전송 도중 죽어도 다음 실행이 이어서 보낸다
+    try:
+        outbox.enqueue(new_entries)
+    except Exception as e:
+        print(f"전송 대기열 저장 실패: {e}")
+    backlog = len(outbox) - len(new_entries)
+    if backlog > 0:
+        print(f"전송 대기열에 이전 실행의 글 {backlog}건이 남아 있습니다.")
+
+    new_posts_count, failed_count = await _flush_outbox(outbox, sent_posts, chat_id)
+    _run_stats()["posts_sent"] = _run_stats().get("posts_sent", 0) + new_posts_count
+    outbox_stats = _run_stats().setdefault("outbox", {})
+    outbox_stats["failed"] = outbox_stats.get("failed", 0) + failed_count
+    outbox_stats["pending"] = outbox_stats.get("pending", 0) + len(outbox)
+    if failed_count:
+        print(f"전송 실패 {failed_count}건: 대기열에 남겨 다음 실행에서 재시도합니다.")
+    # 적응형 스케줄러가 도착률을 학습할 작성 시각
+    _run_stats().setdefault("arrivals", []).extend(arrivals)
+
+    # 다음 조회는 이번에 본 최신 글에서 멈춘다 (대기열에 넣었으므로 전송 실패와 무관)
+    try:
+        sent_posts.advance_mark((sent_posts.key_for(post["link"]) or post["link"], post["link"]) for post in posts)
+    except Exception as e:
+        print(f"하이워터마크 저장 실패: {e}")
+    return new_posts_count
+
+
+# ── 멀티 계정 ──
+
+# 공유 Chrome 은 WebDriver 세션이 하나라 한 번에 한 계정만 조작한다 (HTTP 조회/전송은 계정별로 동시에).
+_BROWSER_LOCK = threading.Lock()
+
+
+def _load_accounts():
+    """
+    NAVER_ACCOUNTS_FILE(JSON 배열)에서 계정 목록을 읽는다. 설정이 없으면 None.
+    항목: {"name", "cookie" 또는 "cookie_env"(쿠키를 담은 환경 변수 이름), "chat_id"(생략 시 TELEGRAM_CHAT_ID)}
+    """
+    if ACCOUNTS_FILE is None:
+        return None
+
+    path = ACCOUNTS_FILE if ACCOUNTS_FILE.is_absolute() else BASE_DIR / ACCOUNTS_FILE
+    with open(path, "r", encoding="utf-8") as f:
+        raw_accounts = json.load(f)
+    if not isinstance(raw_accounts, list) or not raw_accounts:
+        raise ValueError(f"계정 설정 형식 오류: {path} 는 비어 있지 않은 JSON 배열이어야 합니다.")
+
+    accounts = []
+    names = set()
+    for index, raw in enumerate(raw_accounts, 1):
+        if not isinstance(raw, dict):
+            raise ValueError(f"계정 설정 형식 오류: {index}번째 항목이 객체가 아닙니다.")
+        name = re.sub(r"[^A-Za-z0-9_-]", "_", str(raw.get("name") or f"account{index}"))
+        if name in names:
+            raise ValueError(f"계정 이름 중복: {name}")
+        names.add(name)
+
+        sent_posts = SentPostStore(BASE_DIR / f"sent_posts.{name}.log", retention_days=DEDUP_RETENTION_DAYS)
+        try:
+            sent_posts.load()
+        except Exception as e:
+            print(f"[{name}] sent_posts 로드 실패: {e}")
+        accounts.append({
+            "name": name,
+            "cookie": str(raw.get("cookie") or ""),
+            "cookie_env": str(raw.get("cookie_env") or ""),
+            "chat_id": str(raw.get("chat_id") or TELEGRAM_CHAT_ID),
+            "sent_posts": sent_posts,
+            "context": None,
+            "window": None,
+            "warm": False,
+            "state": "running",
+            "detail": "시작",
+            "updated_at": None,
+        })
+    print(f"멀티 계정 모드: {', '.join(account['name'] for account in accounts)} (동시 {ACCOUNT_CONCURRENCY}개)")
+    return accounts
+
+
+def _account_cookie_pairs(account):
+    """계정 쿠키를 파싱한다. cookie_env 는 매번 환경 변수에서 읽으므로 .env 재로드가 바로 반영된다."""
+    raw_cookie = account["cookie"]
+    if not raw_cookie and account["cookie_env"]:
+        raw_cookie = os.environ.get(account["cookie_env"], "")
+    return _parse_cookie_pairs(raw_cookie.strip())
+
+
+def _open_account_context(driver, account):
+    """계정 전용 브라우저 컨텍스트(쿠키 저장소 분리)와 탭을 만든다."""
+    context_id = driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+    target_id = driver.execute_cdp_cmd(
+        "Target.createTarget", {"url": "about:blank", "browserContextId": context_id}
+    )["targetId"]
+    # chromedriver 의 창 핸들은 target id 이다 (구버전은 "CDwindow-" 접두사)
+    handle = next((h for h in driver.window_handles if h.endswith(target_id)), target_id)
+    account.update(context=context_id, window=handle, warm=False)
+    print(f"[{account['name']}] 브라우저 컨텍스트 생성: {context_id}")
+
+
+def _close_account_context(driver, account):
+    """계정 컨텍스트를 폐기한다 (쿠키 저장소도 함께 사라진다)."""
+    if driver is not None and account.get("context"):
+        try:
+            driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": account["context"]})
+        except Exception as e:
+            print(f"[{account['name']}] 브라우저 컨텍스트 폐기 실패: {e}")
+    account.update(context=None, window=None, warm=False)
+
+
+def _switch_account(driver, account):
+    """계정 탭으로 전환한다. 탭이 없거나 닫혔으면 컨텍스트를 새로 만든다."""
+    if account["window"] is None:
+        _open_account_context(driver, account)
+    try:
+        driver.switch_to.window(account["window"])
+    except Exception:
+        _close_account_context(driver, account)
+        _open_account_context(driver, account)
+        driver.switch_to.window(account["window"])
+
+    # 차단 목록/Network 도메인은 탭(target)마다 따로 적용된다
+    driver.block_phase = None
+    if driver.block_enabled:
+        driver.execute_cdp_cmd("Network.enable", {})
+
+
+def _collect_account(browser, account):
+    """
+    계정 1개의 피드를 수집한다 (작업 스레드에서 실행).
+    반환값: (posts, result)
+    """
+    deadline = time.monotonic() + ACCOUNT_TIMEOUT
+    name = account["name"]
+    cookie_pairs = _account_cookie_pairs(account)
+    if not cookie_pairs:
+        print(f"[{name}] 쿠키가 설정되지 않았거나 형식이 유효하지 않습니다.")
+        return [], "error"
+    cookie_pairs = _session_cookie_pairs(cookie_pairs, name)
+
+    # 다른 계정이 방금 요청 제한을 받았으면 같은 IP 로 다시 두드리지 않는다
+    if _cooldown_remaining() is not None:
+        return [], "throttled"
+
+    precheck = _cookie_precheck(cookie_pairs, slot=name)
+    if precheck is not None:
+        return [], "login" if precheck == "expired" else precheck
+
+    mark = account["sent_posts"].high_water_mark(name)
+    posts, result = _try_http_backend(cookie_pairs, slot=name, mark=mark)
+    if result is not None:
+        return posts, result
+
+    # 다른 계정이 브라우저를 붙잡고 멈춰 있어도 이 계정의 제한 시간(ACCOUNT_TIMEOUT)을 넘겨 기다리지 않는다.
+    # (넘겨 기다리면 태스크가 끝난 뒤에도 작업 스레드가 남아 asyncio.run 종료가 기본 executor 를 기다린다)
+    if not _BROWSER_LOCK.acquire(timeout=max(0.0, deadline - time.monotonic())):
+        print(f"[{name}] 브라우저 대기 시간 초과({ACCOUNT_TIMEOUT}초)")
+        return [], "timeout"
+    try:
+        if browser["driver"] is None:
+            browser["driver"] = _build_driver()
+        driver = browser["driver"]
+        _switch_account(driver, account)
+
+        session = {"driver": driver, "profile": None, "warm": account["warm"]}
+        posts, result = _collect_with_session(session, cookie_pairs, mark, slot=name)
+        account["warm"] = session["warm"]
+        if result == "login":
+            # 거부된 쿠키가 남은 컨텍스트는 버리고 다음 사이클에 빈 저장소로 시작한다
+            _close_account_context(driver, account)
+        return posts, result
+    finally:
+        _BROWSER_LOCK.release()
+
+
+async def _run_account(browser, account, semaphore):
+    """
+    계정 1개의 수집/전송을 수행하고 결과를 account 의 state/detail 에 남긴다.
+    통계는 계정별 dict 에 기록한 뒤(작업 스레드에도 컨텍스트로 전달된다) 실행 전체 통계에 합친다.
+    """
+    name = account["name"]
+    stats = {}
+    token = _ACCOUNT_STATS.set(stats)
+    try:
+        await _run_account_in_scope(browser, account, semaphore)
+    finally:
+        _ACCOUNT_STATS.reset(token)
+        _merge_account_stats(name, stats)
+
+
+async def _run_account_in_scope(browser, account, semaphore):
+    name = account["name"]
+    account["sent_posts"].maintain()
+
+    async with semaphore:
+        print(f"[{name}] 피드 조회 시작")
+        try:
+            posts, result = await asyncio.wait_for(
+                asyncio.to_thread(_collect_account, browser, account), timeout=ACCOUNT_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            # 작업 스레드는 브라우저를 쥔 채 남아 있을 수 있으므로 사이클 뒤 브라우저를 새로 띄운다
+            print(f"[{name}] 수집 시간 초과({ACCOUNT_TIMEOUT}초)")
+            browser["broken"] = True
+            posts, result = [], "timeout"
+        except Exception as e:
+            if _is_chromedriver_connection_issue(str(e)):
+                print(f"[{name}] ChromeDriver connection issue (possible OOM): {e}")
+                browser["broken"] = True
+            else:
+                print(f"[{name}] 피드 조회 실패: {e}")
+            posts, result = [], "error"
+
+    if result == "login":
+        state, detail = "cookie_expired", "쿠키 만료"
+        await _send_cookie_alert(name, account["chat_id"])
+    elif result == "drift":
+        state, detail = "drift", _drift_detail() or "피드 마크업 변경 감지"
+    elif result in _RESPONSE_FAILURES:
+        state, detail = _response_failure() or (result, _RESPONSE_FAILURES[result])
+    elif result != "ready":
+        state, detail = "error", _memory_failure_detail() or "피드 조회 실패"
+    else:
+        new_posts_count = await _deliver_new_posts(posts, account["sent_posts"], account["chat_id"])
+        state = "ok"
+        detail = f"새 글 {new_posts_count}건" if new_posts_count > 0 else "신규 게시글 없음"
+
+    account.update(state=state, detail=detail, updated_at=datetime.now(timezone.utc).isoformat())
+    print(f"[{name}] {state}: {detail}")
+
+
+def _accounts_alarm_seconds(base, accounts):
+    """
+    멀티 계정 사이클의 제한 시간. 계정은 ACCOUNT_CONCURRENCY 개씩 차례로 돌고 계정마다 ACCOUNT_TIMEOUT 까지 쓸 수 있으므로,
+    base(시작/전송 여유) 에 그만큼을 더해 정상적으로 느린 계정 묶음이 전체 알람에 끊기지 않게 한다.
+    """
+    waves = -(-len(accounts) // ACCOUNT_CONCURRENCY)
+    return base + ACCOUNT_TIMEOUT * waves
+
+
+async def _run_accounts_cycle(browser, accounts):
+    """
+    모든 계정을 ACCOUNT_CONCURRENCY 개씩 동시에 조회한다. 한 계정의 실패/지연은 다른 계정을 막지 않는다.
+    반환값: (run_state, run_detail)
+    """
+    semaphore = asyncio.Semaphore(ACCOUNT_CONCURRENCY)
+    await asyncio.gather(*(_run_account(browser, account, semaphore) for account in accounts))
+    # 마크업은 계정과 무관하므로 알림은 기본 채팅으로 한 번만: 계정 중 하나라도 drift 면 그 판정으로, 아니면 정상 판정으로
+    verdicts = [stats["selectors"] for stats in _RUN_STATS.get("accounts", {}).values() if stats.get("selectors")]
+    if verdicts:
+        _RUN_STATS["selectors"] = next((selectors for selectors in verdicts if selectors["drift"]), verdicts[0])
+    await _sync_drift_alert()
+
+    failed = [account for account in accounts if account["state"] != "ok"]
+    if not failed:
+        return "ok", f"계정 {len(accounts)}개 정상"
+    states = {account["state"] for account in failed}
+    run_state = next(
+        state for state in ("error", "throttled", "captcha", "server_error", "network_error", "drift", "cookie_expired")
+        if state in states
+    )
+    return run_state, ", ".join(f"{account['name']}: {account['detail']}" for account in failed)
+
+
+def _close_accounts_browser(browser, accounts):
+    """공유 Chrome 을 종료한다. 계정 컨텍스트도 함께 사라지므로 다음 사이클에 새로 만든다."""
+    browser["driver"] = _quit_driver(browser.get("driver"))
+    browser["broken"] = False
+    for account in accounts or ():
+        account.update(context=None, window=None, warm=False)
+
+
+def _acquire_run_lock():
+    """
+    bot.lock 에 배타 락을 건다.
+    반환값: (lock_file, acquired)  이미 실행 중이면 acquired=False
+    """
+    if os.environ.get("NAVER_BOT_LOCK_HELD", "").strip() == "1":
+        # run_bot_enhanced.sh 가 같은 bot.lock 을 이미 flock 으로 잡고 실행한 경우
+        return None, True
+
+    lock_file = None
+    try:
+        lock_path = BASE_DIR / "bot.lock"
+        lock_file = open(str(lock_path), "w")
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except IOError:
+        print("이미 실행 중입니다. 중복 실행을 차단합니다.")
+        if lock_file is not None:
+            lock_file.close()
+        return None, False
+    except Exception as e:
+        print(f"락 파일 설정 실패: {e}")
+    return lock_file, True
+
+
+def _release_run_lock(lock_file):
+    if lock_file is not None:
+        try:
+            lock_file.close()
+        except Exception:
+            pass
+
+
+# ── 메인 실행 ──
+
+async def main():
+    global _STARTUP
+    if sys.platform == "win32":
+        print("Windows 환경에서는 본 스크립트 실행을 제한합니다.")
+        update_health_files("skipped", "windows_not_supported")
+        return
+
+    run_state = "running"
+    run_detail = "시작"
+    timeout_scheduled = False
+    accounts = None
+
+    lock_file, acquired = _acquire_run_lock()
+    if not acquired:
+        return
+
+    try:
+        signal.signal(signal.SIGALRM, _timeout_alarm_handler)
+        _arm_alarm(120)
+        timeout_scheduled = True
+
+        # 적응형 스케줄: 예정 시각 전이면 조회 없이 heartbeat 만 갱신하고 끝낸다
+        scheduler = _get_scheduler()
+        if scheduler is not None:
+            wait_seconds = scheduler.seconds_until_due(time.time())
+            if wait_seconds > 0:
+                run_state = "idle"
+                run_detail = f"다음 조회까지 {wait_seconds:.0f}초"
+                _STARTUP = {"seconds": _process_age_seconds()}
+                print(f"적응형 스케줄: {run_detail}")
+                return
+
+        # 요청 제한 쿨다운 중이면 Chrome/HTTP 조회 없이 heartbeat 만 갱신한다
+        cooldown = _cooldown_remaining()
+        if cooldown is not None:
+            run_state = "cooldown"
+            run_detail = f"요청 제한 대기 {cooldown[0]:.0f}초 남음 ({cooldown[1]})"
+            _STARTUP = {"seconds": _process_age_seconds()}
+            print(run_detail)
+            return
+
+        KST = timezone(timedelta(hours=9))
+        now = datetime.now(KST)
+        print("\n" + "=" * 50)
+        print(f"실행 시작: {now.strftime('%Y-%m-%d %H:%M:%S')} (KST)")
+        print("=" * 50)
+        print(f"네이버 카페 피드 조회 시작 (backend={FEED_BACKEND})")
+
+        _reset_run_stats()
+        missing = _check_startup()
+        if missing:
+            run_state = "error"
+            run_detail = f"의존성 누락: {', '.join(missing)}"
+            print(f"{run_detail} (pip install -r requirements.txt 필요)")
+            return DEPENDENCY_EXIT_CODE
+        update_health_files("running", "피드 수집 시작")
+
+        accounts = _load_accounts()
+        if accounts is not None:
+            _arm_alarm(_accounts_alarm_seconds(120, accounts))
+            browser = {"driver": None, "broken": False}
+            try:
+                run_state, run_detail = await _run_accounts_cycle(browser, accounts)
+            finally:
+                _close_accounts_browser(browser, accounts)
+            return
+
+        sent_posts = load_sent_posts()
+        print(f"기존 sent_posts: {len(sent_posts)}")
+
+        posts, cookie_expired, fetch_ok = get_feed_posts(sent_posts.high_water_mark())
+        await _sync_drift_alert()
+
+        drift = _drift_detail()
+        if drift:
+            run_state = "drift"
+            run_detail = drift
+            print("피드 마크업 변경으로 종료합니다.")
+            return
+
+        failure = _response_failure()
+        if not fetch_ok and failure is not None:
+            run_state, run_detail = failure
+            print(f"{run_detail}: 조회를 종료합니다.")
+            return
+
+        if not fetch_ok:
+            run_state = "error"
+            run_detail = _memory_failure_detail() or "피드 조회 실패"
+            print("피드 조회 실패로 종료합니다.")
+            return
+
+        if cookie_expired:
+            run_state = "cookie_expired"
+            run_detail = "쿠키 만료"
+            await _send_cookie_alert()
+            return
+
+        if not posts:
+            print("새로운 게시글이 없거나 수집되지 않았습니다.")
+
+        # 새 글이 없어도 이전 실행에서 남은 대기열은 보낸다
+        new_posts_count = await _deliver_new_posts(posts, sent_posts)
+
+        if new_posts_count > 0:
+            run_state = "ok"
+            run_detail = f"새 글 {new_posts_count}건"
+            print(f"--> {new_posts_count}건 전송 완료.")
         else:
             run_state = "ok"
-            run_detail = "?좉퇋 寃뚯떆湲 ?놁쓬"
-            print("--> ?좉퇋 寃뚯떆湲???놁뒿?덈떎.")
+            run_detail = "신규 게시글 없음"
+            print("--> 신규 게시글이 없습니다.")
 
     except TimeoutError as e:
         run_state = "error"
@@ -597,27 +3081,234 @@ async def main():
         print(f"실행 시간 초과: {e}")
     except asyncio.CancelledError:
         run_state = "interrupted"
-        run_detail = "??꾩븘??以묐떒"
-        print("?ㅽ뻾??以묐떒?⑸땲??")
+        run_detail = "타임아웃 중단"
+        print("실행이 중단됩니다.")
     except KeyboardInterrupt:
         run_state = "interrupted"
-        run_detail = "?ъ슜??以묐떒"
-        print("?ъ슜???먮뒗 ?몃? ?쒓렇?먯뿉 ?섑빐 以묐떒?섏뿀?듬땲??")
+        run_detail = "사용자 중단"
+        print("사용자 또는 외부 시그널에 의해 중단되었습니다.")
     except Exception as e:
         run_state = "error"
-        run_detail = f"?덇린移?紐삵븳 ?덉쇅: {e}"
-        print(f"移섎챸???ㅻ쪟: {e}")
+        run_detail = f"예기치 못한 예외: {e}"
+        print(f"치명적 오류: {e}")
     finally:
         if timeout_scheduled:
             signal.alarm(0)
             signal.signal(signal.SIGALRM, signal.SIG_DFL)
-        if lock_file is not None:
+        _release_run_lock(lock_file)
+        await _close_telegram()
+        if run_state not in ("idle", "cooldown"):
+            _record_schedule(run_state)
+        _export_metrics(run_state)
+        _append_run_history(run_state, run_detail)
+        update_health_files(run_state, run_detail, accounts)
+
+
+# ── 데몬 모드 ──
+
+async def _daemon_sleep(seconds, run_state, run_detail, accounts):
+    """다음 사이클까지 쉰다. 길게 쉬는 동안에도 watchdog 이 멈춤으로 보지 않도록 heartbeat 를 갱신한다."""
+    deadline = time.monotonic() + seconds
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(remaining, HEARTBEAT_REFRESH_INTERVAL))
+        if deadline - time.monotonic() > 0:
+            update_health_files(run_state, run_detail, accounts)
+
+
+def _reload_cookie_pairs():
+    """.env 를 다시 읽어 최신 NAVER_COOKIE 를 파싱한다 (데몬 실행 중 쿠키 갱신 대응)."""
+    load_dotenv(override=True)
+    return _session_cookie_pairs(_parse_cookie_pairs(os.environ.get("NAVER_COOKIE", "").strip()))
+
+
+async def _run_daemon_cycle(session, cookie_pairs, sent_posts):
+    """
+    데몬 모드의 1회 조회 사이클. session["driver"] 가 없으면 새로 띄운다.
+    반환값: (run_state, run_detail)
+    """
+    # 오래 떠 있는 프로세스이므로 보존 기간 정리/로그 압축도 사이클마다 한다
+    sent_posts.maintain()
+    mark = sent_posts.high_water_mark()
+
+    precheck = _cookie_precheck(cookie_pairs)
+    if precheck == "throttled":
+        _close_browser(session)
+        return _response_failure() or ("throttled", _RESPONSE_FAILURES["throttled"])
+    if precheck == "expired":
+        _close_browser(session)
+        await _send_cookie_alert()
+        return "cookie_expired", "쿠키 만료"
+
+    posts, result = _try_http_backend(cookie_pairs, mark=mark)
+    if result is None:
+        reused = session.get("driver") is not None
+        if not reused:
+            session.update(_open_browser(cookie_pairs))
+        posts, result = _collect_with_session(session, cookie_pairs, mark)
+
+        if result == "login" and reused:
+            print("유지 중인 세션이 로그인 페이지로 리다이렉트됨: 드라이버 재생성")
+            _count_retry("driver_recreate")
+            _close_browser(session)
+            session.update(_open_browser(cookie_pairs))
+            posts, result = _collect_with_session(session, cookie_pairs, mark)
+
+    await _sync_drift_alert()
+    if result == "login":
+        _close_browser(session)
+        await _send_cookie_alert()
+        return "cookie_expired", "쿠키 만료"
+    if result == "drift":
+        return "drift", _drift_detail() or "피드 마크업 변경 감지"
+    if result in _RESPONSE_FAILURES:
+        if result in ("throttled", "captcha"):
+            # 한동안 다시 조회하지 않으므로 Chrome 메모리를 돌려준다
+            _close_browser(session)
+        return _response_failure() or (result, _RESPONSE_FAILURES[result])
+    if result in ("timeout", "error"):
+        return "error", _memory_failure_detail() or "피드 조회 실패"
+
+    new_posts_count = await _deliver_new_posts(posts, sent_posts)
+    if new_posts_count > 0:
+        print(f"--> {new_posts_count}건 전송 완료.")
+        return "ok", f"새 글 {new_posts_count}건"
+    print("--> 신규 게시글이 없습니다.")
+    return "ok", "신규 게시글 없음"
+
+
+async def run_daemon():
+    """인증된 Chrome 세션 하나를 유지하며 DAEMON_POLL_INTERVAL(adaptive 면 스케줄러가 정한 간격)마다 피드를 재조회한다."""
+    if sys.platform == "win32":
+        print("Windows 환경에서는 본 스크립트 실행을 제한합니다.")
+        update_health_files("skipped", "windows_not_supported")
+        return
+
+    lock_file, acquired = _acquire_run_lock()
+    if not acquired:
+        return
+
+    cookie_pairs = _session_cookie_pairs(_parse_cookie_pairs(NAVER_COOKIE))
+    session = {"driver": None, "profile": None, "warm": False}
+    browser = {"driver": None, "broken": False}
+    accounts = None
+    health_server = None
+    missing = _check_startup()
+    if missing:
+        print(f"의존성 누락: {', '.join(missing)} (pip install -r requirements.txt 필요)")
+        update_health_files("error", f"의존성 누락: {', '.join(missing)}")
+        _release_run_lock(lock_file)
+        return DEPENDENCY_EXIT_CODE
+    signal.signal(signal.SIGALRM, _timeout_alarm_handler)
+    signal.signal(signal.SIGTERM, _terminate_handler)
+    if SCHEDULER_MODE == "adaptive":
+        print(f"데몬 모드 시작 (적응형 조회 주기 {SCHED_MIN_INTERVAL}~{SCHED_MAX_INTERVAL}초)")
+    else:
+        print(f"데몬 모드 시작 (조회 주기 {DAEMON_POLL_INTERVAL}초)")
+
+    try:
+        if HEALTH_PORT:
             try:
-                lock_file.close()
-            except Exception:
-                pass
-        update_health_files(run_state, run_detail)
+                health_server = start_health_server(_get_health_store(), HEALTH_BIND, HEALTH_PORT, HEALTH_STALE_SECONDS)
+                print(f"상태 엔드포인트: http://{HEALTH_BIND}:{HEALTH_PORT}/healthz, /status")
+            except OSError as e:
+                print(f"상태 엔드포인트 시작 실패 ({HEALTH_BIND}:{HEALTH_PORT}): {e}")
+        try:
+            accounts = _load_accounts()
+        except Exception as e:
+            print(f"계정 설정 로드 실패: {e}")
+            update_health_files("error", f"계정 설정 로드 실패: {e}")
+            return
+        sent_posts = load_sent_posts() if accounts is None else None
+        if sent_posts is not None:
+            print(f"기존 sent_posts: {len(sent_posts)}")
+
+        while True:
+            cooldown = _cooldown_remaining()
+            if cooldown is not None:
+                run_detail = f"요청 제한 대기 {cooldown[0]:.0f}초 남음 ({cooldown[1]})"
+                print(run_detail)
+                update_health_files("cooldown", run_detail, accounts)
+                await _daemon_sleep(cooldown[0], "cooldown", run_detail, accounts)
+                continue
+
+            KST = timezone(timedelta(hours=9))
+            print("\n" + "=" * 50)
+            print(f"조회 시작: {datetime.now(KST).strftime('%Y-%m-%d %H:%M:%S')} (KST)")
+            print("=" * 50)
+
+            run_state = "running"
+            run_detail = "시작"
+            next_interval = None
+            _reset_run_stats()
+            _arm_alarm(DAEMON_CYCLE_TIMEOUT if accounts is None else _accounts_alarm_seconds(DAEMON_CYCLE_TIMEOUT, accounts))
+            try:
+                if accounts is not None:
+                    run_state, run_detail = await _run_accounts_cycle(browser, accounts)
+                    if browser["broken"]:
+                        _close_accounts_browser(browser, accounts)
+                    if any(account["state"] == "cookie_expired" for account in accounts):
+                        load_dotenv(override=True)
+                else:
+                    if not cookie_pairs:
+                        cookie_pairs = _reload_cookie_pairs()
+                    if not cookie_pairs:
+                        print("NAVER_COOKIE가 설정되지 않았거나 형식이 유효하지 않습니다.")
+                        run_state = "error"
+                        run_detail = "피드 조회 실패"
+                    else:
+                        run_state, run_detail = await _run_daemon_cycle(session, cookie_pairs, sent_posts)
+                        if run_state == "cookie_expired":
+                            cookie_pairs = _reload_cookie_pairs()
+            except TimeoutError as e:
+                # 타임아웃으로 끊긴 세션은 상태를 신뢰할 수 없으므로 폐기한다.
+                run_state = "error"
+                run_detail = str(e)
+                print(f"실행 시간 초과: {e}")
+                _close_browser(session)
+                _close_accounts_browser(browser, accounts)
+            except Exception as e:
+                run_state = "error"
+                run_detail = _memory_failure_detail() or f"예기치 못한 예외: {e}"
+                if _is_chromedriver_connection_issue(str(e)):
+                    print(f"ChromeDriver connection issue (possible OOM): {e}")
+                    _close_browser(session)
+                    _close_accounts_browser(browser, accounts)
+                else:
+                    print(f"피드 조회 실패: {e}")
+            finally:
+                signal.alarm(0)
+                next_interval = _record_schedule(run_state)
+                _export_metrics(run_state)
+                _append_run_history(run_state, run_detail)
+                update_health_files(run_state, run_detail, accounts)
+
+            await _daemon_sleep(next_interval or DAEMON_POLL_INTERVAL, run_state, run_detail, accounts)
+
+    except (asyncio.CancelledError, KeyboardInterrupt):
+        print("데몬을 종료합니다.")
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        _close_browser(session)
+        _close_accounts_browser(browser, accounts)
+        _release_run_lock(lock_file)
+        await _close_telegram()
+        update_health_files("stopped", "데몬 종료")
+        if health_server is not None:
+            health_server.shutdown()
+            health_server.server_close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="네이버 카페 피드 텔레그램 알림 봇")
+    parser.add_argument("--daemon", action="store_true", help="Chrome 세션을 유지하며 주기적으로 조회")
+    args = parser.parse_args()
+
+    if args.daemon:
+        sys.exit(asyncio.run(run_daemon()))
+    else:
+        sys.exit(asyncio.run(main()))
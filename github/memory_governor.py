@@ -0,0 +1,116 @@
+import collections
+import os
+import signal
+import threading
+import time
+
+
+class MemoryFloorError(RuntimeError):
+    """가용 메모리가 하한보다 적어 Chrome 을 띄우지 않는다."""
+
+
+def available_memory_mb():
+    """/proc/meminfo 의 MemAvailable (MB). 읽을 수 없으면 None."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def process_tree(root_pid):
+    """/proc 을 훑어 root_pid 와 모든 자손 pid 를 반환한다."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # comm 에 공백/괄호가 들어갈 수 있으므로 마지막 ')' 뒤에서 ppid 를 읽는다
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+
+    tree = []
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        tree.append(pid)
+        stack.extend(children.get(pid, ()))
+    return tree
+
+
+def tree_rss_kb(pids):
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return total
+
+
+def kill_tree(pids):
+    """자식부터 SIGKILL 한다. 이미 끝난 프로세스는 무시한다."""
+    for pid in reversed(pids):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+class MemoryGovernor(threading.Thread):
+    """
+    chromedriver 와 그 아래 Chrome 프로세스 전체의 RSS 를 주기적으로 잰다.
+    budget_mb 를 넘으면 커널 OOM killer 보다 먼저 프로세스 트리를 종료하고 exceeded 를 남긴다.
+    """
+
+    def __init__(self, root_pid, budget_mb=0, interval=0.2, on_exceeded=None):
+        super().__init__(daemon=True)
+        self.root_pid = root_pid
+        self.budget_kb = budget_mb * 1024
+        self.interval = interval
+        self.on_exceeded = on_exceeded
+        self.samples = collections.deque(maxlen=3000)
+        self.peak_kb = 0
+        self.exceeded = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                pids = process_tree(self.root_pid)
+                rss_kb = tree_rss_kb(pids)
+            except Exception:
+                rss_kb = 0
+                pids = []
+            self.samples.append((time.monotonic(), rss_kb))
+            self.peak_kb = max(self.peak_kb, rss_kb)
+
+            if self.budget_kb and rss_kb > self.budget_kb:
+                self.exceeded = {"rss_mb": rss_kb // 1024, "processes": len(pids)}
+                kill_tree(pids)
+                if self.on_exceeded is not None:
+                    self.on_exceeded(self.exceeded)
+                return
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=2)
+        return self.peak_kb
+
+    def peak_between(self, started, finished):
+        """[started, finished] (time.monotonic 기준) 구간의 최대 RSS (MB). 표본이 없으면 None."""
+        values = [rss for at, rss in list(self.samples) if started <= at <= finished]
+        return round(max(values) / 1024, 1) if values else None
@@ -0,0 +1,137 @@
+import json
+import os
+from pathlib import Path
+
+
+# 단계/실행 소요 시간 히스토그램 구간(초)
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0, 120.0)
+
+_HELP = {
+    "naver_bot_runs_total": ("counter", "실행(데몬은 사이클) 결과별 횟수"),
+    "naver_bot_wait_results_total": ("counter", "피드 대기 결과별 횟수"),
+    "naver_bot_retries_total": ("counter", "재시도 종류별 횟수"),
+    "naver_bot_posts_sent_total": ("counter", "전송한 새 글 수"),
+    "naver_bot_telegram_messages_total": ("counter", "텔레그램 메시지 전송 결과별 횟수"),
+    "naver_bot_backfill_scans_total": ("counter", "하이워터마크 기준 수집 횟수 (gap: closed/open)"),
+    "naver_bot_backfill_recovered_total": ("counter", "첫 페이지 밖에서 되찾은 글 수"),
+    "naver_bot_outbox_dropped_total": ("counter", "재시도 한도를 넘겨 전송을 포기한 글 수"),
+    "naver_bot_outbox_pending": ("gauge", "전송 대기열에 남은 글 수"),
+    "naver_bot_run_duration_seconds": ("histogram", "실행(데몬은 사이클) 1회 소요 시간"),
+    "naver_bot_phase_duration_seconds": ("histogram", "단계별 소요 시간"),
+    "naver_bot_last_run_timestamp_seconds": ("gauge", "마지막 실행 종료 시각 (unix time)"),
+    "naver_bot_last_run_success": ("gauge", "마지막 실행 성공 여부 (1/0)"),
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    """라벨을 Prometheus 표기(key="value",...)로 만든다. 누적 상태의 키로도 쓴다."""
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items()))
+
+
+class MetricsStore:
+    """
+    Prometheus textfile collector 용 누적 지표.
+    cron 실행은 매번 새 프로세스이므로 누적값은 state 파일(JSON)에 보관했다가 실행마다 더한다.
+    """
+
+    def __init__(self, textfile_path, state_path):
+        self.textfile_path = Path(textfile_path)
+        self.state_path = Path(state_path)
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+        self._load()
+
+    def _load(self):
+        if not self.state_path.exists():
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.counters = state.get("counters", {})
+            self.histograms = state.get("histograms", {})
+            self.gauges = state.get("gauges", {})
+        except Exception as e:
+            print(f"지표 상태 파일 로드 실패 ({self.state_path}): {e}")
+
+    def inc(self, name, value=1, **labels):
+        series = self.counters.setdefault(name, {})
+        key = _labels(**labels)
+        series[key] = series.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        series = self.histograms.setdefault(name, {})
+        key = _labels(**labels)
+        hist = series.setdefault(key, {"buckets": [0] * len(DURATION_BUCKETS), "sum": 0.0, "count": 0})
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                hist["buckets"][index] += 1
+        hist["sum"] += seconds
+        hist["count"] += 1
+
+    def set(self, name, value, **labels):
+        self.gauges.setdefault(name, {})[_labels(**labels)] = value
+
+    def record_run(self, run_state, run_seconds, stats):
+        """실행 1회의 결과와 _RUN_STATS(spans/waits/retries/telegram/backfill/posts_sent/outbox)를 누적한다."""
+        self.inc("naver_bot_runs_total", outcome=run_state)
+        self.observe("naver_bot_run_duration_seconds", run_seconds)
+        for span in stats.get("spans", ()):
+            self.observe("naver_bot_phase_duration_seconds", span["seconds"], phase=span["phase"])
+        for wait in stats.get("waits", ()):
+            self.inc("naver_bot_wait_results_total", result=wait["outcome"])
+        for kind, count in stats.get("retries", {}).items():
+            self.inc("naver_bot_retries_total", count, kind=kind)
+        for outcome, count in stats.get("telegram", {}).items():
+            self.inc("naver_bot_telegram_messages_total", count, outcome=outcome)
+        for scan in stats.get("backfill", ()):
+            self.inc("naver_bot_backfill_scans_total", gap="closed" if scan["gap_closed"] else "open")
+            self.inc("naver_bot_backfill_recovered_total", scan["recovered"])
+        self.inc("naver_bot_posts_sent_total", stats.get("posts_sent", 0))
+        outbox = stats.get("outbox")
+        if outbox:
+            self.inc("naver_bot_outbox_dropped_total", outbox.get("dropped", 0))
+            self.set("naver_bot_outbox_pending", outbox.get("pending", 0))
+        self.set("naver_bot_last_run_timestamp_seconds", stats.get("finished_at", 0))
+        self.set("naver_bot_last_run_success", 1 if run_state == "ok" else 0)
+
+    def render(self):
+        lines = []
+        for name, (kind, help_text) in _HELP.items():
+            if kind == "counter":
+                series = self.counters.get(name)
+            elif kind == "gauge":
+                series = self.gauges.get(name)
+            else:
+                series = self.histograms.get(name)
+            if not series:
+                continue
+
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(series.items()):
+                if kind != "histogram":
+                    lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+                    continue
+                prefix = f"{labels}," if labels else ""
+                for bound, count in zip(DURATION_BUCKETS, value["buckets"]):
+                    lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {value["count"]}')
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{name}_sum{suffix} {round(value['sum'], 6)}")
+                lines.append(f"{name}_count{suffix} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def save(self):
+        """state 와 textfile 을 임시 파일 + rename 으로 교체한다 (node_exporter 가 반쯤 쓴 파일을 읽지 않도록)."""
+        state = {"counters": self.counters, "histograms": self.histograms, "gauges": self.gauges}
+        for path, content in ((self.state_path, json.dumps(state, ensure_ascii=False)), (self.textfile_path, self.render())):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
@@ -0,0 +1,423 @@
+import json
+import os
+import re
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urljoin, urlsplit
+
+
+# ── 게시글 키 ──
+
+_CAFE_HOSTS = ("cafe.naver.com", "m.cafe.naver.com")
+_IFRAME_PARAMS = ("iframe_url_utf8", "iframe_url")
+_CLUB_ARTICLE_PATH = re.compile(r"/(?:ca-fe|f-e)/(?:web/)?cafes/(\d+)/articles/(\d+)")
+_NAME_ARTICLE_PATH = re.compile(r"^/([A-Za-z0-9_-]+)/(\d+)/?$")
+_NAME_PATH = re.compile(r"^/([A-Za-z0-9_-]+)/?$")
+
+
+def canonical_article_key(url, aliases=None):
+    """
+    카페 글 주소에서 "카페ID/글ID" 키를 뽑는다. 쿼리/프래그먼트 차이는 무시한다.
+    카페 이름 형태(/movie02/123)는 aliases(이름 -> 카페ID)를 알면 카페ID 로, 모르면 "이름/글ID" 로 만든다.
+    해석할 수 없는 주소면 None.
+    """
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    if (parts.hostname or "").lower() not in _CAFE_HOSTS:
+        return None
+    query = {k.lower(): v[0] for k, v in parse_qs(parts.query).items() if v}
+
+    # 예전 iframe 형태: /movie02?iframe_url=/ArticleRead.nhn%3Fclubid%3D1%26articleid%3D2
+    # (iframe_url_utf8 은 한 번 더 인코딩되어 오는 경우가 있다)
+    for name in _IFRAME_PARAMS:
+        value = query.get(name)
+        for candidate in (value, unquote(value or "")) if value else ():
+            key = canonical_article_key(urljoin("https://cafe.naver.com/", candidate), aliases)
+            if key:
+                return key
+
+    # /ca-fe/cafes/1/articles/2, /f-e/cafes/..., m.cafe 의 /ca-fe/web/cafes/...
+    match = _CLUB_ARTICLE_PATH.search(parts.path)
+    if match:
+        return f"{match.group(1)}/{match.group(2)}"
+
+    # /ArticleRead.nhn?clubid=1&articleid=2
+    club_id = query.get("clubid", "")
+    article_id = query.get("articleid", "")
+    if club_id.isdigit() and article_id.isdigit():
+        return f"{club_id}/{article_id}"
+
+    # /movie02/123 또는 /movie02?articleid=123
+    match = _NAME_ARTICLE_PATH.match(parts.path)
+    if match:
+        cafe_name, article_id = match.group(1).lower(), match.group(2)
+    else:
+        match = _NAME_PATH.match(parts.path)
+        if not match or not article_id.isdigit():
+            return None
+        cafe_name = match.group(1).lower()
+    club_id = (aliases or {}).get(cafe_name)
+    return f"{club_id or cafe_name}/{article_id}"
+
+
+# ── 하이워터마크 ──
+
+# 직전 조회에서 본 최신 글을 몇 건 기억한다 (맨 위 글이 삭제돼도 그다음 글에서 멈출 수 있도록)
+HIGH_WATER_SIZE = 3
+
+
+class HighWaterMark:
+    """
+    직전 조회에서 본 최신 글들. 피드를 위에서부터 읽다가 이 중 하나를 만나면 그 아래는 이미 본 글이다.
+    links 는 브라우저 안에서 원문 비교로 먼저 멈출 때 쓰고, 주소 형태가 바뀐 경우는 키로 확인한다.
+    """
+
+    def __init__(self, entries, key_for, label=None):
+        self.links = [link for _, link in entries]
+        self.keys = {key for key, _ in entries}
+        self.label = label
+        self._key_for = key_for
+
+    def __bool__(self):
+        return bool(self.keys)
+
+    def reached(self, link):
+        return link in self.links or (self._key_for(link) or link) in self.keys
+
+
+# ── 전송 이력 저장소 ──
+
+
+class SentPostStore:
+    """
+    전송 이력 저장소.
+    추가 전용 로그(JSON Lines) + 메모리 해시 인덱스로 조회는 O(1), 기록은 한 줄 append + fsync.
+    보존은 개수가 아니라 기간(retention_days) 기준이며, 로그가 부풀면 임시 파일 + rename 으로 압축한다.
+    키는 canonical_article_key() 결과이고, 카페 이름 -> 카페ID 별칭과 하이워터마크도 같은 로그에 기록한다.
+    """
+
+    def __init__(self, path, retention_days=30, legacy_path=None):
+        self.path = Path(path)
+        self.retention_seconds = retention_days * 86400
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self._entries = {}
+        self._aliases = {}
+        self._mark = []
+        self._log_lines = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self):
+        """로그를 읽어 인덱스를 만든다. 잘린 마지막 줄/깨진 줄은 건너뛴다."""
+        self._entries = {}
+        self._aliases = {}
+        self._mark = []
+        self._log_lines = 0
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    self._log_lines += 1
+                    try:
+                        record = json.loads(line)
+                        if "alias" in record:
+                            self._aliases[record["alias"]] = str(record["club"])
+                        elif "mark" in record:
+                            self._mark = [(str(key), str(link)) for key, link in record["mark"]]
+                        else:
+                            self._entries[record["key"]] = record
+                    except (ValueError, KeyError, TypeError):
+                        continue
+            self._rekey_entries()
+        elif self.legacy_path is not None and self.legacy_path.exists():
+            self._migrate_legacy()
+
+        self.maintain()
+        return self
+
+    def _migrate_legacy(self):
+        """예전 JSON 리스트 파일(링크 목록)을 가져온다. 전송 시각을 모르므로 지금 시각으로 기록한다."""
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                links = json.load(f)
+        except Exception as e:
+            print(f"기존 전송 이력 변환 실패 ({self.legacy_path}): {e}")
+            return
+
+        now = time.time()
+        for link in links if isinstance(links, list) else []:
+            if isinstance(link, str) and link:
+                key = self.key_for(link) or link
+                self._entries[key] = {"key": key, "link": link, "ts": now}
+        self._log_lines = 0
+        self.compact()
+        migrated = self.legacy_path.with_name(self.legacy_path.name + ".migrated")
+        os.replace(self.legacy_path, migrated)
+        print(f"기존 전송 이력 {len(self._entries)}건 변환 완료: {self.legacy_path} -> {self.path}")
+
+    def key_for(self, link):
+        """링크의 중복 판정 키. 해석할 수 없으면 None."""
+        return canonical_article_key(link, self._aliases)
+
+    def _rekey(self, key, link):
+        if "://" in key:
+            # 예전 sent_posts.json 처럼 링크 자체가 키인 항목
+            return self.key_for(link or key) or key
+        cafe_name, sep, article_id = key.partition("/")
+        if sep and cafe_name in self._aliases:
+            return f"{self._aliases[cafe_name]}/{article_id}"
+        return key
+
+    def _rekey_entries(self):
+        """링크 키/이름 키를 현재 별칭 기준 키로 다시 맞춘다. 같은 글이 겹치면 최근 기록을 남긴다."""
+        rekeyed = {}
+        for key, record in self._entries.items():
+            new_key = self._rekey(key, record.get("link"))
+            if new_key != key:
+                record = dict(record, key=new_key)
+            previous = rekeyed.get(new_key)
+            if previous is None or previous.get("ts", 0) <= record.get("ts", 0):
+                rekeyed[new_key] = record
+        self._entries = rekeyed
+        self._mark = [(self._rekey(key, link), link) for key, link in self._mark]
+
+    def learn_alias(self, cafe_name, club_id):
+        """카페 이름 -> 카페ID 대응을 기록하고, 이름으로 저장된 기존 항목을 카페ID 키로 옮긴다."""
+        cafe_name = str(cafe_name).lower()
+        club_id = str(club_id)
+        if not cafe_name or not club_id.isdigit() or self._aliases.get(cafe_name) == club_id:
+            return False
+        self._aliases[cafe_name] = club_id
+        self._append([json.dumps({"alias": cafe_name, "club": club_id, "ts": time.time()}, ensure_ascii=False)])
+        self._rekey_entries()
+        return True
+
+    def high_water_mark(self, label=None):
+        """직전 조회의 최신 글 목록. 기록이 없으면 빈 마크(거짓)."""
+        return HighWaterMark(self._mark, self.key_for, label)
+
+    def advance_mark(self, entries):
+        """
+        이번 조회에서 본 (key, link) 목록(최신 글부터)으로 마크를 앞으로 옮긴다.
+        새 글이 HIGH_WATER_SIZE 건보다 적으면 기존 마크로 나머지를 채운다.
+        """
+        mark = []
+        seen = set()
+        for key, link in list(entries) + self._mark:
+            if key in seen:
+                continue
+            mark.append((key, link))
+            seen.add(key)
+            if len(mark) == HIGH_WATER_SIZE:
+                break
+        if mark == self._mark:
+            return False
+        self._mark = mark
+        self._append([json.dumps({"mark": mark, "ts": time.time()}, ensure_ascii=False)])
+        return True
+
+    def maintain(self):
+        """보존 기간이 지난 항목을 버리고, 로그에 죽은 줄이 많으면 압축한다."""
+        cutoff = time.time() - self.retention_seconds
+        expired = [key for key, record in self._entries.items() if record.get("ts", 0) < cutoff]
+        for key in expired:
+            del self._entries[key]
+        if self._log_lines > 2 * (len(self._entries) + len(self._aliases)) + 100:
+            self.compact()
+
+    def add_many(self, entries):
+        """(key, link) 목록을 기록한다. 이미 있는 key 는 무시하고, fsync 는 한 번만 한다."""
+        now = time.time()
+        lines = []
+        for key, link in entries:
+            if key in self._entries:
+                continue
+            record = {"key": key, "link": link, "ts": now}
+            self._entries[key] = record
+            lines.append(json.dumps(record, ensure_ascii=False))
+        if lines:
+            self._append(lines)
+        return len(lines)
+
+    def _append(self, lines):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_lines += len(lines)
+
+    def add(self, link):
+        """링크 1건을 기록한다. 해석할 수 없는 링크는 링크 자체를 키로 쓴다."""
+        return self.add_many([(self.key_for(link) or link, link)]) == 1
+
+    def compact(self):
+        """살아 있는 항목만 임시 파일에 쓰고 rename 으로 교체한다 (중간에 죽어도 기존 로그는 온전)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        records = sorted(self._entries.values(), key=lambda r: r.get("ts", 0))
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for cafe_name, club_id in sorted(self._aliases.items()):
+                f.write(json.dumps({"alias": cafe_name, "club": club_id}, ensure_ascii=False) + "\n")
+            if self._mark:
+                f.write(json.dumps({"mark": self._mark}, ensure_ascii=False) + "\n")
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        try:
+            dir_fd = os.open(str(self.path.parent), os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+        self._log_lines = len(records) + len(self._aliases) + (1 if self._mark else 0)
+
+
+# ── 전송 대기열 ──
+
+class Outbox:
+    """
+    텔레그램 전송 대기열.
+    새 글은 전송하기 전에 먼저 추가 전용 로그(JSON Lines, append + fsync)에 넣고, 텔레그램이 확인한 뒤에야 뺀다.
+    실행이 전송 도중 죽어도(SIGALRM/OOM) 남은 항목은 다음 실행이 이어서 보낸다.
+    실패한 항목은 backoff_base 초부터 두 배씩(최대 backoff_max) 늦춰 다시 보내고, max_attempts 회 실패하면 포기한다.
+    기록: {"key", "link", "text", "ts"} 추가 / {"done": key} 완료 / {"retry": key, "attempts", "next_at"} 실패 / {"drop": key} 포기
+    """
+
+    def __init__(self, path, backoff_base=60, backoff_max=3600, max_attempts=8):
+        self.path = Path(path)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_attempts = max_attempts
+        self._items = {}
+        self._log_lines = 0
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def load(self):
+        """로그를 읽어 남은 항목을 복원한다. 잘린 마지막 줄/깨진 줄은 건너뛴다."""
+        self._items = {}
+        self._log_lines = 0
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    self._log_lines += 1
+                    try:
+                        record = json.loads(line)
+                        if "done" in record:
+                            self._items.pop(record["done"], None)
+                        elif "drop" in record:
+                            self._items.pop(record["drop"], None)
+                        elif "retry" in record:
+                            item = self._items.get(record["retry"])
+                            if item is not None:
+                                item.update(attempts=int(record["attempts"]), next_at=float(record["next_at"]))
+                        else:
+                            self._items[record["key"]] = {
+                                "key": record["key"],
+                                "link": record["link"],
+                                "text": record["text"],
+                                "ts": record.get("ts", 0),
+                                "attempts": int(record.get("attempts", 0)),
+                                "next_at": float(record.get("next_at", 0)),
+                            }
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        self._maybe_compact()
+        return self
+
+    def _maybe_compact(self):
+        """완료/재시도/포기 줄이 쌓여 죽은 줄이 많으면 압축한다 (데몬은 대기열을 다시 읽지 않으므로 기록할 때마다 확인)."""
+        if self._log_lines > 2 * len(self._items) + 50:
+            self.compact()
+
+    def enqueue(self, entries):
+        """(key, link, text) 목록을 대기열에 넣는다. 이미 있는 key 는 무시하고, fsync 는 한 번만 한다."""
+        now = time.time()
+        lines = []
+        for key, link, text in entries:
+            if key in self._items:
+                continue
+            record = {"key": key, "link": link, "text": text, "ts": now}
+            self._items[key] = dict(record, attempts=0, next_at=0.0)
+            lines.append(json.dumps(record, ensure_ascii=False))
+        if lines:
+            self._append(lines)
+        return len(lines)
+
+    def due(self, now=None):
+        """지금 보낼 차례인 항목 (넣은 순서대로)."""
+        now = time.time() if now is None else now
+        items = [item for item in self._items.values() if item["next_at"] <= now]
+        return sorted(items, key=lambda item: item["ts"])
+
+    def done(self, keys):
+        """텔레그램이 확인한 항목을 뺀다."""
+        lines = [json.dumps({"done": key}, ensure_ascii=False) for key in keys if self._items.pop(key, None)]
+        if lines:
+            self._append(lines)
+            self._maybe_compact()
+
+    def failed(self, keys):
+        """
+        전송 실패를 기록하고 다음 시도 시각을 늦춘다.
+        반환값: max_attempts 에 닿아 포기한 항목 목록
+        """
+        now = time.time()
+        lines = []
+        dropped = []
+        for key in keys:
+            item = self._items.get(key)
+            if item is None:
+                continue
+            item["attempts"] += 1
+            if item["attempts"] >= self.max_attempts:
+                del self._items[key]
+                dropped.append(item)
+                lines.append(json.dumps({"drop": key}, ensure_ascii=False))
+                continue
+            item["next_at"] = now + min(self.backoff_base * 2 ** (item["attempts"] - 1), self.backoff_max)
+            lines.append(json.dumps({"retry": key, "attempts": item["attempts"], "next_at": item["next_at"]}))
+        if lines:
+            self._append(lines)
+            self._maybe_compact()
+        return dropped
+
+    def _append(self, lines):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_lines += len(lines)
+
+    def compact(self):
+        """남은 항목만 임시 파일에 쓰고 rename 으로 교체한다."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        items = sorted(self._items.values(), key=lambda item: item["ts"])
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._log_lines = len(items)
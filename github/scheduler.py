@@ -0,0 +1,294 @@
+"""
+새 글 도착률에 맞춰 조회 간격을 조절하는 스케줄러.
+
+요일·시간(주 168칸)별 도착률을 실행 기록으로 학습해, 글이 자주 올라오는 시간에는 짧게,
+뜸한 시간에는 길게(min~max, 지터 포함) 다음 조회 시각을 정한다.
+
+    # 기록된 도착 시각으로 고정 주기 대비 지연/실행 횟수를 재현 (실제 조회 없음)
+    python scheduler.py --replay --baseline 180
+"""
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+KST = timezone(timedelta(hours=9))
+HOURS_PER_WEEK = 168
+# 한 번의 조회 창으로 인정하는 최대 길이 (봇이 오래 멈췄던 구간은 관측으로 치지 않는다)
+MAX_OBSERVED_WINDOW = 6 * 3600
+# 데이터가 적은 칸은 전체 평균 쪽으로 당긴다 (가상 관측 시간, 시간 단위)
+PRIOR_HOURS = 1.0
+
+
+def append_arrivals(path, polled_at, arrivals):
+    """
+    조회 1회에서 처음 본 글들의 작성 시각을 도착 기록(JSONL)에 덧붙인다.
+    fixed 모드에서도 쌓아 두어야 --replay 로 적응형 전환 효과를 미리 비교할 수 있다.
+    """
+    if not arrivals:
+        return
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"polled_at": round(polled_at, 3), "arrivals": [round(a, 3) for a in arrivals]}) + "\n")
+    except Exception as e:
+        print(f"도착 기록 저장 실패 ({path}): {e}")
+
+
+def hour_of_week(ts):
+    dt = datetime.fromtimestamp(ts, KST)
+    return dt.weekday() * 24 + dt.hour
+
+
+def _split_window(start, end):
+    """(start, end] 구간을 주간 시간 칸별 초로 나눈다."""
+    parts = []
+    cursor = start
+    while cursor < end:
+        next_hour = (math.floor(cursor / 3600) + 1) * 3600
+        stop = min(end, next_hour)
+        parts.append((hour_of_week(cursor), stop - cursor))
+        cursor = stop
+    return parts
+
+
+class AdaptiveScheduler:
+    """
+    주간 시간 칸별 도착 수/관측 시간을 지수 감쇠(half_life_days)로 누적한다.
+    다음 간격 = target_posts 건이 도착할 것으로 기대되는 시간 (min~max 로 제한, ±jitter).
+    직전 조회에서 새 글이 있었으면 간격을 절반으로 줄여 몰려오는 글을 빨리 잡는다.
+    """
+
+    def __init__(self, state_path, arrivals_path=None, min_interval=60, max_interval=900,
+                 default_interval=180, target_posts=0.15, jitter=0.15, half_life_days=28):
+        self.state_path = Path(state_path) if state_path else None
+        self.arrivals_path = Path(arrivals_path) if arrivals_path else None
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.target_posts = target_posts
+        self.jitter = jitter
+        self.decay_seconds = half_life_days * 86400 / math.log(2)
+        self.arrivals = [0.0] * HOURS_PER_WEEK
+        self.observed = [0.0] * HOURS_PER_WEEK
+        self.updated_at = None
+        self.last_poll_at = None
+        self.last_new_posts = 0
+        self.next_run_at = None
+
+    # ── 상태 저장/로드 ──
+
+    def load(self):
+        if self.state_path is None or not self.state_path.exists():
+            return self
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if len(state.get("arrivals", [])) == HOURS_PER_WEEK and len(state.get("observed", [])) == HOURS_PER_WEEK:
+                self.arrivals = [float(v) for v in state["arrivals"]]
+                self.observed = [float(v) for v in state["observed"]]
+            self.updated_at = state.get("updated_at")
+            self.last_poll_at = state.get("last_poll_at")
+            self.last_new_posts = state.get("last_new_posts", 0)
+            self.next_run_at = state.get("next_run_at")
+        except Exception as e:
+            print(f"스케줄 상태 로드 실패 ({self.state_path}): {e}")
+        return self
+
+    def save(self):
+        if self.state_path is None:
+            return
+        state = {
+            "arrivals": [round(v, 6) for v in self.arrivals],
+            "observed": [round(v, 3) for v in self.observed],
+            "updated_at": self.updated_at,
+            "last_poll_at": self.last_poll_at,
+            "last_new_posts": self.last_new_posts,
+            "next_run_at": self.next_run_at,
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _append_arrivals(self, polled_at, arrivals):
+        if self.arrivals_path is not None:
+            append_arrivals(self.arrivals_path, polled_at, arrivals)
+
+    # ── 학습 ──
+
+    def _decay(self, now):
+        if self.updated_at is not None and now > self.updated_at:
+            factor = math.exp(-(now - self.updated_at) / self.decay_seconds)
+            self.arrivals = [v * factor for v in self.arrivals]
+            self.observed = [v * factor for v in self.observed]
+        self.updated_at = now
+
+    def observe(self, polled_at, arrivals):
+        """조회 1회의 결과를 학습한다. arrivals: 이번에 처음 본 글들의 작성 시각(unix time) 목록."""
+        self._decay(polled_at)
+        window_start = self.last_poll_at
+        if window_start is not None and 0 < polled_at - window_start <= MAX_OBSERVED_WINDOW:
+            for bucket, seconds in _split_window(window_start, polled_at):
+                self.observed[bucket] += seconds
+        else:
+            window_start = polled_at - MAX_OBSERVED_WINDOW
+        for arrival in arrivals:
+            # 작성 시각 추정이 조회 창을 벗어나면 창 안으로 당긴다
+            arrival = min(max(arrival, window_start), polled_at)
+            self.arrivals[hour_of_week(arrival)] += 1
+        self.last_poll_at = polled_at
+        self.last_new_posts = len(arrivals)
+
+    def record_poll(self, polled_at, arrivals):
+        """실제 조회 결과를 학습하고 다음 실행 시각을 정해 저장한다. 반환값: 다음 간격(초)."""
+        self.observe(polled_at, arrivals)
+        self._append_arrivals(polled_at, arrivals)
+        interval = self.next_interval(polled_at)
+        self.next_run_at = polled_at + interval
+        self.save()
+        return interval
+
+    def record_failure(self, now, delay=None):
+        """조회 실패: 관측으로 치지 않고 delay(기본 min_interval) 뒤에 다시 시도한다."""
+        delay = self.min_interval if delay is None else delay
+        self.next_run_at = now + delay
+        self.save()
+        return delay
+
+    # ── 예측 ──
+
+    def rate_per_hour(self, ts):
+        """ts 가 속한 주간 시간 칸의 예상 도착률(건/시간). 관측이 전혀 없으면 None."""
+        total_hours = sum(self.observed) / 3600
+        if total_hours <= 0:
+            return None
+        global_rate = sum(self.arrivals) / total_hours
+        bucket = hour_of_week(ts)
+        return (self.arrivals[bucket] + PRIOR_HOURS * global_rate) / (self.observed[bucket] / 3600 + PRIOR_HOURS)
+
+    def next_interval(self, now, rng=random):
+        rate = self.rate_per_hour(now)
+        if rate is None:
+            interval = self.default_interval
+        elif rate <= 0:
+            interval = self.max_interval
+        else:
+            interval = self.target_posts / rate * 3600
+        if self.last_new_posts:
+            interval /= 2
+        interval = min(self.max_interval, max(self.min_interval, interval))
+        interval *= 1 + rng.uniform(-self.jitter, self.jitter)
+        return round(min(self.max_interval, max(self.min_interval, interval)), 1)
+
+    def seconds_until_due(self, now):
+        """다음 실행까지 남은 초. 0 이하이면 지금 실행한다."""
+        if self.next_run_at is None:
+            return 0
+        return self.next_run_at - now
+
+
+# ── 재현(dry-run) ──
+
+def load_arrivals(path):
+    arrivals = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                arrivals.extend(json.loads(line)["arrivals"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return sorted(arrivals)
+
+
+def _simulate(arrivals, next_interval, start, end):
+    """
+    조회 시각을 진행시키며 도착→발견 지연을 잰다. next_interval(polled_at, found) 가 다음 간격을 준다.
+    마지막 조회(end 이전) 뒤에 도착한 글도 버리지 않고, 다음 조회 1회를 더 진행해 지연/실행 횟수에 넣는다.
+    반환값: (polls, latencies, after_end)  after_end: end 이후 조회에서야 발견된 글 수
+    """
+    latencies = []
+    polls = 0
+    index = 0
+    after_end = 0
+    t = start
+    while t <= end or index < len(arrivals):
+        if t > end:
+            after_end += len(arrivals) - index
+        polls += 1
+        found = []
+        while index < len(arrivals) and arrivals[index] <= t:
+            found.append(arrivals[index])
+            latencies.append(t - arrivals[index])
+            index += 1
+        t += next_interval(t, found)
+    return polls, latencies, after_end
+
+
+def replay(arrivals, baseline_interval, **scheduler_kwargs):
+    """같은 도착 기록으로 고정 주기와 적응형 스케줄러를 비교한다 (적응형은 처음부터 온라인 학습)."""
+    if not arrivals:
+        return None
+    start, end = arrivals[0], arrivals[-1]
+    fixed_polls, fixed_latencies, fixed_after_end = _simulate(arrivals, lambda t, found: baseline_interval, start, end)
+
+    scheduler = AdaptiveScheduler(None, **scheduler_kwargs)
+    rng = random.Random(0)
+
+    def adaptive_interval(t, found):
+        scheduler.observe(t, found)
+        return scheduler.next_interval(t, rng)
+
+    adaptive_polls, adaptive_latencies, adaptive_after_end = _simulate(arrivals, adaptive_interval, start, end)
+
+    def summary(polls, latencies, after_end):
+        ordered = sorted(latencies)
+        return {
+            "launches": polls,
+            "found_after_end": after_end,
+            "mean_latency_s": round(statistics.mean(ordered), 1),
+            "p95_latency_s": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+        }
+
+    fixed = summary(fixed_polls, fixed_latencies, fixed_after_end)
+    adaptive = summary(adaptive_polls, adaptive_latencies, adaptive_after_end)
+    return {
+        "arrivals": len(arrivals),
+        "days": round((end - start) / 86400, 2),
+        "fixed": dict(fixed, interval_s=baseline_interval),
+        "adaptive": adaptive,
+        "launches_saved_pct": round((1 - adaptive["launches"] / fixed["launches"]) * 100, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="적응형 조회 스케줄러 도구")
+    parser.add_argument("--replay", action="store_true", help="기록된 도착 시각으로 고정 주기와 비교")
+    parser.add_argument("--arrivals", default=str(Path(__file__).resolve().parent / "arrivals.log"))
+    parser.add_argument("--baseline", type=int, default=180, help="비교할 고정 주기(초)")
+    parser.add_argument("--min", type=int, default=int(os.environ.get("NAVER_SCHED_MIN_INTERVAL", "60")))
+    parser.add_argument("--max", type=int, default=int(os.environ.get("NAVER_SCHED_MAX_INTERVAL", "900")))
+    parser.add_argument("--target", type=float, default=float(os.environ.get("NAVER_SCHED_TARGET_POSTS", "0.15")))
+    args = parser.parse_args()
+
+    if not args.replay:
+        parser.print_help()
+        return
+    arrivals = load_arrivals(args.arrivals)
+    result = replay(
+        arrivals, args.baseline,
+        min_interval=args.min, max_interval=args.max, default_interval=args.baseline, target_posts=args.target,
+    )
+    if result is None:
+        print(f"도착 기록이 없습니다: {args.arrivals}")
+        return
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import asyncio
+import time
+
+from telegram import Bot
+from telegram.error import RetryAfter
+
+
+# 텔레그램 전송 한도: 채팅당 초당 1건, 봇 전체 초당 30건
+PER_CHAT_RATE = 1.0
+PER_CHAT_BURST = 3
+GLOBAL_RATE = 30.0
+GLOBAL_BURST = 30
+
+
+def _retry_after_seconds(error):
+    """RetryAfter.retry_after 는 버전/설정에 따라 int 또는 timedelta 다."""
+    value = error.retry_after
+    if hasattr(value, "total_seconds"):
+        return value.total_seconds()
+    return float(value)
+
+
+class TokenBucket:
+    """초당 rate 개씩 채워지는 토큰 버킷. 429 응답을 받으면 pause() 로 일정 시간 전체를 멈춘다."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self._refill(now)
+        self.tokens = 0.0
+
+
+class TelegramSender:
+    """
+    실행(또는 데몬) 동안 Bot 하나와 HTTP 연결을 재사용하는 전송기.
+    같은 채팅으로 가는 메시지는 순서대로, 다른 채팅은 동시에 전송한다.
+    """
+
+    def __init__(self, token, chat_id, timeout=20, max_retries=3, base_url=None):
+        self.token = token
+        self.chat_id = chat_id
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_url = base_url
+        self._bot = None
+        self._global_bucket = TokenBucket(GLOBAL_RATE, GLOBAL_BURST)
+        self._chat_buckets = {}
+        self._chat_locks = {}
+        self.sent = 0
+        self.failed = 0
+        self.rate_limited = 0
+        # 전송 1건이 끝날 때마다 on_result(ok, seconds, retries) 를 호출한다 (계측용, 선택)
+        self.on_result = None
+
+    @property
+    def configured(self):
+        return bool(self.token and self.chat_id)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get_bot(self):
+        if self._bot is None:
+            kwargs = {"token": self.token}
+            if self.base_url:
+                kwargs["base_url"] = self.base_url
+            bot = Bot(**kwargs)
+            await bot.initialize()
+            self._bot = bot
+        return self._bot
+
+    async def close(self):
+        if self._bot is not None:
+            try:
+                await self._bot.shutdown()
+            except Exception as e:
+                print(f"텔레그램 연결 종료 실패: {e}")
+            self._bot = None
+
+    def _chat_state(self, chat_id):
+        key = str(chat_id)
+        if key not in self._chat_locks:
+            self._chat_locks[key] = asyncio.Lock()
+            self._chat_buckets[key] = TokenBucket(PER_CHAT_RATE, PER_CHAT_BURST)
+        return self._chat_locks[key], self._chat_buckets[key]
+
+    async def send(self, text, chat_id=None):
+        """메시지 1건을 전송한다. 429 는 retry_after 만큼 쉬고 재시도한다. 성공 여부를 반환."""
+        chat_id = chat_id or self.chat_id
+        if not self.token or not chat_id:
+            print("텔레그램 설정이 누락되어 있습니다.")
+            return False
+
+        lock, chat_bucket = self._chat_state(chat_id)
+        started = time.monotonic()
+        retries = 0
+        async with lock:
+            for attempt in range(self.max_retries + 1):
+                await self._global_bucket.acquire()
+                await chat_bucket.acquire()
+                try:
+                    bot = await self._get_bot()
+                    await asyncio.wait_for(bot.send_message(chat_id=chat_id, text=text), timeout=self.timeout)
+                    self.sent += 1
+                    print(f"텔레그램 전송: {text[:20]}...")
+                    self._notify(True, started, retries)
+                    return True
+                except RetryAfter as e:
+                    wait = _retry_after_seconds(e)
+                    self.rate_limited += 1
+                    chat_bucket.pause(wait)
+                    self._global_bucket.pause(wait)
+                    if attempt == self.max_retries:
+                        print(f"텔레그램 전송 제한(429): 재시도 {self.max_retries}회 모두 실패")
+                        break
+                    retries += 1
+                    print(f"텔레그램 전송 제한(429): {wait:.0f}초 대기 후 재시도 ({retries}/{self.max_retries})")
+                except asyncio.TimeoutError:
+                    print(f"텔레그램 전송 타임아웃({self.timeout}초)")
+                    break
+                except Exception as e:
+                    print(f"텔레그램 전송 실패: {e}")
+                    break
+        self.failed += 1
+        self._notify(False, started, retries)
+        return False
+
+    def _notify(self, ok, started, retries):
+        if self.on_result is None:
+            return
+        try:
+            self.on_result(ok, time.monotonic() - started, retries)
+        except Exception as e:
+            print(f"텔레그램 전송 계측 실패: {e}")
+
+    async def send_many(self, messages, chat_id=None):
+        """여러 메시지를 한 번에 예약한다 (같은 채팅은 순서 유지). 각 메시지의 성공 여부 리스트를 반환."""
+        return list(await asyncio.gather(*(self.send(message, chat_id) for message in messages)))
+
+
+# ── 다이제스트 ──
+
+# 텔레그램 메시지 길이 상한
+MESSAGE_LIMIT = 4096
+DIGEST_SEPARATOR = "\n\n"
+_DIGEST_HEADER_RESERVE = 40
+
+
+def pack_message_groups(messages, limit=MESSAGE_LIMIT, separator=DIGEST_SEPARATOR):
+    """
+    메시지를 순서대로 limit 이하 묶음으로 합친다. 묶음 경계는 항상 메시지 경계와 일치한다.
+    반환값: [(묶음 텍스트, 들어간 메시지 인덱스 목록)]
+    """
+    groups = []
+    current = ""
+    indexes = []
+    for index, message in enumerate(messages):
+        if len(message) > limit:
+            message = message[:limit - 1] + "…"
+        candidate = current + separator + message if current else message
+        if current and len(candidate) > limit:
+            groups.append((current, indexes))
+            current = message
+            indexes = [index]
+        else:
+            current = candidate
+            indexes.append(index)
+    if current:
+        groups.append((current, indexes))
+    return groups
+
+
+def pack_messages(messages, limit=MESSAGE_LIMIT, separator=DIGEST_SEPARATOR):
+    """메시지를 순서대로 limit 이하 묶음으로 합친다. 묶음 경계는 항상 메시지 경계와 일치한다."""
+    return [chunk for chunk, _ in pack_message_groups(messages, limit, separator)]
+
+
+def build_digest_groups(messages, threshold):
+    """
+    build_digest 와 같지만 각 전송 메시지에 들어간 원래 메시지 인덱스를 함께 돌려준다
+    (전송 성공/실패를 글 단위로 기록할 때 사용). 반환값: [(텍스트, 인덱스 목록)]
+    """
+    if threshold <= 0 or len(messages) < max(threshold, 2):
+        return [(message, [index]) for index, message in enumerate(messages)]
+
+    groups = pack_message_groups(messages, limit=MESSAGE_LIMIT - _DIGEST_HEADER_RESERVE)
+    total = len(groups)
+    return [
+        (f"[새 글 {len(messages)}건 · {number}/{total}]{DIGEST_SEPARATOR}{chunk}", indexes)
+        for number, (chunk, indexes) in enumerate(groups, 1)
+    ]
+
+
+def build_digest(messages, threshold):
+    """
+    메시지가 threshold 건 이상이면 다이제스트로 묶고, 아니면 그대로 반환한다.
+    threshold 가 0 이하이면 묶지 않는다.
+    """
+    return [text for text, _ in build_digest_groups(messages, threshold)]
@@ -0,0 +1,194 @@
+"""
+브라우저/네트워크 없이 돌릴 수 있는 순수 로직 테스트.
+
+    cd github && python -m pytest -q
+"""
+import json
+from pathlib import Path
+
+import corpus
+from main import FEED_SELECTORS
+from post_store import HIGH_WATER_SIZE, Outbox, SentPostStore, canonical_article_key
+from scheduler import AdaptiveScheduler, _simulate
+from telegram_client import MESSAGE_LIMIT, build_digest_groups
+
+
+DEBUG_FEED_HTML = Path(__file__).resolve().parent.parent / "pc" / "debug_feed.html"
+
+
+# ── 게시글 키 ──
+
+def test_canonical_article_key_forms():
+    assert canonical_article_key("https://cafe.naver.com/ca-fe/cafes/123/articles/456?page=2#c") == "123/456"
+    assert canonical_article_key("https://m.cafe.naver.com/ca-fe/web/cafes/123/articles/456") == "123/456"
+    assert canonical_article_key("https://cafe.naver.com/ArticleRead.nhn?clubid=123&articleid=456") == "123/456"
+    assert canonical_article_key(
+        "https://cafe.naver.com/movie02?iframe_url_utf8=%252FArticleRead.nhn%253Fclubid%253D123%2526articleid%253D456"
+    ) == "123/456"
+    assert canonical_article_key("https://cafe.naver.com/Movie02/456") == "movie02/456"
+    assert canonical_article_key("https://cafe.naver.com/movie02?articleid=456", {"movie02": "123"}) == "123/456"
+
+
+def test_canonical_article_key_rejects_other_urls():
+    assert canonical_article_key("") is None
+    assert canonical_article_key("https://blog.naver.com/movie02/456") is None
+    assert canonical_article_key("https://cafe.naver.com/movie02") is None
+
+
+# ── 전송 이력 ──
+
+def test_sent_post_store_migrates_legacy_list(tmp_path):
+    legacy = tmp_path / "sent_posts.json"
+    legacy.write_text(json.dumps([
+        "https://cafe.naver.com/ArticleRead.nhn?clubid=1&articleid=2",
+        "https://cafe.naver.com/ca-fe/cafes/1/articles/2",
+        "https://example.com/not-a-cafe",
+    ]), encoding="utf-8")
+
+    store = SentPostStore(tmp_path / "sent_posts.log", legacy_path=legacy).load()
+
+    assert "1/2" in store
+    assert "https://example.com/not-a-cafe" in store
+    assert len(store) == 2
+    assert not legacy.exists()
+    assert (tmp_path / "sent_posts.json.migrated").exists()
+    assert len(SentPostStore(tmp_path / "sent_posts.log").load()) == 2
+
+
+def test_sent_post_store_rekeys_names_after_alias(tmp_path):
+    path = tmp_path / "sent_posts.log"
+    store = SentPostStore(path).load()
+    assert store.add("https://cafe.naver.com/movie02/456")
+    assert "movie02/456" in store
+
+    assert store.learn_alias("movie02", "123")
+    assert "123/456" in store and "movie02/456" not in store
+    assert not store.add("https://cafe.naver.com/ca-fe/cafes/123/articles/456")
+
+    reloaded = SentPostStore(path).load()
+    assert "123/456" in reloaded and len(reloaded) == 1
+
+
+def test_sent_post_store_mark(tmp_path):
+    path = tmp_path / "sent_posts.log"
+    store = SentPostStore(path).load()
+    assert not store.high_water_mark()
+
+    links = [f"https://cafe.naver.com/ca-fe/cafes/1/articles/{n}" for n in (5, 4, 3, 2)]
+    assert store.advance_mark([(store.key_for(link), link) for link in links])
+    assert not store.advance_mark([(store.key_for(links[0]), links[0])])
+
+    mark = SentPostStore(path).load().high_water_mark()
+    assert len(mark.links) == HIGH_WATER_SIZE
+    assert mark.reached(links[0])
+    # 같은 글이 다른 주소 형태로 와도 키로 멈춘다
+    assert mark.reached("https://cafe.naver.com/ArticleRead.nhn?clubid=1&articleid=4")
+    assert not mark.reached(links[3])
+
+
+# ── 전송 대기열 ──
+
+def test_outbox_backoff_and_drop(tmp_path, monkeypatch):
+    now = 1_700_000_000.0
+    monkeypatch.setattr("post_store.time.time", lambda: now)
+    path = tmp_path / "outbox.log"
+    outbox = Outbox(path, backoff_base=60, backoff_max=100, max_attempts=3).load()
+    assert outbox.enqueue([("1/1", "link1", "text1"), ("1/2", "link2", "text2")]) == 2
+    assert outbox.enqueue([("1/1", "link1", "text1")]) == 0
+
+    assert outbox.failed(["1/1"]) == []
+    assert [item["key"] for item in outbox.due(now)] == ["1/2"]
+    assert [item["key"] for item in outbox.due(now + 60)] == ["1/1", "1/2"]
+
+    # 60초에서 두 배로 늘지만 backoff_max 에서 멈추고, 재시도 상태는 다시 읽어도 남는다
+    assert outbox.failed(["1/1"]) == []
+    item = next(item for item in Outbox(path).load().due(now + 100) if item["key"] == "1/1")
+    assert item["attempts"] == 2 and item["next_at"] == now + 100
+
+    assert [item["key"] for item in outbox.failed(["1/1"])] == ["1/1"]
+    outbox.done(["1/2"])
+    assert len(outbox) == 0
+    assert len(Outbox(path).load()) == 0
+
+
+# ── 다이제스트 ──
+
+def test_build_digest_groups_respects_message_limit():
+    messages = [f"{index:04d} " + "가" * 995 for index in range(10)]
+    groups = build_digest_groups(messages, threshold=3)
+
+    assert len(groups) > 1
+    assert all(len(text) <= MESSAGE_LIMIT for text, _ in groups)
+    assert [index for _, indexes in groups for index in indexes] == list(range(10))
+    assert groups[0][0].startswith(f"[새 글 10건 · 1/{len(groups)}]")
+
+
+def test_build_digest_groups_truncates_oversized_message():
+    groups = build_digest_groups(["a" * (MESSAGE_LIMIT * 2), "b", "c"], threshold=3)
+    assert all(len(text) <= MESSAGE_LIMIT for text, _ in groups)
+    assert [indexes for _, indexes in groups] == [[0], [1, 2]]
+
+
+def test_build_digest_groups_below_threshold():
+    assert build_digest_groups(["a", "b"], threshold=3) == [("a", [0]), ("b", [1])]
+
+
+# ── 적응형 스케줄 ──
+
+def _scheduler():
+    return AdaptiveScheduler(None, min_interval=60, max_interval=900, default_interval=180, target_posts=0.15, jitter=0)
+
+
+def test_scheduler_intervals():
+    start = 1_700_000_000.0
+    scheduler = _scheduler()
+    assert scheduler.next_interval(start) == 180
+
+    # 조용한 구간: 도착이 없으면 최대 간격
+    scheduler.observe(start, [])
+    scheduler.observe(start + 3600, [])
+    assert scheduler.next_interval(start + 3600) == 900
+
+    # 바쁜 구간: 시간당 60건이면 0.15건 = 9초 -> 최소 간격
+    busy = _scheduler()
+    busy.observe(start, [])
+    busy.observe(start + 3600, [start + n * 60 for n in range(60)])
+    assert busy.next_interval(start + 3600) == 60
+
+
+def test_scheduler_halves_interval_after_new_posts():
+    start = 1_699_999_200.0  # 정시: 조회 창이 주간 시간 칸 하나에 들어간다
+    scheduler = _scheduler()
+    scheduler.observe(start, [])
+    scheduler.observe(start + 3600, [start + 1800])
+    # 시간당 1건이면 0.15건 = 540초, 직전 조회에 새 글이 있었으므로 절반
+    assert scheduler.next_interval(start + 3600) == 270
+    scheduler.last_new_posts = 0
+    assert scheduler.next_interval(start + 3600) == 540
+
+
+def test_simulate_keeps_arrivals_after_last_poll():
+    polls, latencies, after_end = _simulate([0, 100, 250], lambda t, found: 180, 0, 250)
+    assert len(latencies) == 3
+    assert after_end == 1
+    assert polls == 3
+
+
+# ── 피드 추출 ──
+
+def test_extract_feed_html_debug_feed():
+    selectors = FEED_SELECTORS
+    html = DEBUG_FEED_HTML.read_text(encoding="utf-8")
+    result = corpus.extract_feed_html(html, "https://section.cafe.naver.com/ca-fe/home/feed", selectors)
+
+    assert result["errors"] == [] and result["missing"] == {}
+    assert result["total"] == len(result["items"]) == 5
+    first = result["items"][0]
+    assert first["link"] == "https://cafe.naver.com/wjdrkrjqn/133754"
+    assert first["title"] and first["date"]
+    assert canonical_article_key(first["link"]) == "wjdrkrjqn/133754"
+
+    stopped = corpus.extract_feed_html(
+        html, "https://section.cafe.naver.com/ca-fe/home/feed", selectors, stop_links=[result["items"][2]["link"]]
+    )
+    assert stopped["stopped"] == 2 and len(stopped["items"]) == 2
@@ -1,49 +1,264 @@
 import os
+import sys
+import json
 import time
+import fcntl
 import asyncio
-from telegram import Bot
+import argparse
+import statistics
+from pathlib import Path
 from dotenv import load_dotenv
 
+from health import read_history, read_status
+from telegram_client import TelegramSender
+
 load_dotenv()
 
 TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN', '').strip()
 TELEGRAM_CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID', '').strip()
-WATCHDOG_FILE = 'last_run.txt'
-THRESHOLD_SECONDS = 600  # 10분 (봇이 10분 이상 멈추면 알림)
+# 2단계 이상(장기화된) 경보를 추가로 받을 채팅 (비어 있으면 TELEGRAM_CHAT_ID 로만)
+ESCALATION_CHAT_ID = os.environ.get('NAVER_WATCHDOG_ESCALATION_CHAT_ID', '').strip()
+
+BASE_DIR = Path(__file__).resolve().parent
+# 봇이 상태를 기록하는 정식 디렉토리 (main.py 와 같은 규칙)
+HEALTH_DIR = Path(os.environ.get('NAVER_BOT_HEALTH_DIR', '').strip() or BASE_DIR).expanduser()
+# 감시 대상: "이름=디렉토리" 또는 디렉토리를 쉼표로 구분 (비어 있으면 HEALTH_DIR 하나)
+TARGETS = os.environ.get('NAVER_WATCHDOG_TARGETS', '').strip()
+STATE_FILE = BASE_DIR / 'watchdog_state.json'
+LOCK_FILE = BASE_DIR / 'watchdog.lock'
+
+CHECK_INTERVAL = int(os.environ.get('NAVER_WATCHDOG_INTERVAL', '30'))
+THRESHOLD_SECONDS = int(os.environ.get('NAVER_WATCHDOG_STALE_SECONDS', '600'))  # 10분 (봇이 10분 이상 멈추면 알림)
+FAILURE_STREAK = int(os.environ.get('NAVER_WATCHDOG_FAILURE_STREAK', '3'))
+# 최근 WINDOW 회 실행의 성공률이 MIN_SUCCESS_RATE 미만이면 알림
+WINDOW = int(os.environ.get('NAVER_WATCHDOG_WINDOW', '20'))
+MIN_SUCCESS_RATE = float(os.environ.get('NAVER_WATCHDOG_MIN_SUCCESS', '0.5'))
+# 최근 성공 실행들의 소요 시간 중앙값이 그 이전 구간의 SLOWDOWN_FACTOR 배를 넘으면 알림
+SLOWDOWN_FACTOR = float(os.environ.get('NAVER_WATCHDOG_SLOWDOWN', '2.0'))
+SLOWDOWN_RECENT = 5
+SLOWDOWN_MIN_SECONDS = 10
+# 같은 경보는 한 번만 보내고, 계속되면 ESCALATE_AFTER, 그 두 배, ... (최대 ESCALATE_MAX) 간격으로 다시 알린다
+ESCALATE_AFTER = int(os.environ.get('NAVER_WATCHDOG_ESCALATE_AFTER', '1800'))
+ESCALATE_MAX = 6 * 3600
+
+FAILED_STATES = (
+    'error', 'cookie_expired', 'drift', 'captcha', 'throttled', 'server_error', 'network_error', 'interrupted',
+)
+STATE_LABELS = {
+    'error': '오류',
+    'cookie_expired': '쿠키 만료',
+    'drift': '마크업 변경',
+    'captcha': '캡차',
+    'throttled': '요청 제한',
+    'server_error': '서버 오류',
+    'network_error': '네트워크 오류',
+    'interrupted': '중단',
+}
+SIGNAL_LABELS = {
+    'heartbeat': 'heartbeat 끊김',
+    'failure_streak': '연속 실패',
+    'success_rate': '성공률 저하',
+    'slowdown': '실행 시간 증가',
+}
+
+
+# ── 감시 대상 ──
+
+def parse_targets(raw):
+    """NAVER_WATCHDOG_TARGETS 를 [(이름, 디렉토리)] 로 바꾼다."""
+    targets = []
+    for item in raw.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, path = item.partition('=')
+        if not sep:
+            path = name
+            name = Path(path).expanduser().resolve().name
+        targets.append((name.strip(), Path(path.strip()).expanduser()))
+    return targets or [('bot', HEALTH_DIR)]
+
+
+def _format_duration(seconds):
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f'{minutes}분'
+    return f'{minutes // 60}시간 {minutes % 60}분'
+
+
+def evaluate(status, history, now):
+    """
+    상태 파일과 실행 이력으로 신호별 이상 여부를 판단한다.
+    반환값: {신호: 설명 문자열 또는 None(정상)}
+    """
+    signals = {'heartbeat': None}
+
+    if status is not None:
+        elapsed = now - float(status['last_run_ts'])
+        if elapsed > THRESHOLD_SECONDS and status.get('state') != 'stopped':
+            signals['heartbeat'] = f'마지막 기록 {_format_duration(elapsed)} 전 (state={status.get("state")})'
+        elif elapsed > THRESHOLD_SECONDS:
+            signals['heartbeat'] = f'데몬이 종료된 뒤 {_format_duration(elapsed)} 동안 재시작되지 않았습니다'
+
+    streak = []
+    for entry in reversed(history):
+        if entry.get('state') not in FAILED_STATES:
+            break
+        streak.append(entry)
+    signals['failure_streak'] = None
+    if len(streak) >= FAILURE_STREAK:
+        counts = {}
+        for entry in streak:
+            counts[entry['state']] = counts.get(entry['state'], 0) + 1
+        breakdown = ', '.join(f'{STATE_LABELS.get(k, k)} {v}회' for k, v in counts.items())
+        signals['failure_streak'] = f'{len(streak)}회 연속 실패 ({breakdown})\n마지막: {streak[0].get("detail")}'
+
+    window = history[-WINDOW:]
+    signals['success_rate'] = None
+    if len(window) >= max(1, WINDOW // 2):
+        ok = sum(1 for entry in window if entry.get('state') == 'ok')
+        rate = ok / len(window)
+        if rate < MIN_SUCCESS_RATE:
+            signals['success_rate'] = f'최근 {len(window)}회 중 {ok}회 성공 ({rate:.0%} < {MIN_SUCCESS_RATE:.0%})'
+
+    durations = [entry['seconds'] for entry in history[-(WINDOW + SLOWDOWN_RECENT):]
+                 if entry.get('state') == 'ok' and isinstance(entry.get('seconds'), (int, float))]
+    signals['slowdown'] = None
+    if len(durations) >= SLOWDOWN_RECENT * 2:
+        recent = statistics.median(durations[-SLOWDOWN_RECENT:])
+        baseline = statistics.median(durations[:-SLOWDOWN_RECENT])
+        if recent > baseline * SLOWDOWN_FACTOR and recent - baseline > SLOWDOWN_MIN_SECONDS:
+            signals['slowdown'] = f'최근 실행 시간 중앙값 {recent:.1f}초 (이전 {baseline:.1f}초의 {recent / baseline:.1f}배)'
+
+    return signals
+
+
+# ── 경보 상태 (중복 억제/단계 상향/복구) ──
+
+class AlertBook:
+    """
+    (대상, 신호)별 경보 상태. 처음 이상이면 알리고, 계속되면 단계마다 간격을 두 배로 늘려 다시 알리며,
+    정상으로 돌아오면 복구 메시지를 보낸다. 상태는 STATE_FILE 에 저장해 재시작/단발 실행에도 유지한다.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.alerts = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.alerts = json.load(f).get('alerts', {})
+        except (OSError, ValueError):
+            pass
 
-async def send_alert(message):
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
+    def save(self):
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'alerts': self.alerts}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def update(self, target, signal, problem, now):
+        """신호 1개의 판단 결과를 반영한다. 반환값: (보낼 메시지 또는 None, 단계)"""
+        key = f'{target}:{signal}'
+        label = SIGNAL_LABELS.get(signal, signal)
+        alert = self.alerts.get(key)
+
+        if problem is None:
+            if alert is None:
+                return None, 0
+            del self.alerts[key]
+            lasted = _format_duration(now - alert['since'])
+            return f'✅ [복구] 네이버 카페 봇 {target}: {label} 해소 (지속 {lasted})', 0
+
+        if alert is None:
+            self.alerts[key] = {'since': now, 'sent_at': now, 'level': 1}
+            return f'🚨 [비상] 네이버 카페 봇 {target}: {label}\n\n{problem}\n서버 상태를 확인해주세요.', 1
+
+        wait = min(ESCALATE_AFTER * 2 ** (alert['level'] - 1), ESCALATE_MAX)
+        if now - alert['sent_at'] < wait:
+            return None, alert['level']
+        alert['level'] += 1
+        alert['sent_at'] = now
+        lasted = _format_duration(now - alert['since'])
+        return (
+            f'🚨🚨 [지속 {lasted}, {alert["level"]}단계] 네이버 카페 봇 {target}: {label}\n\n{problem}',
+            alert['level'],
+        )
+
+
+# ── 알림 전송 ──
+
+async def send_alert(sender, message, level=1):
+    if not sender.configured:
         print("Telegram 설정 누락")
         return
-    try:
-        bot = Bot(token=TELEGRAM_BOT_TOKEN)
-        await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
+    if await sender.send(message):
         print("경고 메시지 전송 성공")
-    except Exception as e:
-        print(f"경고 메시지 전송 실패: {e}")
+    else:
+        print("경고 메시지 전송 실패")
+    if level >= 2 and ESCALATION_CHAT_ID and ESCALATION_CHAT_ID != TELEGRAM_CHAT_ID:
+        await sender.send(message, ESCALATION_CHAT_ID)
+
+
+async def check_bot_status(sender, targets, book):
+    """모든 대상을 한 번 점검하고 필요한 경보/복구 메시지를 보낸다."""
+    now = time.time()
+    for name, directory in targets:
+        try:
+            # bot_status.json/last_run.txt 는 임시 파일 + rename 으로 교체되므로 반쯤 쓴 내용은 없다
+            status = read_status(directory)
+            if status is None:
+                print(f"[{name}] {directory} 에 상태 파일이 없습니다. 아직 봇이 한 번도 실행되지 않았거나 파일이 삭제되었습니다.")
+            signals = evaluate(status, read_history(directory, limit=WINDOW + SLOWDOWN_RECENT), now)
+        except Exception as e:
+            print(f"[{name}] 상태 확인 중 오류 발생: {e}")
+            continue
 
-async def check_bot_status():
-    if not os.path.exists(WATCHDOG_FILE):
-        print(f"{WATCHDOG_FILE} 파일이 없습니다. 아직 봇이 한 번도 실행되지 않았거나 파일이 삭제되었습니다.")
+        problems = [signal for signal, problem in signals.items() if problem]
+        if problems:
+            print(f"[{name}] 이상: {', '.join(SIGNAL_LABELS[s] for s in problems)}")
+        else:
+            print(f"[{name}] 봇 정상 작동 중")
+
+        for signal, problem in signals.items():
+            message, level = book.update(name, signal, problem, now)
+            if message:
+                print(message)
+                await send_alert(sender, message, level)
+    book.save()
+
+
+async def monitor(targets, once=False):
+    book = AlertBook(STATE_FILE)
+    async with TelegramSender(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID) as sender:
+        while True:
+            await check_bot_status(sender, targets, book)
+            if once:
+                return
+            await asyncio.sleep(CHECK_INTERVAL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="네이버 카페 봇 감시")
+    parser.add_argument('--once', action='store_true', help="한 번만 점검하고 종료 (cron 용)")
+    args = parser.parse_args()
+
+    # 상주 감시는 하나만: cron 으로 매분 띄워도 이미 실행 중이면 바로 종료된다
+    lock_file = open(LOCK_FILE, 'w')
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        print("watchdog 이 이미 실행 중입니다.")
         return
 
+    targets = parse_targets(TARGETS)
+    print(f"감시 대상: {', '.join(f'{name}={directory}' for name, directory in targets)}")
     try:
-        with open(WATCHDOG_FILE, 'r') as f:
-            last_run_timestamp = float(f.read().strip())
-        
-        current_time = time.time()
-        elapsed_time = current_time - last_run_timestamp
-        
-        if elapsed_time > THRESHOLD_SECONDS:
-            minutes = int(elapsed_time / 60)
-            msg = f"🚨 [비상] 네이버 카페 봇이 멈췄습니다!\n\n마지막 실행: {minutes}분 전\n서버 상태를 확인해주세요."
-            print(msg)
-            await send_alert(msg)
-        else:
-            print(f"봇 정상 작동 중 (마지막 실행: {int(elapsed_time)}초 전)")
-            
-    except Exception as e:
-        print(f"상태 확인 중 오류 발생: {e}")
+        asyncio.run(monitor(targets, once=args.once))
+    except KeyboardInterrupt:
+        print("watchdog 을 종료합니다.")
+    finally:
+        lock_file.close()
+
 
 if __name__ == "__main__":
-    asyncio.run(check_bot_status())
+    sys.exit(main())
@@ -1,11 +1,9 @@
 import os
 import asyncio
 import time
-import json
 import re
 import sys
 from datetime import datetime, timedelta, timezone
-from telegram import Bot
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -15,6 +13,13 @@ from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import load_dotenv
 
+# 전송 이력/스케줄러/텔레그램 전송 모듈은 github/ 의 것을 그대로 쓴다 (복사본을 따로 두지 않음)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'github'))
+
+from post_store import SentPostStore
+from scheduler import AdaptiveScheduler, append_arrivals
+from telegram_client import TelegramSender, build_digest_groups
+
 # .env 파일 로드 (같은 디렉토리 또는 상위 디렉토리 확인)
 load_dotenv()
 
@@ -23,28 +28,63 @@ TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN', '').strip()
 TELEGRAM_CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID', '').strip()
 NAVER_COOKIE = os.environ.get('NAVER_COOKIE', '').strip()
 
-# PC 버전은 별도의 로그 파일 사용
+# 새 글이 이 건수 이상이면 다이제스트 메시지로 묶어 전송 (0: 사용 안 함)
+DIGEST_THRESHOLD = int(os.environ.get('NAVER_DIGEST_THRESHOLD', '3'))
+
+# 전송 이력 보존 기간(일)
+DEDUP_RETENTION_DAYS = int(os.environ.get('NAVER_DEDUP_RETENTION_DAYS', '30'))
+
+# PC 버전은 별도의 로그 파일 사용 (예전 local_log.json 은 첫 실행 때 자동 변환)
 SENT_POSTS_FILE = 'local_log.json'
+SENT_POSTS_LOG = 'local_log.log'
 
-def load_sent_posts():
-    if os.path.exists(SENT_POSTS_FILE):
-        try:
-            with open(SENT_POSTS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"기존 로그 파일 로드 실패: {e}")
-            return []
-    return []
+# 확인 주기: fixed(1분) / adaptive(요일·시간별 새 글 도착률에 맞춰 1~15분)
+SCHEDULER_MODE = os.environ.get('NAVER_SCHEDULER', 'fixed').strip().lower() or 'fixed'
+POLL_INTERVAL = 60
+# 새 글 작성 시각 기록 (모드와 관계없이 남겨 scheduler.py --replay 로 비교)
+LOCAL_ARRIVALS_FILE = 'local_arrivals.log'
 
-def save_sent_posts(posts):
+def open_scheduler():
+    if SCHEDULER_MODE != 'adaptive':
+        return None
+    return AdaptiveScheduler(
+        'local_schedule.json',
+        LOCAL_ARRIVALS_FILE,
+        min_interval=int(os.environ.get('NAVER_SCHED_MIN_INTERVAL', '60')),
+        max_interval=int(os.environ.get('NAVER_SCHED_MAX_INTERVAL', '900')),
+        default_interval=POLL_INTERVAL,
+        target_posts=float(os.environ.get('NAVER_SCHED_TARGET_POSTS', '0.15')),
+    ).load()
+
+def load_sent_posts():
+    store = SentPostStore(SENT_POSTS_LOG, retention_days=DEDUP_RETENTION_DAYS, legacy_path=SENT_POSTS_FILE)
     try:
-        # 너무 많이 쌓이지 않도록 최신 100개만 유지
-        if len(posts) > 100:
-            posts = posts[-100:]
-        with open(SENT_POSTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(posts, f, ensure_ascii=False, indent=2)
+        store.load()
     except Exception as e:
-        print(f"로그 파일 저장 실패: {e}")
+        print(f"기존 로그 파일 로드 실패: {e}")
+    return store
+
+def parse_relative_time(time_str, now):
+    """'5분 전' 같은 상대 시간 문자열을 datetime 으로 바꾼다. 형식을 모르면 now."""
+    if '방금' in time_str:
+        return now
+    if '분 전' in time_str:
+        return now - timedelta(minutes=int(re.search(r'(\d+)분', time_str).group(1)))
+    if '시간 전' in time_str:
+        return now - timedelta(hours=int(re.search(r'(\d+)시간', time_str).group(1)))
+    if '일 전' in time_str: # 혹시 모를 경우 대비
+        return now - timedelta(days=int(re.search(r'(\d+)일', time_str).group(1)))
+    # 날짜 형식 (2024.01.01 등)이거나 알 수 없는 형식이면 현재 시간으로 처리
+    return now
+
+def post_written_at(post):
+    """게시글 작성 시각(unix time) 추정치. 적응형 스케줄러가 도착률을 학습하는 기준 (github/main.py 와 같음)"""
+    KST = timezone(timedelta(hours=9))
+    now = datetime.now(KST)
+    try:
+        return parse_relative_time(post.get('date', '').strip(), now).timestamp()
+    except Exception:
+        return now.timestamp()
 
 def parse_time_string(time_str):
     """
@@ -58,21 +98,7 @@ def parse_time_string(time_str):
     time_str = time_str.strip()
     
     try:
-        if '방금' in time_str:
-            dt = now
-        elif '분 전' in time_str:
-            minutes = int(re.search(r'(\d+)분', time_str).group(1))
-            dt = now - timedelta(minutes=minutes)
-        elif '시간 전' in time_str:
-            hours = int(re.search(r'(\d+)시간', time_str).group(1))
-            dt = now - timedelta(hours=hours)
-        elif '일 전' in time_str: # 혹시 모를 경우 대비
-            days = int(re.search(r'(\d+)일', time_str).group(1))
-            dt = now - timedelta(days=days)
-        else:
-            # 날짜 형식 (2024.01.01 등)이거나 알 수 없는 형식이면 현재 시간으로 대체하거나 그대로 둠
-            # 여기서는 현재 시간으로 처리
-            dt = now
+        dt = parse_relative_time(time_str, now)
             
         # 오전/오후 포맷팅
         ampm = "오전" if dt.hour < 12 else "오후"
@@ -90,22 +116,20 @@ def parse_time_string(time_str):
         hour = 12 if hour == 0 else hour
         return f"{ampm} {hour}:{now.minute:02d}"
 
+# 프로그램이 실행되는 동안 텔레그램 연결을 재사용하는 전송기
+telegram_sender = TelegramSender(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
+
 async def send_telegram_message(message):
     if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
         print("Telegram 설정이 누락되었습니다.")
-        return
-    try:
-        # Bot 초기화 시 토큰 다시 한 번 확인
-        bot = Bot(token=TELEGRAM_BOT_TOKEN)
-        await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
-        print(f"텔레그램 전송 성공: {message[:20]}...")
-    except Exception as e:
-        print(f"텔레그램 전송 실패: {e}")
+        return False
+    return await telegram_sender.send(message)
 
 def get_feed_posts():
+    """피드의 최신 글 목록. 조회 자체가 실패하면 None (새 글이 없어 빈 목록인 경우와 구분)"""
     if not NAVER_COOKIE:
         print("네이버 쿠키(NAVER_COOKIE)가 설정되지 않았습니다.")
-        return []
+        return None
 
     # Selenium Headless 설정
     chrome_options = Options()
@@ -226,6 +250,7 @@ def get_feed_posts():
                 
     except Exception as e:
         print(f"피드 가져오기 실패: {e}")
+        posts = None
     finally:
         driver.quit()
         
@@ -234,38 +259,71 @@ def get_feed_posts():
 async def main_loop():
     print("="*50)
     print("PC 버전 네이버 카페 알림 봇 시작")
-    print("1분 간격으로 피드를 확인합니다.")
+    if SCHEDULER_MODE == 'adaptive':
+        print("새 글 도착률에 맞춘 간격(적응형)으로 피드를 확인합니다.")
+    else:
+        print("1분 간격으로 피드를 확인합니다.")
     print("종료하려면 Ctrl+C를 누르세요.")
     print("="*50)
     
+    # 전송 이력은 한 번만 로드하고, 이후엔 추가분만 로그에 덧붙인다
+    sent_posts = load_sent_posts()
+    scheduler = open_scheduler()
+    
     while True:
+        # 적응형 스케줄러 학습용: 이번에 전송한 새 글의 작성 시각
+        arrivals = []
+        fetched = False
         try:
             print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 피드 확인 중...")
             
-            # 1. 기존 로그 로드
-            sent_posts = load_sent_posts()
+            # 1. 보존 기간이 지난 이력 정리
+            sent_posts.maintain()
             
             # 2. 새 글 가져오기
             posts = get_feed_posts()
             
-            if posts:
-                new_posts_count = 0
+            if posts is not None:
+                # 새 글이 없어도 조회는 성공: 스케줄러가 조용한 피드를 실패로 보고 간격을 늘리지 않도록
+                fetched = True
+                messages = []
+                new_entries = []
+                written = []
+                seen = set()
                 for post in posts:
                     link = post['link']
-                    if link in sent_posts:
+                    # 주소 형태가 달라도 같은 글이면 같은 키 (해석 불가 시 링크 원문)
+                    key = sent_posts.key_for(link)
+                    if key is None:
+                        print(f"글 키 해석 실패, 링크 원문으로 중복 판정: {link}")
+                        key = link
+                    if key in sent_posts or key in seen:
                         continue
                         
                     msg = f"{post['absolute_time']}\n{post['title']}\n{post['link']}\n좋아요 {post['like']} 댓글 {post['comment']}"
-                    await send_telegram_message(msg)
-                    
-                    sent_posts.append(link)
-                    new_posts_count += 1
-                    time.sleep(1)
+                    messages.append(msg)
+                    new_entries.append((key, link))
+                    written.append(post_written_at(post))
+                    seen.add(key)
+                
+                # 전송 간격은 telegram_sender 의 속도 제한기가 맞춤
+                groups = build_digest_groups(messages, DIGEST_THRESHOLD)
+                results = await telegram_sender.send_many([text for text, _ in groups])
+                # 전송에 성공한 메시지에 담긴 글만 이력에 남긴다 (실패한 글은 다음 확인 때 다시 새 글로 보고 재전송)
+                sent = sorted(index for (_, indexes), ok in zip(groups, results) if ok for index in indexes)
+                new_posts_count = len(sent)
+                failed_count = len(messages) - new_posts_count
                 
                 if new_posts_count > 0:
                     print(f"--> {new_posts_count}개의 새 글 알림 전송 완료.")
-                    save_sent_posts(sent_posts)
-                else:
+                    try:
+                        sent_posts.add_many(new_entries[index] for index in sent)
+                    except Exception as e:
+                        print(f"로그 파일 저장 실패: {e}")
+                    arrivals.extend(written[index] for index in sent)
+                if failed_count > 0:
+                    print(f"--> {failed_count}개의 새 글 알림 전송 실패: 다음 확인 때 다시 보냅니다.")
+                if not messages:
                     print("--> 새로운 게시글이 없습니다.")
             else:
                 print("--> 게시글을 가져오지 못했습니다.")
@@ -273,12 +331,29 @@ async def main_loop():
         except Exception as e:
             print(f"오류 발생: {e}")
             
-        # 1분 대기
-        print("1분 뒤 다시 확인합니다...")
-        await asyncio.sleep(60)
+        # 다음 확인까지 대기 (adaptive 면 스케줄러가 간격을 정함)
+        interval = POLL_INTERVAL
+        if scheduler is not None:
+            try:
+                if fetched:
+                    interval = scheduler.record_poll(time.time(), arrivals)
+                else:
+                    interval = scheduler.record_failure(time.time())
+            except Exception as e:
+                print(f"스케줄 상태 저장 실패: {e}")
+        elif fetched:
+            append_arrivals(LOCAL_ARRIVALS_FILE, time.time(), arrivals)
+        print(f"{interval:.0f}초 뒤 다시 확인합니다...")
+        await asyncio.sleep(interval)
+
+async def run():
+    try:
+        await main_loop()
+    finally:
+        await telegram_sender.close()
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main_loop())
+        asyncio.run(run())
     except KeyboardInterrupt:
         print("\n프로그램을 종료합니다.")
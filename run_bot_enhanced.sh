@@ -21,10 +21,13 @@ fi
 
 exec 9>"$LOCK_FILE"
 if ! flock -n 9; then
-  # 以묐났 ?ㅽ뻾 諛⑹?
+  # 중복 실행 방지
   echo "[$(date '+%Y-%m-%d %H:%M:%S')] SKIP: already running." >> "$LOG_FILE"
   exit 0
 fi
+# main.py 는 같은 bot.lock 을 다시 잡지 않는다 (이 쉘이 이미 보유).
+# 데몬 모드(main.py --daemon)가 실행 중이면 위 flock 에서 SKIP 된다.
+export NAVER_BOT_LOCK_HELD=1
 
 VENV_PATH="$SCRIPT_DIR/../venv"
 if [ ! -x "$VENV_PATH/bin/python3" ]; then
@@ -79,14 +82,11 @@ ensure_dependencies() {
     installed_hash="$(tr -d '[:space:]' < "$REQUIREMENTS_STAMP")"
   fi
 
+  # 설치 여부는 main.py 가 같은 프로세스에서 확인한다 (누락 시 DEPENDENCY_EXIT 로 종료)
   if [ "$required_hash" != "$installed_hash" ]; then
     needs_install=1
   fi
 
-  if ! "$PYTHON_BIN" -c "import telegram, selenium, dotenv" >/dev/null 2>&1; then
-    needs_install=1
-  fi
-
   if [ "$needs_install" -eq 1 ]; then
     log "INFO: syncing python dependencies."
     "$PYTHON_BIN" -m pip install -r "$REQUIREMENTS_FILE" >> "$LOG_FILE" 2>&1
@@ -111,6 +111,7 @@ ensure_dependencies
 
 MAIN_EXIT=255
 MAIN_PID=""
+DEPENDENCY_EXIT=3
 
 cleanup() {
   if [ -n "${MAIN_PID}" ] && kill -0 "$MAIN_PID" 2>/dev/null; then
@@ -137,7 +138,19 @@ cleanup() {
 
 trap cleanup EXIT INT TERM
 
-timeout --signal=INT --kill-after=10s "${MAX_EXECUTION_TIME}s" "$PYTHON_BIN" "$MAIN_SCRIPT" &
-MAIN_PID=$!
-wait "$MAIN_PID" && MAIN_EXIT=0 || MAIN_EXIT=$?
+run_main() {
+  timeout --signal=INT --kill-after=10s "${MAX_EXECUTION_TIME}s" "$PYTHON_BIN" "$MAIN_SCRIPT" &
+  MAIN_PID=$!
+  wait "$MAIN_PID" && MAIN_EXIT=0 || MAIN_EXIT=$?
+  MAIN_PID=""
+}
+
+run_main
+if [ "$MAIN_EXIT" -eq "$DEPENDENCY_EXIT" ]; then
+  # 패키지가 지워졌거나 깨진 경우: 강제로 다시 설치하고 1회 재실행
+  log "WARN: main reported missing python dependencies."
+  rm -f "$REQUIREMENTS_STAMP"
+  ensure_dependencies
+  run_main
+fi
 exit "$MAIN_EXIT"